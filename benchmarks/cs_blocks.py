@@ -0,0 +1,92 @@
+"""Block-vectorized cs kernels against the numba kernels and the removed per-row python loops.
+
+Everything runs in this process, numba is compiled and warmed up on a small panel first.
+
+    PYTHONPATH=. python benchmarks/cs_blocks.py --dates 5000 --assets 3000
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from strategy import cs
+from strategy.raymaster import RayManager
+
+def zscore_rows(arr):
+    result = np.empty(arr.shape)
+    for i in range(arr.shape[0]):
+        result[i] = (arr[i] - np.nanmean(arr[i])) / np.nanstd(arr[i])
+    return result
+
+def winsorize_rows(arr, sigma):
+    result = np.empty(arr.shape)
+    for i in range(arr.shape[0]):
+        row = arr[i]
+        high_adjust = np.where(row>np.nanmean(row)+sigma*np.nanstd(row), np.nanmean(row)+sigma*np.nanstd(row), 0)
+        low_adjust = np.where(row<np.nanmean(row)-sigma*np.nanstd(row), np.nanmean(row)-sigma*np.nanstd(row), 0)
+        adjust = high_adjust + low_adjust
+        result[i] = np.where(adjust==0, row, adjust)
+    return result
+
+def truncate_rows(arr, maxPercent):
+    result = np.empty(arr.shape)
+    for i in range(arr.shape[0]):
+        available_max = np.nansum(arr[i]) * maxPercent
+        result[i] = np.where(arr[i]>available_max, available_max, arr[i])
+    return result
+
+def softmax_rows(arr):
+    result = np.empty(arr.shape)
+    for i in range(arr.shape[0]):
+        result[i] = np.exp(arr[i]-np.nanmax(arr[i])) / np.nansum(np.exp(arr[i]-np.nanmax(arr[i])))
+    return result
+
+# name: (removed per-row python kernel, cs operator)
+CASES = {
+    "zscore": (zscore_rows, cs.zscore),
+    "winsorize": (lambda arr: winsorize_rows(arr, 4), lambda data: cs.winsorize(data, 4)),
+    "truncate": (lambda arr: truncate_rows(arr, 0.05), lambda data: cs.truncate(data, 0.05)),
+    "softmax": (softmax_rows, cs.softmax),
+}
+
+def best_of(repeat, function):
+    """Best wall time of function over repeat runs in seconds."""
+    seconds = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - begin)
+    return min(seconds)
+
+def run(operator, data, isVectorized):
+    cs.off_numba = False
+    cs.vectorized = isVectorized
+    return operator(data)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dates", type=int, default=5000)
+    parser.add_argument("--assets", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("names", nargs="*", default=list(CASES.keys()))
+    options = parser.parse_args()
+
+    manager = RayManager()
+    manager.set_progress(False)
+    manager.set_inline_threshold(2**62)
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(options.dates, options.assets))).mask(rng.uniform(size=(options.dates, options.assets)) < 0.006)
+    warmup = data.iloc[:10, :10]
+
+    print("{dates} dates x {assets} assets, one process, best of {repeat}".format(dates=options.dates, assets=options.assets, repeat=options.repeat))
+    print("{name:<10} {rows:>9} {numba:>9} {block:>9}".format(name="operator", rows="row loop", numba="numba", block="block"))
+    with np.errstate(all="ignore"):
+        for name in options.names:
+            rows, operator = CASES[name]
+            run(operator, warmup, False)
+            rows_seconds = best_of(options.repeat, lambda: rows(data.values))
+            numba_seconds = best_of(options.repeat, lambda: run(operator, data, False))
+            block_seconds = best_of(options.repeat, lambda: run(operator, data, True))
+            print("{name:<10} {rows:8.3f}s {numba:8.3f}s {block:8.3f}s".format(name=name, rows=rows_seconds, numba=numba_seconds, block=block_seconds))
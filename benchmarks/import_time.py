@@ -0,0 +1,40 @@
+"""Import time of the strategy modules and whether importing them pulls in ray.
+
+Every module is imported in a fresh interpreter, the best of --repeat runs is reported.
+
+    python benchmarks/import_time.py
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import sys, time
+begin = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - begin
+print(seconds, "ray" in sys.modules, "numba" in sys.modules)
+"""
+
+def measure(module, repeat):
+    """Best import time of module in seconds, with whether ray and numba were imported."""
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", SCRIPT.format(module=module)], cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        seconds, hasRay, hasNumba = float(output[0]), output[1] == "True", output[2] == "True"
+        if best is None or seconds < best[0]:
+            best = (seconds, hasRay, hasNumba)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=["pandas", "strategy.ts", "strategy.cs", "strategy.pi", "strategy.ti"])
+    options = parser.parse_args()
+
+    for module in options.modules:
+        seconds, hasRay, hasNumba = measure(module, options.repeat)
+        print("{module:<14} {seconds:6.3f}s  ray imported: {ray}  numba imported: {numba}".format(module=module, seconds=seconds, ray=hasRay, numba=hasNumba))
@@ -0,0 +1,72 @@
+"""Rolling Kendall tau of ts.corr_kendall against scipy.stats.kendalltau window by window.
+
+scipy runs on --scipy-assets assets and is scaled to the panel, both backends run in this process.
+
+    PYTHONPATH=. python benchmarks/kendall.py --assets 100 --days 2500 --lookback 250
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy.stats import kendalltau
+
+from strategy import ts
+from strategy.raymaster import RayManager
+
+def make_panel(number_of_days, number_of_assets, seed=0):
+    """Rounded random walks, so windows hold ties, and one regressor column."""
+    rng = np.random.default_rng(seed)
+    y = pd.DataFrame(np.round(np.cumsum(rng.normal(size=(number_of_days, number_of_assets)), axis=0), 1))
+    x = pd.DataFrame(np.round(np.cumsum(rng.normal(size=(number_of_days, 1)), axis=0), 1))
+    return y, x
+
+def scipy_kendall(y, x, lookback):
+    """kendalltau (tau-b) of every window of every column of y against x."""
+    result = np.full(y.shape, np.nan)
+    for j in range(y.shape[1]):
+        for i in range(lookback-1, y.shape[0]):
+            result[i, j] = kendalltau(y[i-lookback+1:i+1, j], x[i-lookback+1:i+1]).statistic
+    return result
+
+def best_of(repeat, function):
+    """Best wall time of function over repeat runs in seconds."""
+    seconds = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - begin)
+    return min(seconds)
+
+def corr_kendall(y, x, lookback, isNumba):
+    ts.off_numba = not isNumba
+    return ts.corr_kendall(y, x, lookback)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=100)
+    parser.add_argument("--days", type=int, default=2500)
+    parser.add_argument("--lookback", type=int, default=250)
+    parser.add_argument("--scipy-assets", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    manager = RayManager()
+    manager.set_progress(False)
+    manager.set_inline_threshold(2**62)
+
+    y, x = make_panel(options.days, options.assets)
+    corr_kendall(y.iloc[:50, :2], x.iloc[:50], 10, True)
+
+    begin = time.perf_counter()
+    reference = scipy_kendall(y.values[:, :options.scipy_assets], x.values[:, 0], options.lookback)
+    scipy_seconds = (time.perf_counter() - begin) * options.assets / options.scipy_assets
+    numpy_seconds = best_of(options.repeat, lambda: corr_kendall(y, x, options.lookback, False))
+    numba_seconds = best_of(options.repeat, lambda: corr_kendall(y, x, options.lookback, True))
+    difference = np.nanmax(np.abs(corr_kendall(y, x, options.lookback, True).values[:, :options.scipy_assets] - reference))
+
+    print("{assets} assets x {days} days, lookback {lookback}, best of {repeat}".format(assets=options.assets, days=options.days, lookback=options.lookback, repeat=options.repeat))
+    print("{name:<32} {seconds:8.3f}s".format(name="scipy kendalltau (scaled)", seconds=scipy_seconds))
+    print("{name:<32} {seconds:8.3f}s".format(name="ts.corr_kendall numpy", seconds=numpy_seconds))
+    print("{name:<32} {seconds:8.3f}s".format(name="ts.corr_kendall numba", seconds=numba_seconds))
+    print("max abs difference to scipy: {difference:.1e}".format(difference=difference))
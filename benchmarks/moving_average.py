@@ -0,0 +1,68 @@
+"""Prefix-sum pi.ma, pi.envelope and pi.bollinger against the removed per-window nanmean/nanstd loop.
+
+The loop runs on --loop-assets assets and is scaled to the panel, everything runs in this process.
+
+    PYTHONPATH=. python benchmarks/moving_average.py --days 3000 --assets 5000 --window 20
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from strategy import pi
+from strategy.raymaster import RayManager
+
+def window_loop(arr, window, isStd):
+    """nanmean (and nanstd) of a copy of every window, as the removed kernels did."""
+    mean = np.full(arr.shape, np.nan)
+    std = np.full(arr.shape, np.nan)
+    for j in range(arr.shape[1]):
+        for i in range(window, arr.shape[0] + 1):
+            _arr = arr[i-window:i, j].copy()
+            if np.sum(np.isnan(_arr)) == window:
+                continue
+            mean[i-1, j] = np.nanmean(_arr)
+            if isStd:
+                std[i-1, j] = np.nanstd(_arr)
+    return mean, std
+
+# name: (removed loop, prefix-sum indicator)
+CASES = {
+    "ma": (lambda arr, window: window_loop(arr, window, False), lambda data, window: pi.ma(data, window)),
+    "envelope": (lambda arr, window: window_loop(arr, window, False), lambda data, window: pi.envelope(data, window, 0.05)),
+    "bollinger": (lambda arr, window: window_loop(arr, window, True), lambda data, window: pi.bollinger(data, window, 2)),
+}
+
+def best_of(repeat, function):
+    """Best wall time of function over repeat runs in seconds."""
+    seconds = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - begin)
+    return min(seconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=3000)
+    parser.add_argument("--assets", type=int, default=5000)
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--loop-assets", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    manager = RayManager()
+    manager.set_progress(False)
+    manager.set_inline_threshold(2**62)
+
+    rng = np.random.default_rng(0)
+    close = pd.DataFrame(100*np.exp(np.cumsum(rng.normal(0, 0.02, (options.days, options.assets)), axis=0)))
+    close = close.mask(rng.uniform(size=close.shape) < 0.05)
+
+    print("{days} days x {assets} assets, window {window}, best of {repeat}".format(days=options.days, assets=options.assets, window=options.window, repeat=options.repeat))
+    print("{name:<10} {loop:>14} {prefix:>11} {speedup:>9}".format(name="indicator", loop="loop (scaled)", prefix="prefix-sum", speedup="speedup"))
+    for name, (loop, indicator) in CASES.items():
+        loop_seconds = best_of(1, lambda: loop(close.values[:, :options.loop_assets], options.window)) * options.assets / options.loop_assets
+        prefix_seconds = best_of(options.repeat, lambda: indicator(close, options.window))
+        print("{name:<10} {loop:13.2f}s {prefix:10.3f}s {speedup:8.0f}x".format(name=name, loop=loop_seconds, prefix=prefix_seconds, speedup=loop_seconds / prefix_seconds))
@@ -0,0 +1,78 @@
+"""Cost of progress reporting for a cs job dispatched through ray.
+
+Compares the removed scheme, one ProgressBarActor RPC per row, against chunk-level progress
+with the bar on and off and against running inline. The removed scheme is rebuilt here as a
+small actor and a row-by-row task, so it can still be measured.
+
+    PYTHONPATH=. python benchmarks/progress_overhead.py --dates 5000 --assets 300
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from strategy import cs
+from strategy.raymaster import RayManager, _import_ray
+from strategy import core_cs
+
+def best_of(repeat, function):
+    """Best wall time of function over repeat runs in seconds."""
+    seconds = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - begin)
+    return min(seconds)
+
+def per_row_actor(arr, num_batches):
+    """The removed scheme, every row sends pba.update.remote(1) to an actor."""
+    ray = _import_ray()
+
+    @ray.remote
+    class ProgressBarActor:
+        def __init__(self):
+            self.counter = 0
+
+        def update(self, num_items_completed):
+            self.counter += num_items_completed
+
+    @ray.remote
+    def task(pba, start, end, data):
+        result = np.empty((end - start, data.shape[1]))
+        for i in range(start, end):
+            result[i - start] = core_cs.cs_zscore_block(data[i:i+1])
+            pba.update.remote(1)
+        return result
+
+    pba = ProgressBarActor.remote()
+    data = ray.put(arr)
+    bounds = np.linspace(0, arr.shape[0], num_batches + 1).astype(int)
+    return np.concatenate(ray.get([task.remote(pba, start, end, data) for start, end in zip(bounds[:-1], bounds[1:])]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dates", type=int, default=5000)
+    parser.add_argument("--assets", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    data = pd.DataFrame(np.random.default_rng(0).normal(size=(options.dates, options.assets)))
+    manager = RayManager()
+
+    # Force ray dispatch and start the cluster outside of the timings
+    manager.set_inline_threshold(0)
+    cs.zscore(data)
+
+    timings = {}
+    timings["per-row actor (removed)"] = best_of(options.repeat, lambda: per_row_actor(data.values, cs.ray.batch))
+    manager.set_progress(True)
+    timings["chunk progress on"] = best_of(options.repeat, lambda: cs.zscore(data))
+    manager.set_progress(False)
+    timings["chunk progress off"] = best_of(options.repeat, lambda: cs.zscore(data))
+    manager.set_inline_threshold(options.dates*options.assets)
+    timings["inline"] = best_of(options.repeat, lambda: cs.zscore(data))
+
+    print("cs.zscore on {dates}x{assets}, {cpus} cpu, best of {repeat}".format(dates=options.dates, assets=options.assets, cpus=RayManager.num_cpus, repeat=options.repeat))
+    for name, seconds in timings.items():
+        print("{name:<24} {seconds:8.3f}s".format(name=name, seconds=seconds))
@@ -0,0 +1,58 @@
+"""pi.psar on the NumPy and numba backends over 10 years of daily bars.
+
+Both run in this process by default, --ray dispatches through the ray workers instead,
+numba is compiled and warmed up on a small panel first.
+
+    PYTHONPATH=. python benchmarks/psar.py --days 2520 --assets 3000
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from strategy import pi
+from strategy.raymaster import RayManager
+
+def make_bars(number_of_days, number_of_assets, seed=0):
+    """Random walk highs and lows with 2% missing bars."""
+    rng = np.random.default_rng(seed)
+    close = pd.DataFrame(100*np.exp(np.cumsum(rng.normal(0, 0.02, (number_of_days, number_of_assets)), axis=0)))
+    isMissing = rng.uniform(size=close.shape) < 0.02
+    high = (close*(1 + rng.uniform(0, 0.02, close.shape))).mask(isMissing)
+    low = (close*(1 - rng.uniform(0, 0.02, close.shape))).mask(isMissing)
+    return high, low
+
+def best_of(repeat, function):
+    """Best wall time of function over repeat runs in seconds."""
+    seconds = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - begin)
+    return min(seconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--assets", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ray", action="store_true")
+    options = parser.parse_args()
+
+    manager = RayManager()
+    manager.set_progress(False)
+    manager.set_inline_threshold(0 if options.ray else 2**62)
+
+    high, low = make_bars(options.days, options.assets)
+    # compile, and start ray when dispatching, outside of the timings
+    pi.psar(high.iloc[:, :4] if not options.ray else high, low.iloc[:, :4] if not options.ray else low, use_numba=True)
+
+    numpy_seconds = best_of(options.repeat, lambda: pi.psar(high, low, use_numba=False))
+    numba_seconds = best_of(options.repeat, lambda: pi.psar(high, low, use_numba=True))
+    result = [pi.psar(high, low, use_numba=isNumba)["psar"].values for isNumba in [False, True]]
+
+    print("{days} days x {assets} assets, {where}, best of {repeat}".format(days=options.days, assets=options.assets, where="ray" if options.ray else "one process", repeat=options.repeat))
+    print("{name:<8} {seconds:8.3f}s".format(name="numpy", seconds=numpy_seconds))
+    print("{name:<8} {seconds:8.3f}s".format(name="numba", seconds=numba_seconds))
+    print("backends identical: {same}".format(same=np.array_equal(result[0], result[1], equal_nan=True)))
@@ -0,0 +1,73 @@
+"""cs.rank and ts.rank against scipy.stats.rankdata, pd.DataFrame.rank and the numba per-window sort.
+
+Everything runs in this process, numba is compiled and warmed up on a small panel first.
+
+    PYTHONPATH=. python benchmarks/rank.py --dates 5000 --assets 3000 --lookback 250
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+from strategy import cs, ts
+from strategy import core_ts_numba
+from strategy.raymaster import RayMaster, RayManager
+
+METHODS = ["ordinal", "average", "min", "max", "dense"]
+
+def best_of(repeat, function):
+    """Best wall time of function over repeat runs in seconds."""
+    seconds = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - begin)
+    return min(seconds)
+
+def numba_ts_rank(data, lookback):
+    """The numba kernel sorting every window, ordinal ties."""
+    return RayMaster("ts_rank", 1, [data.values.T], 0, core_ts_numba.ts_rank, lookback).run()
+
+def make_panel(number_of_dates, number_of_assets, seed=0):
+    """Rounded normal values, so rows hold ties, with 5% nan."""
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(np.round(rng.normal(size=(number_of_dates, number_of_assets)), 2))
+    return data.mask(rng.uniform(size=data.shape) < 0.05)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dates", type=int, default=5000)
+    parser.add_argument("--assets", type=int, default=3000)
+    parser.add_argument("--lookback", type=int, default=250)
+    parser.add_argument("--ts-assets", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    manager = RayManager()
+    manager.set_progress(False)
+    manager.set_inline_threshold(2**62)
+
+    data = make_panel(options.dates, options.assets)
+    numba_ts_rank(data.iloc[:30, :3], 10)
+
+    print("cs.rank, {dates} dates x {assets} assets, best of {repeat}".format(dates=options.dates, assets=options.assets, repeat=options.repeat))
+    print("{method:<9} {rankdata:>9} {pandas:>9} {cs:>9}".format(method="method", rankdata="rankdata", pandas="pandas", cs="cs.rank"))
+    for method in METHODS:
+        rankdata_seconds = best_of(options.repeat, lambda: rankdata(data.values, method=method, axis=1, nan_policy="omit"))
+        pandas_seconds = best_of(options.repeat, lambda: data.rank(axis=1, method="first" if method == "ordinal" else method))
+        cs_seconds = best_of(options.repeat, lambda: cs.rank(data, method=method))
+        print("{method:<9} {rankdata:8.3f}s {pandas:8.3f}s {cs:8.3f}s".format(method=method, rankdata=rankdata_seconds, pandas=pandas_seconds, cs=cs_seconds))
+
+    panel = data.iloc[:, :options.ts_assets]
+    print()
+    print("ts.rank, {dates} dates x {assets} assets, lookback {lookback}, best of {repeat}".format(dates=options.dates, assets=options.ts_assets, lookback=options.lookback, repeat=options.repeat))
+    print("{method:<9} {pandas:>9} {numba:>9} {ts:>9}".format(method="method", pandas="pandas", numba="numba", ts="ts.rank"))
+    for method in METHODS:
+        pandas_seconds = best_of(options.repeat, lambda: panel.rolling(options.lookback).rank(method="average" if method in ["ordinal", "dense"] else method))
+        # the numba kernel only has ordinal ties
+        numba_seconds = "{seconds:8.3f}s".format(seconds=best_of(options.repeat, lambda: numba_ts_rank(panel, options.lookback))) if method == "ordinal" else "-"
+        ts_seconds = best_of(options.repeat, lambda: ts.rank(panel, options.lookback, method=method))
+        print("{method:<9} {pandas:8.3f}s {numba:>9} {ts:8.3f}s".format(method=method, pandas=pandas_seconds, numba=numba_seconds, ts=ts_seconds))
+    print("pandas rolling rank has no ordinal or dense method, its average is timed on those rows")
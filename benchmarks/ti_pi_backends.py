@@ -0,0 +1,67 @@
+"""NumPy against numba backend of the strategy.pi indicators taking use_numba.
+
+Both run in this process, numba is compiled and warmed up on a small panel first.
+
+    PYTHONPATH=. python benchmarks/ti_pi_backends.py --assets 5000 --days 3000
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from strategy import pi
+from strategy.raymaster import RayManager
+
+CASES = {
+    "ma": lambda b, use_numba: pi.ma(b["close"], 20, use_numba=use_numba),
+    "vama": lambda b, use_numba: pi.vama(b["close"], b["volume"], 20, use_numba=use_numba),
+    "imkkh": lambda b, use_numba: pi.imkkh(b["high"], b["low"], b["close"], use_numba=use_numba),
+    "bollinger": lambda b, use_numba: pi.bollinger(b["close"], 20, 2, use_numba=use_numba),
+    "cftpp": lambda b, use_numba: pi.cftpp(b["high"], b["low"], b["close"], use_numba=use_numba),
+    "dema": lambda b, use_numba: pi.dema(b["close"], 10, use_numba=use_numba),
+    "envelope": lambda b, use_numba: pi.envelope(b["close"], 20, 0.05, use_numba=use_numba),
+    "psar": lambda b, use_numba: pi.psar(b["high"], b["low"], use_numba=use_numba),
+    "ema": lambda b, use_numba: pi.ema(b["close"], 10, use_numba=use_numba),
+}
+
+def make_bars(number_of_days, number_of_assets, seed=0):
+    """Random walk bars with 5% missing days."""
+    rng = np.random.default_rng(seed)
+    close = pd.DataFrame(100*np.exp(np.cumsum(rng.normal(0, 0.02, (number_of_days, number_of_assets)), axis=0)))
+    high = close*(1 + rng.uniform(0, 0.02, close.shape))
+    low = close*(1 - rng.uniform(0, 0.02, close.shape))
+    volume = pd.DataFrame(rng.uniform(1e5, 1e6, close.shape))
+    isMissing = rng.uniform(size=close.shape) < 0.05
+    return {key: frame.mask(isMissing) for key, frame in {"high":high, "low":low, "close":close, "volume":volume}.items()}
+
+def best_of(repeat, function):
+    """Best wall time of function over repeat runs in seconds."""
+    seconds = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - begin)
+    return min(seconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("names", nargs="*", default=list(CASES.keys()))
+    options = parser.parse_args()
+
+    manager = RayManager()
+    manager.set_progress(False)
+    manager.set_inline_threshold(2**62)
+
+    warmup = make_bars(100, 4)
+    bars = make_bars(options.days, options.assets)
+    print("{assets} assets x {days} days, best of {repeat}".format(assets=options.assets, days=options.days, repeat=options.repeat))
+    print("{name:<10} {numpy:>9} {numba:>9}".format(name="kernel", numpy="numpy", numba="numba"))
+    for name in options.names:
+        CASES[name](warmup, True)
+        numpy_seconds = best_of(options.repeat, lambda: CASES[name](bars, False))
+        numba_seconds = best_of(options.repeat, lambda: CASES[name](bars, True))
+        print("{name:<10} {numpy:8.3f}s {numba:8.3f}s".format(name=name, numpy=numpy_seconds, numba=numba_seconds))
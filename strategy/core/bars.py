@@ -0,0 +1,84 @@
+import numpy as np
+
+### Bar-Local Expressions ###
+# Each value depends on its own bar, at most on the close of the bar before, so every function
+# is a handful of elementwise passes over whole panels of any layout, (assets, days) by default.
+# Nan propagates, a bar with a missing input is nan.
+
+def typical_price(high, low, close):
+    """(high + low + close) / 3."""
+    return (high + low + close) / 3
+
+def median_price(high, low):
+    """(high + low) / 2."""
+    return (high + low) / 2
+
+def pivot_points(high, low, close):
+    """Floor trader pivot point with its first and second resistances and supports.
+
+    Returns:
+        dict of np.array, pp, r1, s1, r2 and s2
+    """
+    pp_value = typical_price(high, low, close)
+    bar_range = high - low
+    return {
+        "pp":pp_value,
+        "r1":2*pp_value - low,
+        "s1":2*pp_value - high,
+        "r2":pp_value + bar_range,
+        "s2":pp_value - bar_range,
+    }
+
+def previous(arr, axis=1):
+    """Value of the bar before along axis, the first bar is nan."""
+    result = np.full(arr.shape, np.nan)
+    index = [slice(None)] * arr.ndim
+    index[axis] = slice(1, None)
+    source = [slice(None)] * arr.ndim
+    source[axis] = slice(None, -1)
+    result[tuple(index)] = arr[tuple(source)]
+    return result
+
+def true_range(high, low, close, axis=1):
+    """max(high, previous close) - min(low, previous close).
+
+    Note:
+        Where the previous close is missing, eg) the first bar, the true range is high - low.
+        A missing high or low is a missing true range.
+    """
+    previous_close = previous(close, axis)
+    previous_close = np.where(np.isnan(previous_close), low, previous_close)
+    return np.maximum(high, previous_close) - np.minimum(low, previous_close)
+
+def close_location_value(high, low, close):
+    """((close - low) - (high - close)) / (high - low), from -1 at the low to 1 at the high.
+
+    Note:
+        A bar without range is 0.
+    """
+    bar_range = high - low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(bar_range > 0, ((close - low) - (high - close)) / bar_range, np.where(np.isnan(bar_range), np.nan, 0))
+
+def candle(open, high, low, close):
+    """Body and shadows of every candle.
+
+    Returns:
+        dict of np.array
+            body: close - open, negative for a falling candle
+            upper_shadow: high - max(open, close)
+            lower_shadow: min(open, close) - low
+            range: high - low
+            body_ratio: |body| / range, nan for a bar without range
+    """
+    body = close - open
+    bar_range = high - low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        body_ratio = np.where(bar_range > 0, np.abs(body) / bar_range, np.nan)
+    return {
+        "body":body,
+        "upper_shadow":high - np.maximum(open, close),
+        "lower_shadow":np.minimum(open, close) - low,
+        "range":bar_range,
+        "body_ratio":body_ratio,
+    }
@@ -0,0 +1,121 @@
+import numpy as np
+from numba import jit_module
+
+### Hilbert Transform ###
+# Ehlers' homodyne discriminator: the smoothed price is detrended, split into its in-phase and
+# quadrature parts by a 7 tap Hilbert transform, and the phase change from bar to bar gives the
+# dominant cycle period. Every bar only needs the last seven values of each series.
+
+def _hilbert(series, t, adjusted_period):
+    """7 tap Hilbert transform of series at bar t, 0 before the taps are filled."""
+    if t < 6:
+        return 0.0
+    return (0.0962*series[t] + 0.5769*series[t-2] - 0.5769*series[t-4] - 0.0962*series[t-6])*adjusted_period
+
+def sinewave_inner(arr):
+    """MESA sine wave of one row.
+
+    Args:
+        arr (1d-np.array): price, one value per day
+
+    Returns:
+        sine, lead_sine as 1d-np.array, lead_sine leads by 45 degrees
+
+    Note:
+        Days with nan are skipped, the series runs over the days with a price. The first 63
+        prices are nan while the cycle estimate settles, the lookback of TA-Lib HT_SINE.
+    """
+    number_of_days = arr.shape[0]
+    sine = np.full(number_of_days, np.nan)
+    lead_sine = np.full(number_of_days, np.nan)
+
+    days = np.flatnonzero(~np.isnan(arr))
+    price = arr[days]
+    n = price.shape[0]
+    smooth = np.zeros(n)
+    detrender = np.zeros(n)
+    i1 = np.zeros(n)
+    q1 = np.zeros(n)
+
+    # sin and cos of k*360/p degrees for every whole period p up to 50
+    angle = np.radians(np.arange(51).reshape(51, 1)*360.0 / np.maximum(np.arange(51), 1).reshape(1, 51))
+    sin_table = np.sin(angle)
+    cos_table = np.cos(angle)
+
+    period = 0.0
+    smooth_period = 0.0
+    i2_previous = 0.0
+    q2_previous = 0.0
+    re_previous = 0.0
+    im_previous = 0.0
+    for t in range(n):
+        if t < 3:
+            smooth[t] = price[t]
+            continue
+        smooth[t] = (4*price[t] + 3*price[t-1] + 2*price[t-2] + price[t-3]) / 10
+        adjusted_period = 0.075*period + 0.54
+        detrender[t] = _hilbert(smooth, t, adjusted_period)
+        q1[t] = _hilbert(detrender, t, adjusted_period)
+        i1[t] = detrender[t-3]
+
+        # Advance the phases by 90 degrees
+        ji = _hilbert(i1, t, adjusted_period)
+        jq = _hilbert(q1, t, adjusted_period)
+        i2 = 0.2*(i1[t] - jq) + 0.8*i2_previous
+        q2 = 0.2*(q1[t] + ji) + 0.8*q2_previous
+
+        # Homodyne discriminator
+        re = 0.2*(i2*i2_previous + q2*q2_previous) + 0.8*re_previous
+        im = 0.2*(i2*q2_previous - q2*i2_previous) + 0.8*im_previous
+        i2_previous = i2
+        q2_previous = q2
+        re_previous = re
+        im_previous = im
+
+        last_period = period
+        if im != 0.0 and re != 0.0:
+            period = 360 / np.degrees(np.arctan(im / re))
+        period = min(max(period, 0.67*last_period), 1.5*last_period)
+        period = min(max(period, 6.0), 50.0)
+        period = 0.2*period + 0.8*last_period
+        smooth_period = 0.33*period + 0.67*smooth_period
+
+        # Phase of the dominant cycle
+        dc_period = int(smooth_period + 0.5)
+        real_part = 0.0
+        imag_part = 0.0
+        for k in range(min(dc_period, t+1)):
+            real_part += sin_table[k, dc_period]*smooth[t-k]
+            imag_part += cos_table[k, dc_period]*smooth[t-k]
+        dc_phase = 0.0
+        if abs(imag_part) > 0.0:
+            dc_phase = np.degrees(np.arctan(real_part / imag_part))
+        elif real_part < 0.0:
+            dc_phase = -90.0
+        elif real_part > 0.0:
+            dc_phase = 90.0
+        dc_phase += 90.0 + 360.0 / smooth_period
+        if imag_part < 0.0:
+            dc_phase += 180.0
+        if dc_phase > 315.0:
+            dc_phase -= 360.0
+
+        if t >= 63:
+            sine[days[t]] = np.sin(np.radians(dc_phase))
+            lead_sine[days[t]] = np.sin(np.radians(dc_phase + 45.0))
+
+    return sine, lead_sine
+
+def sinewave(arr):
+    """MESA sine wave of every row of an (assets, days) block.
+
+    Returns:
+        sine, lead_sine as 2d-np.array
+    """
+    sine = np.empty(arr.shape)
+    lead_sine = np.empty(arr.shape)
+    for j in range(arr.shape[0]):
+        sine[j], lead_sine[j] = sinewave_inner(arr[j])
+    return sine, lead_sine
+
+jit_module(nopython=True, cache=True)
@@ -0,0 +1,141 @@
+import numpy as np
+from numba import jit_module
+
+### Recursive Filters ###
+# First order IIR filter, state = alpha*x + (1-alpha)*state, the engine of every exponential average.
+
+def ew_filter_inner(arr, alpha, window):
+    """Exponential filter of one row.
+
+    Args:
+        arr (1d-np.array): row, one value per day
+        alpha (1d-np.array): smoothing factor, one per day or a single one for every day
+        window (int): seeding window
+
+    Returns:
+        1d-np.array
+
+    Note:
+        The filter is seeded on the first day from window-1 on whose window arr[i-window+1:i+1]
+        is not all nan, with the nanmean of that window. Afterwards a day with a nan value or
+        a nan alpha is nan and leaves the state as it was.
+    """
+    number_of_days = arr.shape[0]
+    result = np.full(number_of_days, np.nan)
+    window = max(window, 1)
+    isAdaptive = alpha.shape[0] > 1
+
+    isSeeded = False
+    state = 0.0
+    for i in range(number_of_days):
+        current = arr[i]
+        if not isSeeded:
+            if i == window - 1:
+                seed_window = arr[:window]
+                if np.sum(~np.isnan(seed_window)) > 0:
+                    state = np.nanmean(seed_window)
+                    isSeeded = True
+                    result[i] = state
+            elif i > window - 1 and not np.isnan(current):
+                # Every earlier window was empty, so this one holds only the current value
+                state = current
+                isSeeded = True
+                result[i] = state
+            continue
+
+        a = alpha[i] if isAdaptive else alpha[0]
+        if np.isnan(current) or np.isnan(a):
+            continue
+        state = a*current + (1-a)*state
+        result[i] = state
+
+    return result
+
+def ew_filter(arr, alpha, window):
+    """Exponential filter of every row.
+
+    Args:
+        arr (2d-np.array): (assets, days) block
+        alpha (2d-np.array): smoothing factor, (assets or 1, days or 1)
+        window (int): seeding window
+
+    Returns:
+        2d-np.array
+    """
+    result = np.empty(arr.shape)
+    for j in range(arr.shape[0]):
+        result[j] = ew_filter_inner(arr[j], alpha[j] if alpha.shape[0] > 1 else alpha[0], window)
+    return result
+
+def ew_resume_inner(arr, alpha, window, state, skip):
+    """Exponential filter of one row continuing from the state of an earlier run.
+
+    Args:
+        arr (1d-np.array): row, days already filtered followed by the new ones
+        alpha (1d-np.array): smoothing factor, one per day or a single one for every day
+        window (int): seeding window
+        state (float): filter state on the day before arr[skip], nan when it was not seeded yet
+        skip (int): number of leading days already filtered
+
+    Returns:
+        1d-np.array, nan on the skipped days
+
+    Note:
+        Without a state the row is filtered from its start like ew_filter_inner, which gives
+        the same values as the earlier run as long as arr holds window-1 days before skip.
+    """
+    if np.isnan(state):
+        return ew_filter_inner(arr, alpha, window)
+
+    number_of_days = arr.shape[0]
+    result = np.full(number_of_days, np.nan)
+    isAdaptive = alpha.shape[0] > 1
+    for i in range(skip, number_of_days):
+        a = alpha[i] if isAdaptive else alpha[0]
+        if np.isnan(arr[i]) or np.isnan(a):
+            continue
+        state = a*arr[i] + (1-a)*state
+        result[i] = state
+
+    return result
+
+def ew_resume(arr, alpha, window, state, skip):
+    """Exponential filter of every row continuing from the states of an earlier run.
+
+    Args:
+        arr (2d-np.array): (assets, days) block
+        alpha (2d-np.array): smoothing factor, (assets or 1, days or 1)
+        window (int): seeding window
+        state (1d-np.array): state of every row, nan where it was not seeded yet
+        skip (int): number of leading days already filtered
+
+    Returns:
+        2d-np.array
+    """
+    result = np.empty(arr.shape)
+    for j in range(arr.shape[0]):
+        result[j] = ew_resume_inner(arr[j], alpha[j] if alpha.shape[0] > 1 else alpha[0], window, state[j], skip)
+    return result
+
+def ew_cascade(arr, alpha, window, number_of_stages):
+    """Exponential filters applied one after another, every stage filters the previous stage.
+
+    Args:
+        arr (2d-np.array): (assets, days) block
+        alpha (float): smoothing factor of every stage
+        window (int): seeding window of every stage
+        number_of_stages (int): number of filters
+
+    Returns:
+        3d-np.array (stages, assets, days), stage k is the k+1 times filtered row
+    """
+    alphas = np.full(1, alpha)
+    result = np.empty((number_of_stages, arr.shape[0], arr.shape[1]))
+    for j in range(arr.shape[0]):
+        stage = arr[j]
+        for k in range(number_of_stages):
+            stage = ew_filter_inner(stage, alphas, window)
+            result[k, j] = stage
+    return result
+
+jit_module(nopython=True, cache=True)
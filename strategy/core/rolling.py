@@ -0,0 +1,116 @@
+import numpy as np
+from numba import jit_module
+
+### Rolling Extremes ###
+# Monotonic deque: the deque keeps the indices of the window whose values are still candidates,
+# so its front is the extreme of the window. Every index is pushed and popped once, O(1) amortized per day.
+
+def rolling_extreme_inner(arr, window, isMax):
+    """Trailing nanmax or nanmin of one row and the day it was set.
+
+    Args:
+        arr (1d-np.array): row, one value per day
+        window (int): window period
+        isMax (bool): True for the maximum, False for the minimum
+
+    Returns:
+        value (1d-np.array), position (1d-np.array of int, -1 where there is no value)
+
+    Note:
+        Day i covers arr[i-window+1:i+1], the first window-1 days and windows without any value
+        are nan. NaN is skipped like np.nanmax/np.nanmin. On ties the most recent day wins.
+    """
+    number_of_days = arr.shape[0]
+    value = np.full(number_of_days, np.nan)
+    position = np.full(number_of_days, -1, dtype=np.int64)
+    if window < 1:
+        return value, position
+
+    # Ring buffer of at most window indices
+    deque = np.empty(window, dtype=np.int64)
+    head = 0
+    size = 0
+    for i in range(number_of_days):
+        # Only the index that left the window can be expired
+        if size > 0 and deque[head] <= i - window:
+            head = (head + 1) % window
+            size -= 1
+
+        current = arr[i]
+        if not np.isnan(current):
+            while size > 0:
+                back = arr[deque[(head + size - 1) % window]]
+                if (isMax and back <= current) or ((not isMax) and back >= current):
+                    size -= 1
+                else:
+                    break
+            deque[(head + size) % window] = i
+            size += 1
+
+        if i >= window - 1 and size > 0:
+            value[i] = arr[deque[head]]
+            position[i] = deque[head]
+
+    return value, position
+
+def rolling_extreme(arr, window, isMax):
+    """Trailing nanmax or nanmin of every row.
+
+    Args:
+        arr (2d-np.array): (assets, days) block
+        window (int): window period
+        isMax (bool): True for the maximum, False for the minimum
+
+    Returns:
+        value (2d-np.array), position (2d-np.array of int, day index of the extreme, -1 where none)
+    """
+    value = np.empty(arr.shape)
+    position = np.empty(arr.shape, dtype=np.int64)
+    for j in range(arr.shape[0]):
+        value[j], position[j] = rolling_extreme_inner(arr[j], window, isMax)
+    return value, position
+
+def rolling_max(arr, window):
+    """Trailing nanmax of every row of an (assets, days) block."""
+    return rolling_extreme(arr, window, True)[0]
+
+def rolling_min(arr, window):
+    """Trailing nanmin of every row of an (assets, days) block."""
+    return rolling_extreme(arr, window, False)[0]
+
+### Rolling Deviations ###
+
+def rolling_mean_deviation_inner(arr, window):
+    """Trailing mean absolute deviation from the window mean of one row.
+
+    Note:
+        nanmean(|x - nanmean(x)|) over arr[i-window+1:i+1]. The mean moves every day, so each
+        window takes two passes over itself, O(window) per day.
+    """
+    number_of_days = arr.shape[0]
+    result = np.full(number_of_days, np.nan)
+    for i in range(window - 1, number_of_days):
+        count = 0
+        total = 0.0
+        for k in range(i - window + 1, i + 1):
+            if not np.isnan(arr[k]):
+                count += 1
+                total += arr[k]
+        if count == 0:
+            continue
+        mean = total / count
+        deviation = 0.0
+        for k in range(i - window + 1, i + 1):
+            if not np.isnan(arr[k]):
+                deviation += abs(arr[k] - mean)
+        result[i] = deviation / count
+    return result
+
+def rolling_mean_deviation(arr, window):
+    """Trailing mean absolute deviation of every row of an (assets, days) block."""
+    result = np.empty(arr.shape)
+    for j in range(arr.shape[0]):
+        result[j] = rolling_mean_deviation_inner(arr[j], window)
+    return result
+
+jit_module(nopython=True, cache=True)
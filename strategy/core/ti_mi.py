@@ -0,0 +1,705 @@
+
+import numpy as np
+
+from . import rolling
+from . import filters
+from . import bars
+from . import cycles
+from . ti_pi import _by_tiles, _lag, rolling_moments, rolling_sum, cumulative_sum, ema_block, projection_band_block
+
+### Gains and Losses ###
+
+def wilder_block(arr, window):
+    """Wilder smoothing of every row, an exponential filter with alpha 1/window seeded like ema."""
+    return filters.ew_filter(arr, np.full((1, 1), 1/window), window)
+
+def _gains_losses(close, momentum=1):
+    """Gains and losses of the close over momentum days, nan where the change is missing."""
+    change = close - _lag(close, momentum)
+    isValid = ~np.isnan(change)
+    return np.where(isValid, np.maximum(change, 0), np.nan), np.where(isValid, np.maximum(-change, 0), np.nan)
+
+def _on_changes(function, change, window, momentum=1):
+    """function(change, window) of changes over momentum days, from the first day holding one.
+
+    Note:
+        The first momentum days hold no change, so a window of changes first fills on day
+        momentum+window-1, eg) day 14 of a 14 day rsi as in TA-Lib.
+    """
+    result = np.full(change.shape, np.nan)
+    result[:,momentum:] = function(change[:,momentum:], window)
+    return result
+
+def _strength(gain, loss):
+    """100 * gain / (gain + loss), nan where there is neither."""
+    total = gain + loss
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100*np.where(total > 0, gain / total, np.nan)
+
+def rsi_block(close, window):
+    """Relative strength index of every row of a block.
+
+    Note:
+        Gains and losses of the close are Wilder smoothed. A window without any move is nan.
+    """
+    gain, loss = _gains_losses(close)
+    return _strength(_on_changes(wilder_block, gain, window), _on_changes(wilder_block, loss, window))
+
+def cmo_block(close, window):
+    """Chande momentum oscillator of every row of a block, from the plain sums of the window."""
+    gain, loss = _gains_losses(close)
+    return 2*_strength(_on_changes(rolling_sum, gain, window), _on_changes(rolling_sum, loss, window)) - 100
+
+def rmi_block(close, window, momentum):
+    """Relative momentum index of every row of a block, rsi of the change over momentum days."""
+    gain, loss = _gains_losses(close, momentum)
+    return _strength(_on_changes(wilder_block, gain, window, momentum), _on_changes(wilder_block, loss, window, momentum))
+
+def gain_loss_block(close, window, rmi_window, momentum):
+    """Rsi, cmo and rmi of every row of a block from one gain and loss stream.
+
+    Returns:
+        dict of 2d-np.array, rsi, cmo and rmi
+
+    Note:
+        rmi reuses the daily stream when momentum is 1 and takes its own changes otherwise.
+    """
+    gain, loss = _gains_losses(close)
+    rsi = _strength(_on_changes(wilder_block, gain, window), _on_changes(wilder_block, loss, window))
+    cmo = 2*_strength(_on_changes(rolling_sum, gain, window), _on_changes(rolling_sum, loss, window)) - 100
+    if momentum != 1:
+        gain, loss = _gains_losses(close, momentum)
+    rmi = _strength(_on_changes(wilder_block, gain, rmi_window, momentum), _on_changes(wilder_block, loss, rmi_window, momentum))
+    return {"rsi":rsi, "cmo":cmo, "rmi":rmi}
+
+def dynamic_momentum_block(close, window, std_window, average_window, min_window, max_window):
+    """Dynamic momentum index of every row of a block.
+
+    Note:
+        The rsi window of a day is window divided by the volatility ratio, the std of the close
+        over std_window over its average over average_window, floored and kept within
+        [min_window, max_window]. Gains and losses are summed over that window with running
+        sums so every day costs O(1) whatever its window.
+    """
+    number_of_rows, number_of_days = close.shape
+    std = rolling_moments(close, std_window)[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        period = np.clip(np.floor(window * rolling_moments(std, average_window, isStd=False)[0] / std), min_window, max_window)
+
+    gain, loss = _gains_losses(close)
+    head = np.zeros((number_of_rows, 1))
+    cumulative_gain = np.concatenate([head, np.cumsum(np.nan_to_num(gain), axis=1)], axis=1)
+    cumulative_loss = np.concatenate([head, np.cumsum(np.nan_to_num(loss), axis=1)], axis=1)
+
+    days = np.arange(number_of_days)
+    isPeriod = ~np.isnan(period) & (days >= period)
+    first = np.where(isPeriod, days + 1 - np.nan_to_num(period), 0).astype(np.int64)
+    gain_sum = cumulative_gain[:,1:] - np.take_along_axis(cumulative_gain, first, axis=1)
+    loss_sum = cumulative_loss[:,1:] - np.take_along_axis(cumulative_loss, first, axis=1)
+    return np.where(isPeriod, _strength(gain_sum, loss_sum), np.nan)
+
+### Ranges ###
+
+def _range_position(high, low, close, window):
+    """Where close sits between the trailing lowest low (0) and highest high (1).
+
+    Note:
+        A window without range, eg) a halted price, is nan.
+    """
+    highest = rolling.rolling_max(high, window)
+    lowest = rolling.rolling_min(low, window)
+    spread = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(spread > 0, (close - lowest) / spread, np.nan)
+
+def stochastic_block(high, low, close, k_window, d_window):
+    """Stochastic %K and %D of every row of a block."""
+    k_value = 100*_range_position(high, low, close, k_window)
+    return {"k":k_value, "d":rolling_moments(k_value, d_window, isStd=False)[0]}
+
+def stochastics_block(high, low, close, k_window, d_window, slow_window):
+    """Fast and slow stochastic and williams %R of every row of a block from one range pass.
+
+    Returns:
+        dict of 2d-np.array, k, d, slow_k, slow_d and williams_percent_r
+
+    Note:
+        The slow %K is the fast %D and the slow %D its moving average over slow_window.
+    """
+    result = stochastic_block(high, low, close, k_window, d_window)
+    result["slow_k"] = result["d"]
+    result["slow_d"] = rolling_moments(result["d"], slow_window, isStd=False)[0]
+    result["williams_percent_r"] = result["k"] - 100
+    return result
+
+def williams_percent_r_block(high, low, close, window):
+    """Williams %R of every row of a block."""
+    return 100*_range_position(high, low, close, window) - 100
+
+def ultimate_oscillator_block(high, low, close, short_window, medium_window, long_window):
+    """Ultimate oscillator of every row of a block.
+
+    Note:
+        Buying pressure close - min(low, previous close) over the true range, summed over the
+        three windows and weighted 4:2:1.
+    """
+    buying_pressure = close - np.fmin(low, bars.previous(close))
+    true_range = bars.true_range(high, low, close)
+    weighted = 0
+    for weight, window in ((4, short_window), (2, medium_window), (1, long_window)):
+        range_sum = rolling_sum(true_range, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weighted = weighted + weight*np.where(range_sum > 0, rolling_sum(buying_pressure, window) / range_sum, np.nan)
+    return 100*weighted / 7
+
+def range_indicator_block(high, low, close, window, smoothing):
+    """Range indicator of every row of a block.
+
+    Note:
+        The true range over the close change on up days and the true range itself otherwise,
+        its stochastic over window and an ema of smoothing days.
+    """
+    change = close - bars.previous(close)
+    true_range = bars.true_range(high, low, close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(change > 0, true_range / change, np.where(np.isnan(change), np.nan, true_range))
+    return ema_block(100*_range_position(ratio, ratio, ratio, window), smoothing)
+
+def smi_block(high, low, close, window, first_smoothing, second_smoothing, signal_window):
+    """Stochastic momentum index of every row of a block.
+
+    Note:
+        The close against the middle of the trailing range, double smoothed and scaled by the
+        double smoothed half range.
+    """
+    highest = rolling.rolling_max(high, window)
+    lowest = rolling.rolling_min(low, window)
+    relative = ema_block(ema_block(close - (highest + lowest) / 2, first_smoothing), second_smoothing)
+    spread = ema_block(ema_block(highest - lowest, first_smoothing), second_smoothing)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        smi = np.where(spread > 0, 200*relative / spread, np.nan)
+    return {"smi":smi, "signal":ema_block(smi, signal_window)}
+
+def rwi_block(high, low, close, window):
+    """Random walk index of every row of a block.
+
+    Note:
+        The move over k days against the average true range of k days times sqrt(k), the
+        highest over k from 2 to window. Every k takes its true range sum from one running
+        sum. The first window days are nan.
+    """
+    number_of_days = high.shape[1]
+    true_range = bars.true_range(high, low, close)
+    isRange = ~np.isnan(true_range)
+    head = np.zeros((high.shape[0], 1))
+    cumulative_range = np.concatenate([head, np.cumsum(np.where(isRange, true_range, 0), axis=1)], axis=1)
+    cumulative_count = np.concatenate([head, np.cumsum(isRange, axis=1)], axis=1)
+
+    result = {"high":np.full(high.shape, np.nan), "low":np.full(high.shape, np.nan)}
+    for k in range(2, min(window, number_of_days-1)+1):
+        count = cumulative_count[:,k+1:] - cumulative_count[:,1:-k]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = (cumulative_range[:,k+1:] - cumulative_range[:,1:-k]) / count*np.sqrt(k)
+            scale = np.where(count > 0, scale, np.nan)
+            result["high"][:,k:] = np.fmax(result["high"][:,k:], np.where(scale > 0, (high[:,k:] - low[:,:-k]) / scale, np.nan))
+            result["low"][:,k:] = np.fmax(result["low"][:,k:], np.where(scale > 0, (high[:,:-k] - low[:,k:]) / scale, np.nan))
+    for key in result.keys():
+        result[key][:,:window] = np.nan
+    return result
+
+def mass_index_block(high, low, window, sum_window):
+    """Mass index of every row of a block, the sum of ema(range) / ema(ema(range))."""
+    stages = filters.ew_cascade(high - low, 2/(1+window), window, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return rolling_sum(stages[0] / stages[1], sum_window)
+
+def projection_block(high, low, close, window):
+    """Projection bandwidth and oscillator of every row of a block from one projection band."""
+    band = projection_band_block(high, low, window)
+    spread = band["upper"] - band["lower"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "bandwidth":200*spread / (band["upper"] + band["lower"]),
+            "oscillator":np.where(spread > 0, 100*(close - band["lower"]) / spread, np.nan),
+        }
+
+### Oscillators ###
+
+def disparity_block(close, window):
+    """Disparity of every row of a block, 100 * close / moving average."""
+    return 100*close / rolling_moments(close, window, isStd=False)[0]
+
+def dpo_block(close, window):
+    """Detrended price oscillator of every row of a block.
+
+    Note:
+        The close window//2+1 days ago minus today's moving average, no day after today is used.
+    """
+    return _lag(close, window//2 + 1) - rolling_moments(close, window, isStd=False)[0]
+
+def pop_block(close, fast_window, slow_window):
+    """Price oscillator percent of every row of a block, the gap of two emas in percent."""
+    slow = ema_block(close, slow_window)
+    return 100*(ema_block(close, fast_window) - slow) / slow
+
+def imi_block(open, close, window):
+    """Intraday momentum index of every row of a block, rsi of close - open summed over the window."""
+    body = close - open
+    isValid = ~np.isnan(body)
+    gain = np.where(isValid, np.maximum(body, 0), np.nan)
+    loss = np.where(isValid, np.maximum(-body, 0), np.nan)
+    return _strength(rolling_sum(gain, window), rolling_sum(loss, window))
+
+def eom_block(high, low, volume, window, volume_scale):
+    """Arms' ease of movement of every row of a block.
+
+    Note:
+        The move of the median price over the box ratio, volume / volume_scale over the range,
+        averaged over the window. A bar without volume is nan.
+    """
+    median_price = bars.median_price(high, low)
+    move = median_price - bars.previous(median_price)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ease = np.where(volume > 0, move*(high - low)*volume_scale / volume, np.nan)
+    return rolling_moments(ease, window, isStd=False)[0]
+
+def chaikin_oscillator_block(high, low, close, volume, fast_window, slow_window):
+    """Chaikin oscillator of every row of a block, the gap of two emas of the A/D line."""
+    adl = cumulative_sum(bars.close_location_value(high, low, close)*volume)
+    return ema_block(adl, fast_window) - ema_block(adl, slow_window)
+
+def nvi_block(close, volume, base):
+    """Negative volume index of every row of a block.
+
+    Note:
+        Starts at base and follows the close only on days the volume falls.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(volume < bars.previous(volume), close / bars.previous(close), 1)
+    factor = np.where(np.isnan(factor), 1, factor)
+    return np.where(np.isnan(close), np.nan, base*np.cumprod(factor, axis=1))
+
+def asi_block(open, high, low, close, limit_move):
+    """Wilder's accumulation swing index of every row of a block.
+
+    Note:
+        The swing index of a bar is 50 * (C - Cp + (C - O)/2 + (Cp - Op)/4) / R * K / limit_move,
+        R depending on which of |H - Cp|, |L - Cp| and H - L is the largest and K the larger
+        of the first two. A bar with R = 0 swings 0.
+    """
+    previous_open = bars.previous(open)
+    previous_close = bars.previous(close)
+    high_gap = np.abs(high - previous_close)
+    low_gap = np.abs(low - previous_close)
+    bar_range = high - low
+    body = np.abs(previous_close - previous_open)
+    r_value = np.where((high_gap >= low_gap) & (high_gap >= bar_range), high_gap - low_gap/2 + body/4,
+        np.where((low_gap >= high_gap) & (low_gap >= bar_range), low_gap - high_gap/2 + body/4, bar_range + body/4))
+    r_value = np.where(np.isnan(high_gap + low_gap + bar_range + body), np.nan, r_value)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        swing = 50*(close - previous_close + (close - open)/2 + (previous_close - previous_open)/4) / r_value * np.fmax(high_gap, low_gap) / limit_move
+    swing = np.where(r_value > 0, swing, np.where(np.isnan(r_value), np.nan, 0))
+    return cumulative_sum(swing)
+
+def ko_block(high, low, close, volume, fast_window, slow_window, signal_window):
+    """Klinger oscillator of every row of a block.
+
+    Note:
+        The trend is up when high + low + close rises. The cumulative measurement cm adds up
+        the ranges while the trend holds and restarts from the last two ranges when it flips,
+        so days are walked one by one with every asset of the block moving together. A bar
+        with a missing input is nan and leaves cm as it was.
+    """
+    number_of_rows, number_of_days = close.shape
+    hlc = high + low + close
+    trend = np.where(hlc > bars.previous(hlc), 1.0, -1.0)
+    trend = np.where(np.isnan(hlc) | np.isnan(bars.previous(hlc)), np.nan, trend)
+    dm = high - low
+
+    volume_force = np.full(close.shape, np.nan)
+    last_trend = np.full(number_of_rows, np.nan)
+    last_dm = np.full(number_of_rows, np.nan)
+    cm = np.full(number_of_rows, np.nan)
+    for i in range(number_of_days):
+        isBar = ~(np.isnan(trend[:,i]) | np.isnan(dm[:,i]) | np.isnan(volume[:,i]))
+        next_cm = np.where(np.isnan(cm), dm[:,i], np.where(trend[:,i] == last_trend, cm + dm[:,i], last_dm + dm[:,i]))
+        cm = np.where(isBar, next_cm, cm)
+        last_trend = np.where(isBar, trend[:,i], last_trend)
+        last_dm = np.where(isBar, dm[:,i], last_dm)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            force = volume[:,i]*np.abs(2*(dm[:,i] / cm - 1))*trend[:,i]*100
+        volume_force[:,i] = np.where(isBar & (cm > 0), force, np.nan)
+
+    ko_value = ema_block(volume_force, fast_window) - ema_block(volume_force, slow_window)
+    return {"ko":ko_value, "signal":ema_block(ko_value, signal_window)}
+
+def mesa_sinewave_block(arr):
+    """MESA sine wave of every row of a block.
+
+    Returns:
+        dict of 2d-np.array, sine and lead_sine
+    """
+    sine, lead_sine = cycles.sinewave(arr)
+    return {"sine":sine, "lead_sine":lead_sine}
+
+### Momentum Indicators ###
+
+def disparity(pba, start, end, data, *args):
+    """Inner function to calulate disparity.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:1], disparity_block, window)
+
+def asi(pba, start, end, data, *args):
+    """Inner function to calulate accumulation swing index.
+
+    Args:
+        data (list[2d-np.array]): open, high, low and close, (assets, days)
+        *args (tuple): delivers function settings, limit_move
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    limit_move = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:4], asi_block, limit_move)
+
+def eom(pba, start, end, data, *args):
+    """Inner function to calulate ease of movement.
+
+    Args:
+        data (list[2d-np.array]): high, low and volume, (assets, days)
+        *args (tuple): delivers function settings, window and volume_scale
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    volume_scale = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:3], eom_block, window, volume_scale)
+
+def chaikin_oscillator(pba, start, end, data, *args):
+    """Inner function to calulate chaikin oscillator.
+
+    Args:
+        data (list[2d-np.array]): high, low, close and volume, (assets, days)
+        *args (tuple): delivers function settings, fast and slow windows
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    fast_window = args[0][0]
+    slow_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:4], chaikin_oscillator_block, fast_window, slow_window)
+
+def gain_loss(pba, start, end, data, *args):
+    """Inner function to calulate rsi, cmo and rmi together.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window, rmi_window and momentum
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), rsi, cmo and rmi
+    """
+    window = args[0][0]
+    rmi_window = args[0][1]
+    momentum = args[0][2]
+
+    return _by_tiles(pba, start, end, data[:1], gain_loss_block, window, rmi_window, momentum)
+
+def cmo(pba, start, end, data, *args):
+    """Inner function to calulate chande momentum oscillator.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:1], cmo_block, window)
+
+def dpo(pba, start, end, data, *args):
+    """Inner function to calulate detrended price oscillator.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:1], dpo_block, window)
+
+def dmi(pba, start, end, data, *args):
+    """Inner function to calulate dynamic momentum index.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window, std_window, average_window, min_window and max_window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    std_window = args[0][1]
+    average_window = args[0][2]
+    min_window = args[0][3]
+    max_window = args[0][4]
+
+    return _by_tiles(pba, start, end, data[:1], dynamic_momentum_block, window, std_window, average_window, min_window, max_window)
+
+def imi(pba, start, end, data, *args):
+    """Inner function to calulate intraday momentum index.
+
+    Args:
+        data (list[2d-np.array]): open and close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:2], imi_block, window)
+
+def ko(pba, start, end, data, *args):
+    """Inner function to calulate klinger oscillator.
+
+    Args:
+        data (list[2d-np.array]): high, low, close and volume, (assets, days)
+        *args (tuple): delivers function settings, fast, slow and signal windows
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), ko and signal
+    """
+    fast_window = args[0][0]
+    slow_window = args[0][1]
+    signal_window = args[0][2]
+
+    result = ko_block(*[np.asarray(each_data[start:end], dtype=np.float64) for each_data in data[:4]], fast_window, slow_window, signal_window)
+    # tqdm update
+    pba.update(end-start)
+
+    return result
+
+def mass_index(pba, start, end, data, *args):
+    """Inner function to calulate mass index.
+
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, window and sum_window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    sum_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:2], mass_index_block, window, sum_window)
+
+def mesa_sinewave(pba, start, end, data, *args):
+    """Inner function to calulate MESA sine wave.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), sine and lead_sine
+    """
+    return _by_tiles(pba, start, end, data[:1], mesa_sinewave_block)
+
+def nvi(pba, start, end, data, *args):
+    """Inner function to calulate negative volume index.
+
+    Args:
+        data (list[2d-np.array]): close and volume, (assets, days)
+        *args (tuple): delivers function settings, base
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    base = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:2], nvi_block, base)
+
+def pop(pba, start, end, data, *args):
+    """Inner function to calulate price oscillator percent.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, fast and slow windows
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    fast_window = args[0][0]
+    slow_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], pop_block, fast_window, slow_window)
+
+def projection(pba, start, end, data, *args):
+    """Inner function to calulate projection bandwidth and oscillator.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), bandwidth and oscillator
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:3], projection_block, window)
+
+def range_indicator(pba, start, end, data, *args):
+    """Inner function to calulate range indicator.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window and smoothing
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    smoothing = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:3], range_indicator_block, window, smoothing)
+
+def rmi(pba, start, end, data, *args):
+    """Inner function to calulate relative momentum index.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window and momentum
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    momentum = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], rmi_block, window, momentum)
+
+def rsi(pba, start, end, data, *args):
+    """Inner function to calulate relative strength index.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:1], rsi_block, window)
+
+def rwi(pba, start, end, data, *args):
+    """Inner function to calulate random walk index.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), high and low
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:3], rwi_block, window)
+
+def smi(pba, start, end, data, *args):
+    """Inner function to calulate stochastic momentum index.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window, first and second smoothing and signal window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), smi and signal
+    """
+    window = args[0][0]
+    first_smoothing = args[0][1]
+    second_smoothing = args[0][2]
+    signal_window = args[0][3]
+
+    return _by_tiles(pba, start, end, data[:3], smi_block, window, first_smoothing, second_smoothing, signal_window)
+
+def stochastic(pba, start, end, data, *args):
+    """Inner function to calulate stochastic.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, k_window and d_window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), k and d
+    """
+    k_window = args[0][0]
+    d_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:3], stochastic_block, k_window, d_window)
+
+def stochastics(pba, start, end, data, *args):
+    """Inner function to calulate fast and slow stochastic and williams %R together.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, k_window, d_window and slow_window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), k, d, slow_k, slow_d and williams_percent_r
+    """
+    k_window = args[0][0]
+    d_window = args[0][1]
+    slow_window = args[0][2]
+
+    return _by_tiles(pba, start, end, data[:3], stochastics_block, k_window, d_window, slow_window)
+
+def ultimate_oscillator(pba, start, end, data, *args):
+    """Inner function to calulate ultimate oscillator.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, short, medium and long windows
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    short_window = args[0][0]
+    medium_window = args[0][1]
+    long_window = args[0][2]
+
+    return _by_tiles(pba, start, end, data[:3], ultimate_oscillator_block, short_window, medium_window, long_window)
+
+def williams_percent_r(pba, start, end, data, *args):
+    """Inner function to calulate williams %R.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:3], williams_percent_r_block, window)
@@ -1,37 +1,379 @@
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
-def ma(pba, start, end, data, *args):
-    """Inner function to calulate rank.
+from . import rolling
+from . import filters
+from . import bars
+
+### Prefix Sums ###
+# Kernels walk their rows tile by tile, a tile holds about tile_bytes of history
+# so the few passes over it run on cached rows.
+tile_bytes = 1024 * 1024
+
+def _by_tiles(pba, start, end, data, function, *args):
+    """Run a block function over the rows [start:end] tile by tile.
 
     Args:
-        data (2d-np.array): array, length is window period
+        data (list[2d-np.array]): asset-major panels (assets, days)
+        function (callable): block function, takes the tiles of every panel and *args
+
+    Returns:
+        2d-np.array or dict of 2d-np.array of the block (end-start, days)
+    """
+    number_of_days = data[0].shape[1]
+    height = max(1, tile_bytes // (8*max(number_of_days, 1)))
+
+    result = None
+    for a in range(start, end, height):
+        b = min(a+height, end)
+        tile = function(*[np.asarray(each_data[a:b], dtype=np.float64) for each_data in data], *args)
+        if result is None:
+            if type(tile) == dict:
+                result = {key: np.empty((end-start, number_of_days)) for key in tile.keys()}
+            else:
+                result = np.empty((end-start, number_of_days))
+        if type(tile) == dict:
+            for key in tile.keys():
+                result[key][a-start:b-start] = tile[key]
+        else:
+            result[a-start:b-start] = tile
+        # tqdm update
+        pba.update(b-a)
+
+    if result is None:
+        result = np.empty((0, number_of_days))
+    return result
+
+def _segment_sums(arr, window):
+    """Sums of every trailing window along the rows, split at segment bounds.
+
+    Args:
+        arr (2d-np.array): (rows, days) block, days are cut into segments of window days
         window (int): window period
-        *args (tuple): delivers function settings
-    
+
     Returns:
-        2d-np.array
+        head, tail as 2d-np.array (rows, days-window+1), column k is the window ending on day
+        k+window-1, head sums its days in the segment of that last day, tail the rest
+
+    Note:
+        The prefix sums restart at every segment, so they never grow past one window. A window
+        spans at most two segments, its head is a prefix and its tail what follows day t-window
+        in the previous segment.
     """
-    data = data[0]
-    window = args[0][0]
+    number_of_rows, number_of_days = arr.shape
+    number_of_segments = -(-number_of_days // window)
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-    number_of_days = result.shape[1] + 1
+    padded = np.zeros((number_of_rows, number_of_segments*window), dtype=arr.dtype)
+    padded[:,:number_of_days] = arr
+    prefix = np.cumsum(padded.reshape(number_of_rows, number_of_segments, window), axis=2)
+    rest = (prefix[:,:,-1:] - prefix).reshape(number_of_rows, -1)
+    prefix = prefix.reshape(number_of_rows, -1)
 
-    for j in range(start, end):
-        arr = data[j]
-        for i in range(window, number_of_days):
-            _arr = arr[i-window:i].copy()
-            if np.sum(np.isnan(_arr)) == window:
-                continue
-            else:
-                result[j,i-1] = np.nanmean(_arr)
-        # tqdm update
-        pba.update.remote(1)
+    head = prefix[:,window-1:number_of_days]
+    tail = np.zeros_like(head)
+    tail[:,1:] = rest[:,:number_of_days-window]
+    return head, tail
+
+def rolling_moments(arr, window, isStd=True):
+    """Trailing nanmean and nanstd of every row.
+
+    Args:
+        arr (2d-np.array): (assets, days) block
+        window (int): window period
+        isStd (bool): also compute the population standard deviation
+
+    Returns:
+        mean, std as 2d-np.array the size of arr, std is None unless isStd
+
+    Note:
+        Same as np.nanmean/np.nanstd over arr[j, i-window+1:i+1], the first window-1 days
+        and windows without any value are nan. Counts, sums and sums of squares come from
+        segment-wise prefix sums, every segment shifted by its own mean, and the two parts of
+        a window are moved onto the center of its last segment before they are added, so
+        the sums stay on the scale of the window no matter how long the history or how far
+        the price has trended. Windows whose variance still cancels out, eg) a single value
+        or a halted price, are recomputed from the window itself.
+    """
+    mean = np.full(arr.shape, np.nan)
+    std = np.full(arr.shape, np.nan) if isStd else None
+    number_of_rows, number_of_days = arr.shape
+    if window < 1 or window > number_of_days:
+        return mean, std
+
+    # Segment centers, an empty segment takes the one before it
+    number_of_segments = -(-number_of_days // window)
+    padded = np.full((number_of_rows, number_of_segments*window), np.nan)
+    padded[:,:number_of_days] = arr
+    padded = padded.reshape(number_of_rows, number_of_segments, window)
+    isValid = ~np.isnan(padded)
+    segment_count = isValid.sum(axis=2)
+    center = np.where(isValid, padded, 0).sum(axis=2) / np.maximum(segment_count, 1)
+    last = np.maximum.accumulate(np.where(segment_count > 0, np.arange(number_of_segments), 0), axis=1)
+    center = np.take_along_axis(center, last, axis=1)
+
+    isValid = isValid.reshape(number_of_rows, -1)[:,:number_of_days]
+    shifted = np.where(isValid, arr - np.repeat(center, window, axis=1)[:,:number_of_days], 0)
+
+    count_head, count_tail = _segment_sums(isValid.astype(np.int64), window)
+    sum_head, sum_tail = _segment_sums(shifted, window)
+
+    # Offset of the previous segment center from the window's own
+    segment = np.arange(window-1, number_of_days) // window
+    window_center = center[:,segment]
+    offset = center[:,np.maximum(segment-1, 0)] - window_center
+
+    count = count_head + count_tail
+    isAny = count > 0
+    count = np.where(isAny, count, 1)
+
+    shifted_mean = (sum_head + sum_tail + count_tail*offset) / count
+    mean[:,window-1:] = np.where(isAny, shifted_mean + window_center, np.nan)
+    if isStd:
+        square_head, square_tail = _segment_sums(shifted*shifted, window)
+        square_mean = (square_head + square_tail + offset*(2*sum_tail + count_tail*offset)) / count
+        variance = np.maximum(square_mean - shifted_mean*shifted_mean, 0)
+        # Nearly flat windows lose their variance to cancellation, those few are recomputed directly
+        rows, columns = np.nonzero(isAny & (variance <= 1e-8*square_mean))
+        if rows.size > 0:
+            windows = sliding_window_view(arr, window, axis=1)[rows, columns]
+            variance[rows, columns] = np.nanvar(windows, axis=1)
+        std[:,window-1:] = np.where(isAny, np.sqrt(variance), np.nan)
+    return mean, std
+
+def rolling_sum(arr, window):
+    """Trailing nansum of every row.
+
+    Returns:
+        2d-np.array the size of arr, the first window-1 days and windows without any value are nan
+    """
+    result = np.full(arr.shape, np.nan)
+    if window < 1 or window > arr.shape[1]:
+        return result
+
+    isValid = ~np.isnan(arr)
+    count_head, count_tail = _segment_sums(isValid.astype(np.int64), window)
+    sum_head, sum_tail = _segment_sums(np.where(isValid, arr, 0), window)
+    result[:,window-1:] = np.where(count_head + count_tail > 0, sum_head + sum_tail, np.nan)
+    return result
+
+def cumulative_sum(arr, base=0):
+    """Running nansum of every row starting from base, nan on the days arr is nan.
+
+    Args:
+        arr (2d-np.array): (assets, days) block
+        base (float or 2d-np.array): value before the first day, (assets, 1) for one per row
+    """
+    return np.where(np.isnan(arr), np.nan, base + np.nancumsum(arr, axis=1))
+
+def ma_block(arr, window):
+    """Moving average of every row of a block."""
+    return rolling_moments(arr, window, isStd=False)[0]
+
+def envelope_block(arr, window, width):
+    """Envelope of every row of a block."""
+    ma_value = rolling_moments(arr, window, isStd=False)[0]
+    return {"upper":ma_value*(1 + width), "lower":ma_value*(1 - width)}
+
+def bollinger_block(arr, window, sigma):
+    """Bollinger band of every row of a block."""
+    ma_value, std_value = rolling_moments(arr, window)
+    return {"upper":ma_value + sigma*std_value, "lower":ma_value - sigma*std_value}
+
+### Rolling Extremes ###
+
+def _midpoint(high, low, window):
+    """Middle of the trailing highest high and lowest low."""
+    return (rolling.rolling_max(high, window) + rolling.rolling_min(low, window)) / 2
+
+def _lag(arr, days):
+    """Shift every row days later, the first days are nan."""
+    result = np.full(arr.shape, np.nan)
+    if days < arr.shape[1]:
+        result[:,days:] = arr[:,:arr.shape[1]-days]
+    return result
+
+def imkkh_block(high, low, close, tenkan_window, kijun_window, senkou2_window, chikou_window):
+    """Ichimoku lines of every row of a block."""
+    tenkan_value = _midpoint(high, low, tenkan_window)
+    kijun_value = _midpoint(high, low, kijun_window)
+    return {
+        "tenkan":tenkan_value,
+        "kijun":kijun_value,
+        "senkou1":(tenkan_value + kijun_value) / 2,
+        "senkou2":_midpoint(high, low, senkou2_window),
+        "chikou":_lag(close, chikou_window),
+    }
+
+def price_channel_block(high, low, window):
+    """Price channel of every row of a block, the window ends the day before."""
+    return {"upper":_lag(rolling.rolling_max(high, window), 1), "lower":_lag(rolling.rolling_min(low, window), 1)}
+
+def donchian_block(high, low, window):
+    """Donchian channel of every row of a block, the window ends on the day."""
+    upper = rolling.rolling_max(high, window)
+    lower = rolling.rolling_min(low, window)
+    return {"upper":upper, "middle":(upper + lower) / 2, "lower":lower}
+
+### Linear Regression ###
+
+def rolling_regression(arr, window, ahead=0):
+    """Least squares line of every trailing window, valued ahead days after the window's last day.
 
+    Returns:
+        2d-np.array the size of arr, the first window-1 days and windows with a nan are nan
+
+    Note:
+        The value is a fixed linear combination of the window, so the whole block is one
+        product with the window view.
+    """
+    result = np.full(arr.shape, np.nan)
+    if window < 2 or window > arr.shape[1]:
+        return result
+
+    x = np.arange(window, dtype=np.float64)
+    x_mean = x.mean()
+    weights = 1/window + (window - 1 + ahead - x_mean)*(x - x_mean) / np.sum((x - x_mean)**2)
+    result[:,window-1:] = sliding_window_view(arr, window, axis=1) @ weights
+    return result
+
+def projection_band_block(high, low, window):
+    """Projection band of every row of a block.
+
+    Note:
+        Every high of the window is carried to the last day along the least squares slope of
+        the highs, the upper band is the highest of them, the lower band likewise with the
+        lows. Windows with a nan give nan.
+    """
+    result = {"upper":np.full(high.shape, np.nan), "lower":np.full(high.shape, np.nan)}
+    if window < 2 or window > high.shape[1]:
+        return result
+
+    x = np.arange(window, dtype=np.float64)
+    weights = (x - x.mean()) / np.sum((x - x.mean())**2)
+    days_back = window - 1 - x
+    for arr, key, extreme in ((high, "upper", np.max), (low, "lower", np.min)):
+        windows = sliding_window_view(arr, window, axis=1)
+        slope = windows @ weights
+        result[key][:,window-1:] = extreme(windows + slope[:,:,None]*days_back, axis=2)
     return result
 
+### Exponential Filters ###
+
+def ema_block(arr, window):
+    """Exponential moving average of every row of a block, alpha is 2/(1+window)."""
+    return filters.ew_filter(arr, np.full((1, 1), 2/(1+window)), window)
+
+def dema_block(arr, window):
+    """Double exponential moving average of every row of a block."""
+    stages = filters.ew_cascade(arr, 2/(1+window), window, 2)
+    return 2*stages[0] - stages[1]
+
+def tema_block(arr, window):
+    """Triple exponential moving average of every row of a block."""
+    stages = filters.ew_cascade(arr, 2/(1+window), window, 3)
+    return 3*stages[0] - 3*stages[1] + stages[2]
+
+def t3_block(arr, window, volume_factor):
+    """Tillson T3 of every row of a block.
+
+    Note:
+        T3 applies GD(x) = (1+v)*ema(x) - v*ema(ema(x)) three times, which expands to a
+        weighted sum of the last four of six cascaded emas.
+    """
+    v = volume_factor
+    stages = filters.ew_cascade(arr, 2/(1+window), window, 6)
+    return (-v**3)*stages[5] + (3*v**2 + 3*v**3)*stages[4] + (-6*v**2 - 3*v - 3*v**3)*stages[3] + (1 + 3*v + 3*v**2 + v**3)*stages[2]
+
+def vidya_block(arr, window, cmo_window):
+    """Variable index dynamic average of every row of a block.
+
+    Note:
+        alpha of a day is 2/(1+window) scaled by the absolute Chande momentum oscillator of
+        the last cmo_window price changes. Days without an oscillator keep the state.
+    """
+    change = np.full(arr.shape, np.nan)
+    change[:,1:] = arr[:,1:] - arr[:,:-1]
+    up_mean = rolling_moments(np.where(np.isnan(change), np.nan, np.maximum(change, 0)), cmo_window, isStd=False)[0]
+    down_mean = rolling_moments(np.where(np.isnan(change), np.nan, np.maximum(-change, 0)), cmo_window, isStd=False)[0]
+
+    total = up_mean + down_mean
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cmo = np.where(total > 0, (up_mean - down_mean) / total, total)
+    return filters.ew_filter(arr, 2/(1+window)*np.abs(cmo), window)
+
+### Parabolic SAR ###
+
+def psar_block(high, low, af, max_af):
+    """Parabolic stop and reversal of every row of a block.
+
+    Note:
+        Same rules as core.ti_pi_numba_inner.psar_inner. Days are walked one by one and every
+        asset of the block moves together, its state being a handful of arrays over assets.
+    """
+    number_of_rows, number_of_days = high.shape
+    result = {"psar":np.full(high.shape, np.nan), "trend":np.full(high.shape, np.nan)}
+
+    count = np.zeros(number_of_rows, dtype=np.int64)
+    isUp = np.ones(number_of_rows, dtype=bool)
+    sar = np.zeros(number_of_rows)
+    extreme_point = np.zeros(number_of_rows)
+    af_value = np.full(number_of_rows, float(af))
+    high1, high2, low1, low2 = [np.zeros(number_of_rows) for _ in range(4)]
+    for i in range(number_of_days):
+        h = high[:,i]
+        l = low[:,i]
+        isBar = ~(np.isnan(h) | np.isnan(l))
+        isInit = isBar & (count == 1)
+        isStep = isBar & (count == 2)
+
+        # Trend of the second bar
+        isInitUp = high1 < h
+        init_sar = np.where(isInitUp, np.minimum(low1, l), np.maximum(high1, h))
+        init_extreme = np.where(isInitUp, np.maximum(high1, h), np.minimum(low1, l))
+
+        # Every later bar, sar never crosses the last two bars
+        step_sar = sar + af_value*(extreme_point - sar)
+        step_sar = np.where(isUp, np.minimum(step_sar, np.minimum(low1, low2)), np.maximum(step_sar, np.maximum(high1, high2)))
+        isReversal = np.where(isUp, l < step_sar, h > step_sar)
+        isExtreme = ~isReversal & np.where(isUp, h > extreme_point, l < extreme_point)
+        step_extreme = np.where(isReversal, np.where(isUp, l, h), np.where(isExtreme, np.where(isUp, h, l), extreme_point))
+        step_sar = np.where(isReversal, extreme_point, step_sar)
+        step_af = np.where(isReversal, af, np.where(isExtreme, np.minimum(af_value + af, max_af), af_value))
+
+        sar = np.where(isInit, init_sar, np.where(isStep, step_sar, sar))
+        extreme_point = np.where(isInit, init_extreme, np.where(isStep, step_extreme, extreme_point))
+        af_value = np.where(isInit, af, np.where(isStep, step_af, af_value))
+        isUp = np.where(isInit, isInitUp, np.where(isStep, isUp ^ isReversal, isUp))
+
+        isOutput = isInit | isStep
+        result["psar"][:,i] = np.where(isOutput, sar, np.nan)
+        result["trend"][:,i] = np.where(isOutput, np.where(isUp, 1.0, -1.0), np.nan)
+
+        high2 = np.where(isBar, high1, high2)
+        low2 = np.where(isBar, low1, low2)
+        high1 = np.where(isBar, h, high1)
+        low1 = np.where(isBar, l, low1)
+        count = np.where(isBar, np.minimum(count + 1, 2), count)
+
+    return result
+
+### Price Indicators ###
+
+def ma(pba, start, end, data, *args):
+    """Inner function to calulate moving average.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:1], ma_block, window)
+
 def vama(pba, start, end, data, *args):
     """Inner function to calulate rank.
 
@@ -43,8 +385,8 @@ def vama(pba, start, end, data, *args):
     Returns:
         2d-np.array
     """
-    data = data[0]
     volume = data[1]
+    data = data[0]
     window = args[0][0]
 
     result = np.zeros_like(data)
@@ -64,288 +406,264 @@ def vama(pba, start, end, data, *args):
             else:
                 result[j,i-1] = np.nansum(_arr * _arr_vol) / np.nansum(_arr_vol)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
 def imkkh(pba, start, end, data, *args):
-    """Inner function to calulate rank.
-    """
-    high = data[0]
-    low = data[1]
-    close = data[2]
+    """Inner function to calulate ichimoku.
 
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, tenkan, kijun, senkou2 and chikou windows
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), tenkan, kijun, senkou1, senkou2 and chikou
+
+    Note:
+        Every line is dated the day its inputs are known. Senkou spans are not shifted ahead
+        and chikou is the close chikou_window days before.
+    """
     tenkan_window = args[0][0]
     kijun_window = args[0][1]
     senkou2_window = args[0][2]
     chikou_window = args[0][3]
-    window = np.max(tenkan_window, kijun_window, senkou2_window, chikou_window)
 
-    result = np.zeros_like(close)
-    result[start:end,:] = np.nan
-    number_of_days = result.shape[1] + 1
+    return _by_tiles(pba, start, end, data[:3], imkkh_block, tenkan_window, kijun_window, senkou2_window, chikou_window)
 
-    result = {"tenkan":result.copy(), "kijun":result.copy(), "senkou2":result.copy(), "chikou":result.copy()}
+def bollinger(pba, start, end, data, *args):
+    """Inner function to calulate bollinger band.
 
-    for j in range(start, end):
-        arr_high = high[j]
-        arr_low = low[j]
-        arr_close = close[j]
-        for i in range(window, number_of_days):
-            _arr_high = arr_high[i-window:i].copy()
-            _arr_low = arr_low[i-window:i].copy()
-            _arr_close = arr_close[i-window:i].copy()
-            if np.sum(np.isnan(_arr_high)) == window:
-                continue
-            elif np.sum(np.isnan(_arr_low)) == window:
-                continue
-            elif np.sum(np.isnan(_arr_close)) == window:
-                continue
-            else:
-                tenkan_value = (np.nanmax(_arr_high[i-tenkan_window:i]) + np.nanmin(_arr_low[i-tenkan_window:i])) / 2 
-                kijun_value = (np.nanmax(_arr_high[i-kijun_window:i]) + np.nanmin(_arr_low[i-kijun_window:i])) / 2 
-                result["tenkan"][j,i-1] = tenkan_value
-                result["kijun"][j,i-1] = kijun_value
-                result["senkou1"][j,i-1] = (tenkan_value + kijun_value) / 2
-                result["senkou2"][j,i-1] = (np.nanmax(_arr_high[i-senkou2_window:i]) + np.nanmin(_arr_low[i-senkou2_window:i])) / 2 
-                result["chikou"][j,i-1] = _arr_close[-chikou_window]
-        # tqdm update
-        pba.update.remote(1)
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window and sigma
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), upper and lower
+    """
+    window = args[0][0]
+    sigma = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], bollinger_block, window, sigma)
+
+def cftpp(pba, start, end, data, *args):
+    """Inner function to calulate chicago floor traders pivotal point.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), pp, r1, s1, r2 and s2
+    """
+    result = bars.pivot_points(data[0][start:end], data[1][start:end], data[2][start:end])
+    # tqdm update
+    pba.update(end-start)
 
     return result
 
-def bollinger(pba, start, end, data, *args):
-    """Inner function to calulate rank.
+cftpp.bar_local = True
+
+def dema(pba, start, end, data, *args):
+    """Inner function to calulate double exponential moving average.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
     """
-    data = data[0]
     window = args[0][0]
-    sigma = args[0][1]
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-    number_of_days = result.shape[1] + 1
+    return _by_tiles(pba, start, end, data[:1], dema_block, window)
 
-    result = {"upper":result.copy(), "lower":result.copy()}
+def envelope(pba, start, end, data, *args):
+    """Inner function to calulate envelope.
 
-    for j in range(start, end):
-        arr = data[j]
-        for i in range(window, number_of_days):
-            _arr = arr[i-window:i].copy()
-            if np.sum(np.isnan(_arr)) == window:
-                continue
-            else:
-                ma_value = np.nanmean(_arr)
-                std_value = np.nanstd(_arr)
-                result["upper"][j,i-1] = ma_value + sigma*std_value
-                result["lower"][j,i-1] = ma_value - sigma*std_value
-        # tqdm update
-        pba.update.remote(1)
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window and width
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), upper and lower
+    """
+    window = args[0][0]
+    width = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], envelope_block, window, width)
+
+def psar(pba, start, end, data, *args):
+    """Inner function to calulate parabolic stop and reversal.
+
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, af and max_af
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), psar and trend
+    """
+    af = args[0][0]
+    max_af = args[0][1]
+
+    result = psar_block(np.asarray(data[0][start:end], dtype=np.float64), np.asarray(data[1][start:end], dtype=np.float64), af, max_af)
+    # tqdm update
+    pba.update(end-start)
 
     return result
 
-def cftpp(pba, start, end, data, *args):
-    """Inner function to calulate rank.
+def price_channel(pba, start, end, data, *args):
+    """Inner function to calulate price channel.
+
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), upper and lower
     """
-    high = data[0]
-    low = data[1]
-    close = data[2]
-    window = 1
+    window = args[0][0]
 
-    result = np.zeros_like(close)
-    result[start:end,:] = np.nan
-    number_of_days = result.shape[1] + 1
+    return _by_tiles(pba, start, end, data[:2], price_channel_block, window)
 
-    result_dict = {"pp":result.copy(), "r1":result.copy(), "s1":result.copy(), "r2":result.copy(), "s2":result.copy()}
+def donchian(pba, start, end, data, *args):
+    """Inner function to calulate donchian channel.
 
-    for j in range(start, end):
-        arr_high = high[j]
-        arr_low = low[j]
-        arr_close = close[j]
-        for i in range(window, number_of_days):
-            _arr_high = arr_high[i-window:i].copy()
-            _arr_low = arr_low[i-window:i].copy()
-            _arr_close = arr_close[i-window:i].copy()
-            if np.sum(np.isnan(_arr_high)) == window:
-                continue
-            elif np.sum(np.isnan(_arr_low)) == window:
-                continue
-            elif np.sum(np.isnan(_arr_close)) == window:
-                continue
-            else:
-                pp_value = (_arr_high[-1] + _arr_low[-1] + _arr_close[-1]) / 3
-                result_dict["pp"][j,i-1] = pp_value
-                result_dict["r1"][j,i-1] = 2*pp_value - _arr_low[0]
-                result_dict["s1"][j,i-1] = 2*pp_value - _arr_high[0]
-                result_dict["r2"][j,i-1] = pp_value + (_arr_high[0] - _arr_low[0])
-                result_dict["s2"][j,i-1] = pp_value - (_arr_high[0] - _arr_low[0])
-        # tqdm update
-        pba.update.remote(1)
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, window
 
-    return result_dict
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), upper, middle and lower
+    """
+    window = args[0][0]
 
-def dema(pba, start, end, data, *args):
-    """Inner function to calulate rank.
+    return _by_tiles(pba, start, end, data[:2], donchian_block, window)
+
+def projection_band(pba, start, end, data, *args):
+    """Inner function to calulate projection band.
+
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), upper and lower
     """
-    data = data[0]
     window = args[0][0]
-    multiplier = 2/(1+window)
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-    number_of_days = result.shape[1] + 1
+    return _by_tiles(pba, start, end, data[:2], projection_band_block, window)
 
-    for j in range(start, end):
-        arr = data[j]
-        isFirst = True
-        for i in range(window, number_of_days):
-            _arr = arr[i-window:i].copy()
-            if np.sum(np.isnan(_arr)) == window:
-                continue
-            elif isFirst:
-                result[j,i-1] = np.nanmean(_arr)
-                isFirst = False
-            else:
-                ema_before = result[j,i-2]
-                ema_current = multiplier*_arr[-1] + (1-multiplier)*ema_before
-                result[j,i-1] = 2*ema_current - (multiplier*ema_current + (1-multiplier)*ema_before)
+def t3(pba, start, end, data, *args):
+    """Inner function to calulate T3.
 
-        # tqdm update
-        pba.update.remote(1)
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window and volume factor
 
-    return result
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    volume_factor = args[0][1]
 
-def envelope(pba, start, end, data, *args):
-    """Inner function to calulate rank.
+    return _by_tiles(pba, start, end, data[:1], t3_block, window, volume_factor)
+
+def tema(pba, start, end, data, *args):
+    """Inner function to calulate triple exponential moving average.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
     """
-    data = data[0]
     window = args[0][0]
-    width = args[0][1]
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-    number_of_days = result.shape[1] + 1
+    return _by_tiles(pba, start, end, data[:1], tema_block, window)
 
-    result = {"upper":result.copy(), "lower":result.copy()}
+def vidya(pba, start, end, data, *args):
+    """Inner function to calulate variable index dynamic average.
 
-    for j in range(start, end):
-        arr = data[j]
-        for i in range(window, number_of_days):
-            _arr = arr[i-window:i].copy()
-            if np.sum(np.isnan(_arr)) == window:
-                continue
-            else:
-                ma_value = np.nanmean(_arr)
-                result["upper"][j,i-1] = ma_value*(1 + width)
-                result["lower"][j,i-1] = ma_value*(1 - width)
-        # tqdm update
-        pba.update.remote(1)
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window and cmo window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    cmo_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], vidya_block, window, cmo_window)
+
+### Bar-Local Indicators ###
+# Kernels marked bar_local are elementwise over the whole block. RayMaster runs them in this
+# process, they are bound by memory bandwidth and shipping panels to workers costs more.
+
+def typical_price(pba, start, end, data, *args):
+    """Inner function to calulate typical price.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    result = bars.typical_price(data[0][start:end], data[1][start:end], data[2][start:end])
+    # tqdm update
+    pba.update(end-start)
 
     return result
 
-def psar(pba, start, end, data, *args):
-    """Inner function to calulate rank.
+typical_price.bar_local = True
+
+def true_range(pba, start, end, data, *args):
+    """Inner function to calulate true range.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+
+    Returns:
+        2d-np.array of the block (end-start, days)
     """
-    high = data[0]
-    low = data[1]
-    af = args[0][0]
-    af_value = args[0][0]
-    max_af = args[0][1]
-    window = 2
-    
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-    number_of_days = result.shape[1] + 1
+    result = bars.true_range(data[0][start:end], data[1][start:end], data[2][start:end])
+    # tqdm update
+    pba.update(end-start)
 
-    result = {"psar":result.copy(), "trend":result.copy()}
+    return result
 
-    for j in range(start, end):
-        arr_high = high[j]
-        arr_low = low[j]
-        isFirst = True
-        high_price_trend_list = []
-        low_price_trend_list = []
-        for i in range(number_of_days):
-            _arr_high = arr_high[i-window:i].copy()
-            _arr_low = arr_low[i-window:i].copy()
-            if np.sum(np.isnan(_arr_high)) == window:
-                continue
-            elif np.sum(np.isnan(_arr_low)) == window:
-                continue
-            elif isFirst:
-                if _arr_high[0] < _arr_high[-1]:
-                    isUpTrend = True
-                    result["psar"][j,i-1] = np.nanmin(_arr_low)
-                    result["trend"][j,i-1] = 1
-                    extreme_point = np.nanmax(_arr_high)
-                else:
-                    isUpTrend = False
-                    result["psar"][j,i-1] = np.nanmax(_arr_high)
-                    result["trend"][j,i-1] = -1
-                    extreme_point = np.nanmin(_arr_low)
-                isFirst = False
-            else:
-                psar_before = result["psar"][j,i-2]
-                psar_current = psar_before + af*(extreme_point - psar_before)
-                if isUpTrend:
-                    if psar_current > _arr_low[-1]:
-                        psar_current = np.nanmax(high_price_trend_list)
-                        extreme_point = _arr_low[-1]
-                        af_value = af
-                        high_price_trend_list = []
-                        result["trend"][j,i-1] = -1
-                    else:
-                        extreme_point = np.nanmax(extreme_point, _arr_high[-1])
-                        af_value = np.max(af_value+af, max_af)
-                        high_price_trend_list.append(_arr_high[-1])
-                        result["trend"][j,i-1] = 1
-                else:
-                    if psar_current < _arr_high[-1]:
-                        psar_current = np.nanmin(low_price_trend_list)
-                        extreme_point = _arr_high[-1]
-                        af_value = af
-                        low_price_trend_list = []
-                        result["trend"][j,i-1] = 1
-                    else:
-                        extreme_point = np.nanmin(extreme_point, _arr_low[-1])
-                        af_value = np.max(af_value+af, max_af)
-                        low_price_trend_list.append(_arr_low[-1])
-                        result["trend"][j,i-1] = -1
-
-                result["psar"][j,i-2] = psar_current
-                    
-        # tqdm update
-        pba.update.remote(1)
+true_range.bar_local = True
+
+def candle(pba, start, end, data, *args):
+    """Inner function to calulate candle body and shadows.
+
+    Args:
+        data (list[2d-np.array]): open, high, low and close, (assets, days)
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), body, upper_shadow, lower_shadow, range and body_ratio
+    """
+    result = bars.candle(data[0][start:end], data[1][start:end], data[2][start:end], data[3][start:end])
+    # tqdm update
+    pba.update(end-start)
 
     return result
 
+candle.bar_local = True
+
 ### Additionals ###
 
 def ema(pba, start, end, data, *args):
-    """Inner function to calulate rank.
-    """
-    data = data[0]
-    window = args[0][0]
-    multiplier = 2/(1+window)
+    """Inner function to calulate exponential moving average.
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-    number_of_days = result.shape[1] + 1
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window
 
-    for j in range(start, end):
-        arr = data[j]
-        isFirst = True
-        for i in range(window, number_of_days):
-            _arr = arr[i-window:i].copy()
-            if np.sum(np.isnan(_arr)) == window:
-                continue
-            elif isFirst:
-                result[j,i-1] = np.nanmean(_arr)
-                isFirst = False
-            else:
-                ema_before = result[j,i-2]
-                ema_current = multiplier*_arr[-1] + (1-multiplier)*ema_before
-                result[j,i-1] = ema_current
-        # tqdm update
-        pba.update.remote(1)
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
 
-    return result
+    return _by_tiles(pba, start, end, data[:1], ema_block, window)
@@ -0,0 +1,227 @@
+import numpy as np
+
+from . import ti_pi_numba_inner
+from . import filters
+
+### Price Indicators ###
+
+def ma(pba, start, end, data, *args):
+    """Inner function to calulate moving average.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    data = data[0]
+    window = args[0][0]
+
+    result = np.empty((end-start, data.shape[1]))
+    for j in range(start, end):
+        result[j-start] = ti_pi_numba_inner.rolling_moments_inner(np.asarray(data[j], dtype=np.float64), window, False)[0]
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def vama(pba, start, end, data, *args):
+    """Inner function to calulate volume adjusted moving average.
+
+    Args:
+        data (list[2d-np.array]): price and volume, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    volume = data[1]
+    data = data[0]
+    window = args[0][0]
+
+    result = np.empty((end-start, data.shape[1]))
+    for j in range(start, end):
+        result[j-start] = ti_pi_numba_inner.vama_inner(np.asarray(data[j], dtype=np.float64), np.asarray(volume[j], dtype=np.float64), window)
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def imkkh(pba, start, end, data, *args):
+    """Inner function to calulate ichimoku.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, tenkan, kijun, senkou2 and chikou windows
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), tenkan, kijun, senkou1, senkou2 and chikou
+    """
+    high = data[0]
+    low = data[1]
+    close = data[2]
+    tenkan_window = args[0][0]
+    kijun_window = args[0][1]
+    senkou2_window = args[0][2]
+    chikou_window = args[0][3]
+
+    shape = (end-start, close.shape[1])
+    result = {"tenkan":np.empty(shape), "kijun":np.empty(shape), "senkou1":np.empty(shape), "senkou2":np.empty(shape), "chikou":np.full(shape, np.nan)}
+    for j in range(start, end):
+        arr_high = np.asarray(high[j], dtype=np.float64)
+        arr_low = np.asarray(low[j], dtype=np.float64)
+        result["tenkan"][j-start] = ti_pi_numba_inner.midpoint_inner(arr_high, arr_low, tenkan_window)
+        result["kijun"][j-start] = ti_pi_numba_inner.midpoint_inner(arr_high, arr_low, kijun_window)
+        result["senkou1"][j-start] = (result["tenkan"][j-start] + result["kijun"][j-start]) / 2
+        result["senkou2"][j-start] = ti_pi_numba_inner.midpoint_inner(arr_high, arr_low, senkou2_window)
+        if chikou_window < shape[1]:
+            result["chikou"][j-start, chikou_window:] = close[j, :shape[1]-chikou_window]
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def bollinger(pba, start, end, data, *args):
+    """Inner function to calulate bollinger band.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window and sigma
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), upper and lower
+    """
+    data = data[0]
+    window = args[0][0]
+    sigma = args[0][1]
+
+    shape = (end-start, data.shape[1])
+    result = {"upper":np.empty(shape), "lower":np.empty(shape)}
+    for j in range(start, end):
+        ma_value, std_value = ti_pi_numba_inner.rolling_moments_inner(np.asarray(data[j], dtype=np.float64), window, True)
+        result["upper"][j-start] = ma_value + sigma*std_value
+        result["lower"][j-start] = ma_value - sigma*std_value
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def cftpp(pba, start, end, data, *args):
+    """Inner function to calulate chicago floor traders pivotal point.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), pp, r1, s1, r2 and s2
+    """
+    high = data[0]
+    low = data[1]
+    close = data[2]
+
+    shape = (end-start, close.shape[1])
+    keys = ["pp", "r1", "s1", "r2", "s2"]
+    result = {key:np.empty(shape) for key in keys}
+    for j in range(start, end):
+        lines = ti_pi_numba_inner.cftpp_inner(np.asarray(high[j], dtype=np.float64), np.asarray(low[j], dtype=np.float64), np.asarray(close[j], dtype=np.float64))
+        for k, key in enumerate(keys):
+            result[key][j-start] = lines[k]
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def dema(pba, start, end, data, *args):
+    """Inner function to calulate double exponential moving average.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    data = data[0]
+    window = args[0][0]
+
+    result = np.empty((end-start, data.shape[1]))
+    for j in range(start, end):
+        result[j-start] = ti_pi_numba_inner.dema_inner(np.asarray(data[j], dtype=np.float64), window)
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def envelope(pba, start, end, data, *args):
+    """Inner function to calulate envelope.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window and width
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), upper and lower
+    """
+    data = data[0]
+    window = args[0][0]
+    width = args[0][1]
+
+    shape = (end-start, data.shape[1])
+    result = {"upper":np.empty(shape), "lower":np.empty(shape)}
+    for j in range(start, end):
+        ma_value = ti_pi_numba_inner.rolling_moments_inner(np.asarray(data[j], dtype=np.float64), window, False)[0]
+        result["upper"][j-start] = ma_value*(1 + width)
+        result["lower"][j-start] = ma_value*(1 - width)
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def psar(pba, start, end, data, *args):
+    """Inner function to calulate parabolic stop and reversal.
+
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, af and max_af
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), psar and trend
+    """
+    high = data[0]
+    low = data[1]
+    af = args[0][0]
+    max_af = args[0][1]
+
+    shape = (end-start, high.shape[1])
+    result = {"psar":np.empty(shape), "trend":np.empty(shape)}
+    for j in range(start, end):
+        result["psar"][j-start], result["trend"][j-start] = ti_pi_numba_inner.psar_inner(np.asarray(high[j], dtype=np.float64), np.asarray(low[j], dtype=np.float64), af, max_af)
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+### Additionals ###
+
+def ema(pba, start, end, data, *args):
+    """Inner function to calulate exponential moving average.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    data = data[0]
+    window = args[0][0]
+    alpha = np.full(1, 2/(1+window))
+
+    result = np.empty((end-start, data.shape[1]))
+    for j in range(start, end):
+        result[j-start] = filters.ew_filter_inner(np.asarray(data[j], dtype=np.float64), alpha, window)
+        # tqdm update
+        pba.update(1)
+
+    return result
@@ -0,0 +1,248 @@
+import numpy as np
+from numba import jit_module
+
+from . rolling import rolling_extreme_inner
+from . filters import ew_filter_inner
+
+### Moving Windows ###
+# Running sums are updated by the day that enters and the day that leaves the window, and
+# recomputed from the window itself every window days so rounding never piles up.
+
+def rolling_moments_inner(arr, window, isStd):
+    """Trailing nanmean and nanstd of one row.
+
+    Args:
+        arr (1d-np.array): row, one value per day
+        window (int): window period
+        isStd (bool): also compute the population standard deviation
+
+    Returns:
+        mean, std as 1d-np.array, std stays nan unless isStd
+
+    Note:
+        Same as np.nanmean/np.nanstd over arr[i-window+1:i+1], the first window-1 days and
+        windows without any value are nan. Sums are kept around the mean of the window of the
+        last restart so they stay on the scale of the window, and windows whose variance
+        cancels out are recomputed from the window itself, like core.ti_pi.rolling_moments.
+    """
+    number_of_days = arr.shape[0]
+    mean = np.full(number_of_days, np.nan)
+    std = np.full(number_of_days, np.nan)
+    if window < 1 or window > number_of_days:
+        return mean, std
+
+    center = 0.0
+    count = 0
+    total = 0.0
+    square = 0.0
+    for i in range(number_of_days):
+        if i % window == 0:
+            # Exact restart from the window ending on day i
+            count = 0
+            total = 0.0
+            for k in range(max(i-window+1, 0), i+1):
+                if not np.isnan(arr[k]):
+                    count += 1
+                    total += arr[k]
+            center = total / count if count > 0 else center
+            total = 0.0
+            square = 0.0
+            for k in range(max(i-window+1, 0), i+1):
+                if not np.isnan(arr[k]):
+                    total += arr[k] - center
+                    square += (arr[k] - center)**2
+        else:
+            current = arr[i]
+            if not np.isnan(current):
+                count += 1
+                total += current - center
+                square += (current - center)**2
+            if i >= window:
+                leaving = arr[i-window]
+                if not np.isnan(leaving):
+                    count -= 1
+                    total -= leaving - center
+                    square -= (leaving - center)**2
+
+        if i < window-1 or count == 0:
+            continue
+        shifted_mean = total / count
+        mean[i] = shifted_mean + center
+        if isStd:
+            square_mean = square / count
+            variance = max(square_mean - shifted_mean*shifted_mean, 0.0)
+            if variance <= 1e-8*square_mean:
+                # Nearly flat window, two passes over the window itself
+                window_mean = 0.0
+                for k in range(i-window+1, i+1):
+                    if not np.isnan(arr[k]):
+                        window_mean += arr[k]
+                window_mean /= count
+                variance = 0.0
+                for k in range(i-window+1, i+1):
+                    if not np.isnan(arr[k]):
+                        variance += (arr[k] - window_mean)**2
+                variance /= count
+            std[i] = np.sqrt(variance)
+
+    return mean, std
+
+def vama_inner(arr, volume, window):
+    """Volume adjusted moving average of one row.
+
+    Note:
+        nansum(price*volume) / nansum(volume) over the window, nan when either window is all nan.
+    """
+    number_of_days = arr.shape[0]
+    result = np.full(number_of_days, np.nan)
+    if window < 1 or window > number_of_days:
+        return result
+
+    count = 0
+    volume_count = 0
+    weighted = 0.0
+    total_volume = 0.0
+    for i in range(number_of_days):
+        if i % window == 0:
+            count = 0
+            volume_count = 0
+            weighted = 0.0
+            total_volume = 0.0
+            for k in range(max(i-window+1, 0), i+1):
+                if not np.isnan(arr[k]):
+                    count += 1
+                if not np.isnan(volume[k]):
+                    volume_count += 1
+                    total_volume += volume[k]
+                    if not np.isnan(arr[k]):
+                        weighted += arr[k]*volume[k]
+        else:
+            for k, sign in ((i, 1), (i-window, -1)):
+                if k < 0:
+                    continue
+                if not np.isnan(arr[k]):
+                    count += sign
+                if not np.isnan(volume[k]):
+                    volume_count += sign
+                    total_volume += sign*volume[k]
+                    if not np.isnan(arr[k]):
+                        weighted += sign*arr[k]*volume[k]
+
+        if i >= window-1 and count > 0 and volume_count > 0:
+            result[i] = weighted / total_volume
+
+    return result
+
+### Price Indicators ###
+
+def midpoint_inner(high, low, window):
+    """Middle of the trailing highest high and lowest low of one row."""
+    return (rolling_extreme_inner(high, window, True)[0] + rolling_extreme_inner(low, window, False)[0]) / 2
+
+def cftpp_inner(high, low, close):
+    """Pivot point, first and second resistances and supports of one row.
+
+    Returns:
+        2d-np.array (5, days) of pp, r1, s1, r2, s2
+    """
+    number_of_days = close.shape[0]
+    result = np.full((5, number_of_days), np.nan)
+    for i in range(number_of_days):
+        if np.isnan(high[i]) or np.isnan(low[i]) or np.isnan(close[i]):
+            continue
+        pp_value = (high[i] + low[i] + close[i]) / 3
+        result[0, i] = pp_value
+        result[1, i] = 2*pp_value - low[i]
+        result[2, i] = 2*pp_value - high[i]
+        result[3, i] = pp_value + (high[i] - low[i])
+        result[4, i] = pp_value - (high[i] - low[i])
+    return result
+
+def psar_inner(high, low, af, max_af):
+    """Parabolic stop and reversal of one row.
+
+    Args:
+        high (1d-np.array): high price
+        low (1d-np.array): low price
+        af (float): starting acceleration factor and its step
+        max_af (float): largest acceleration factor
+
+    Returns:
+        psar, trend as 1d-np.array, trend is 1 for up and -1 for down
+
+    Note:
+        The state is the trend, sar, extreme point, acceleration factor and the last two bars,
+        so every bar costs O(1). The trend starts on the second bar, up when its high is above
+        the first high. A bar missing high or low is nan and leaves the state as it was.
+    """
+    number_of_days = high.shape[0]
+    psar = np.full(number_of_days, np.nan)
+    trend = np.full(number_of_days, np.nan)
+
+    count = 0
+    isUp = True
+    sar = 0.0
+    extreme_point = 0.0
+    af_value = af
+    high1 = 0.0
+    high2 = 0.0
+    low1 = 0.0
+    low2 = 0.0
+    for i in range(number_of_days):
+        h = high[i]
+        l = low[i]
+        if np.isnan(h) or np.isnan(l):
+            continue
+
+        if count == 1:
+            isUp = high1 < h
+            if isUp:
+                sar = min(low1, l)
+                extreme_point = max(high1, h)
+            else:
+                sar = max(high1, h)
+                extreme_point = min(low1, l)
+            af_value = af
+        elif count == 2:
+            sar = sar + af_value*(extreme_point - sar)
+            if isUp:
+                # sar never rises above the last two lows
+                sar = min(sar, min(low1, low2))
+                if l < sar:
+                    isUp = False
+                    sar = extreme_point
+                    extreme_point = l
+                    af_value = af
+                elif h > extreme_point:
+                    extreme_point = h
+                    af_value = min(af_value + af, max_af)
+            else:
+                sar = max(sar, max(high1, high2))
+                if h > sar:
+                    isUp = True
+                    sar = extreme_point
+                    extreme_point = h
+                    af_value = af
+                elif l < extreme_point:
+                    extreme_point = l
+                    af_value = min(af_value + af, max_af)
+
+        if count > 0:
+            psar[i] = sar
+            trend[i] = 1.0 if isUp else -1.0
+
+        high2 = high1
+        low2 = low1
+        high1 = h
+        low1 = l
+        count = min(count + 1, 2)
+
+    return psar, trend
+
+def dema_inner(arr, window):
+    """Double exponential moving average of one row."""
+    alpha = np.full(1, 2/(1+window))
+    ema_value = ew_filter_inner(arr, alpha, window)
+    return 2*ema_value - ew_filter_inner(ema_value, alpha, window)
+
+jit_module(nopython=True, cache=True)
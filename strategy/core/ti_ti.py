@@ -0,0 +1,413 @@
+
+import numpy as np
+
+from . import rolling
+from . import filters
+from . import bars
+from . ti_pi import _by_tiles, _lag, rolling_moments, rolling_sum, rolling_regression, ema_block
+from . ti_mi import wilder_block, rsi_block
+
+### Directional Movement ###
+
+def directional_block(high, low, close, window):
+    """Directional movement lines of every row of a block.
+
+    Returns:
+        dict of 2d-np.array, pdi, mdi, dx, adx, adxr and atr
+
+    Note:
+        +DM, -DM and the true range are Wilder smoothed from the second bar on, adx smooths dx
+        the same way and adxr averages adx with adx window-1 days before.
+    """
+    up = high - bars.previous(high)
+    down = bars.previous(low) - low
+    isMove = ~(np.isnan(up) | np.isnan(down))
+    plus_dm = np.where(isMove, np.where((up > down) & (up > 0), up, 0), np.nan)
+    minus_dm = np.where(isMove, np.where((down > up) & (down > 0), down, 0), np.nan)
+    true_range = np.where(isMove, bars.true_range(high, low, close), np.nan)
+
+    atr = wilder_block(true_range, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pdi = np.where(atr > 0, 100*wilder_block(plus_dm, window) / atr, np.nan)
+        mdi = np.where(atr > 0, 100*wilder_block(minus_dm, window) / atr, np.nan)
+        total = pdi + mdi
+        dx = np.where(total > 0, 100*np.abs(pdi - mdi) / total, np.where(np.isnan(total), np.nan, 0))
+    adx = wilder_block(dx, window)
+    return {"pdi":pdi, "mdi":mdi, "dx":dx, "adx":adx, "adxr":(adx + _lag(adx, window-1)) / 2, "atr":atr}
+
+def csi_block(high, low, close, window, point_value, margin, commission):
+    """Commodity selection index of every row of a block."""
+    lines = directional_block(high, low, close, window)
+    return lines["adxr"]*lines["atr"]*(point_value / np.sqrt(margin))*(1 / (150 + commission))*100
+
+### Ranges ###
+
+def aroon_block(high, low, window):
+    """Aroon up and down of every row of a block.
+
+    Note:
+        The highest high and lowest low are taken over window+1 days, so a fresh extreme is 100
+        and one window days old is 0. On ties the most recent day counts.
+    """
+    days = np.arange(high.shape[1])
+    high_position = rolling.rolling_extreme(high, window+1, True)[1]
+    low_position = rolling.rolling_extreme(low, window+1, False)[1]
+    up = np.where(high_position >= 0, 100*(window - (days - high_position)) / window, np.nan)
+    down = np.where(low_position >= 0, 100*(window - (days - low_position)) / window, np.nan)
+    return {"up":up, "down":down, "oscillator":up - down}
+
+def cci_block(high, low, close, window):
+    """Commodity channel index of every row of a block, nan for a flat window."""
+    typical_price = bars.typical_price(high, low, close)
+    mean = rolling_moments(typical_price, window, isStd=False)[0]
+    deviation = rolling.rolling_mean_deviation(typical_price, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(deviation > 0, (typical_price - mean) / (0.015*deviation), np.nan)
+
+def vhf_block(close, window):
+    """Vertical horizontal filter of every row of a block."""
+    spread = rolling.rolling_max(close, window) - rolling.rolling_min(close, window)
+    path = rolling_sum(np.abs(close - bars.previous(close)), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(path > 0, spread / path, np.nan)
+
+def stochrsi_block(close, window, k_window, d_window):
+    """Stochastic of the rsi of every row of a block."""
+    rsi = rsi_block(close, window)
+    highest = rolling.rolling_max(rsi, k_window)
+    lowest = rolling.rolling_min(rsi, k_window)
+    spread = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k_value = 100*np.where(spread > 0, (rsi - lowest) / spread, np.nan)
+    return {"k":k_value, "d":rolling_moments(k_value, d_window, isStd=False)[0]}
+
+### Exponential Trends ###
+
+def macd_block(close, fast_window, slow_window, signal_window):
+    """MACD line, signal and histogram of every row of a block."""
+    macd_value = ema_block(close, fast_window) - ema_block(close, slow_window)
+    signal = ema_block(macd_value, signal_window)
+    return {"macd":macd_value, "signal":signal, "histogram":macd_value - signal}
+
+def trix_block(close, window):
+    """TRIX of every row of a block, the percent change of a triple smoothed ema."""
+    triple = filters.ew_cascade(close, 2/(1+window), window, 3)[2]
+    return 100*(triple / _lag(triple, 1) - 1)
+
+def tsi_block(close, long_window, short_window):
+    """True strength index of every row of a block."""
+    change = close - bars.previous(close)
+    momentum = ema_block(ema_block(change, long_window), short_window)
+    size = ema_block(ema_block(np.abs(change), long_window), short_window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(size > 0, 100*momentum / size, np.nan)
+
+def erp_block(high, low, close, window):
+    """Elder ray bull and bear power of every row of a block."""
+    ema_value = ema_block(close, window)
+    return {"bull":high - ema_value, "bear":low - ema_value}
+
+def force_index_block(close, volume, window):
+    """Force index of every row of a block, the ema of price change times volume."""
+    return ema_block((close - bars.previous(close))*volume, window)
+
+def sonar_block(close, window, shift, signal_window):
+    """Sonar of every row of a block, the change of an ema over shift days and its signal."""
+    ema_value = ema_block(close, window)
+    sonar = ema_value - _lag(ema_value, shift)
+    return {"sonar":sonar, "signal":ema_block(sonar, signal_window)}
+
+### Moving Averages ###
+
+def mao_block(close, fast_window, slow_window):
+    """Moving average oscillator of every row of a block."""
+    return rolling_moments(close, fast_window, isStd=False)[0] - rolling_moments(close, slow_window, isStd=False)[0]
+
+def qstick_block(open, close, window):
+    """Qstick of every row of a block, the moving average of close - open."""
+    return rolling_moments(close - open, window, isStd=False)[0]
+
+def forecast_oscillator_block(close, window):
+    """Forecast oscillator of every row of a block.
+
+    Note:
+        The forecast of a day is the least squares line of the window ending the day before,
+        extended one day ahead. Windows with a nan give nan.
+    """
+    forecast = _lag(rolling_regression(close, window, 1), 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100*(close - forecast) / close
+
+def pfe_block(close, window, smoothing):
+    """Polarized fractal efficiency of every row of a block.
+
+    Note:
+        The straight distance over window days against the path through every day, each day
+        one unit wide, signed by the direction and smoothed by an ema of smoothing days.
+    """
+    distance = close - _lag(close, window)
+    path = rolling_sum(np.sqrt((close - bars.previous(close))**2 + 1), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        efficiency = 100*np.sign(distance)*np.sqrt(distance**2 + window**2) / path
+    return ema_block(efficiency, smoothing)
+
+### Trend Indicators ###
+
+def dmi(pba, start, end, data, *args):
+    """Inner function to calulate directional movement index.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window and the lines to return
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    keys = args[0][1]
+
+    result = _by_tiles(pba, start, end, data[:3], directional_block, window)
+    return {key:result[key] for key in keys}
+
+def csi(pba, start, end, data, *args):
+    """Inner function to calulate commodity selection index.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window, point value, margin and commission
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    point_value = args[0][1]
+    margin = args[0][2]
+    commission = args[0][3]
+
+    return _by_tiles(pba, start, end, data[:3], csi_block, window, point_value, margin, commission)
+
+def aroon(pba, start, end, data, *args):
+    """Inner function to calulate aroon.
+
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), up, down and oscillator
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:2], aroon_block, window)
+
+def cci(pba, start, end, data, *args):
+    """Inner function to calulate commodity channel index.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:3], cci_block, window)
+
+def erp(pba, start, end, data, *args):
+    """Inner function to calulate elder ray power.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), bull and bear
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:3], erp_block, window)
+
+def force_index(pba, start, end, data, *args):
+    """Inner function to calulate force index.
+
+    Args:
+        data (list[2d-np.array]): close and volume, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:2], force_index_block, window)
+
+def forecast_oscillator(pba, start, end, data, *args):
+    """Inner function to calulate forecast oscillator.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:1], forecast_oscillator_block, window)
+
+def macd(pba, start, end, data, *args):
+    """Inner function to calulate moving average convergence divergence.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, fast, slow and signal windows
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), macd, signal and histogram
+    """
+    fast_window = args[0][0]
+    slow_window = args[0][1]
+    signal_window = args[0][2]
+
+    return _by_tiles(pba, start, end, data[:1], macd_block, fast_window, slow_window, signal_window)
+
+def mao(pba, start, end, data, *args):
+    """Inner function to calulate moving average oscillator.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, fast and slow windows
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    fast_window = args[0][0]
+    slow_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], mao_block, fast_window, slow_window)
+
+def mfi(pba, start, end, data, *args):
+    """Inner function to calulate market facilitation index.
+
+    Args:
+        data (list[2d-np.array]): high, low and volume, (assets, days)
+
+    Returns:
+        2d-np.array of the block (end-start, days), nan without volume
+    """
+    high = data[0][start:end]
+    low = data[1][start:end]
+    volume = data[2][start:end]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.where(volume > 0, (high - low) / volume, np.nan)
+    # tqdm update
+    pba.update(end-start)
+
+    return result
+
+mfi.bar_local = True
+
+def pfe(pba, start, end, data, *args):
+    """Inner function to calulate polarized fractal efficiency.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window and smoothing
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    smoothing = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], pfe_block, window, smoothing)
+
+def qstick(pba, start, end, data, *args):
+    """Inner function to calulate qstick.
+
+    Args:
+        data (list[2d-np.array]): open and close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:2], qstick_block, window)
+
+def sonar(pba, start, end, data, *args):
+    """Inner function to calulate sonar.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window, shift and signal window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), sonar and signal
+    """
+    window = args[0][0]
+    shift = args[0][1]
+    signal_window = args[0][2]
+
+    return _by_tiles(pba, start, end, data[:1], sonar_block, window, shift, signal_window)
+
+def stochrsi(pba, start, end, data, *args):
+    """Inner function to calulate stochastic rsi.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, rsi, k and d windows
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), k and d
+    """
+    window = args[0][0]
+    k_window = args[0][1]
+    d_window = args[0][2]
+
+    return _by_tiles(pba, start, end, data[:1], stochrsi_block, window, k_window, d_window)
+
+def trix(pba, start, end, data, *args):
+    """Inner function to calulate trix.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:1], trix_block, window)
+
+def tsi(pba, start, end, data, *args):
+    """Inner function to calulate true strength index.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, long and short windows
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    long_window = args[0][0]
+    short_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], tsi_block, long_window, short_window)
+
+def vhf(pba, start, end, data, *args):
+    """Inner function to calulate vertical horizontal filter.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:1], vhf_block, window)
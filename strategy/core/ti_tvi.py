@@ -0,0 +1,301 @@
+
+import numpy as np
+
+from . import filters
+from . import bars
+from . ti_pi import _by_tiles, _lag, rolling_moments, rolling_sum, cumulative_sum, ema_block
+from . ti_mi import _strength, stochastic_block
+from . ti_ti import macd_block
+
+### Cumulative Lines ###
+# Every line is a running sum of one increment per day. base is the line on the day before the
+# block, 0 for a full run or the last value of an earlier run, and the first skip days only
+# feed the increments of the days after them, eg) the previous close.
+
+def _accumulate(increment, base, skip):
+    """Running sum of the increments after the first skip days, starting from base."""
+    increment = increment.copy()
+    increment[:,:skip] = np.nan
+    return cumulative_sum(increment, base)
+
+def obv_block(close, volume, base, skip):
+    """On balance volume of every row of a block, the volume signed by the close change."""
+    return _accumulate(np.sign(close - bars.previous(close))*volume, base, skip)
+
+def adl_block(high, low, close, volume, base, skip):
+    """Chaikin accumulation/distribution line of every row of a block."""
+    return _accumulate(bars.close_location_value(high, low, close)*volume, base, skip)
+
+def pvt_block(close, volume, base, skip):
+    """Price volume trend of every row of a block, the volume times the close return."""
+    previous_close = bars.previous(close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _accumulate(volume*(close - previous_close) / previous_close, base, skip)
+
+def williams_ad_block(high, low, close, base, skip):
+    """Williams accumulation/distribution of every row of a block.
+
+    Note:
+        An up close adds close - min(low, previous close), a down close adds
+        close - max(high, previous close) and an unchanged close adds 0.
+    """
+    previous_close = bars.previous(close)
+    change = close - previous_close
+    increment = np.where(change > 0, close - np.fmin(low, previous_close), np.where(change < 0, close - np.fmax(high, previous_close), 0))
+    return _accumulate(np.where(np.isnan(change), np.nan, increment), base, skip)
+
+### Rolling Sums ###
+
+def chaikin_mf_block(high, low, close, volume, window):
+    """Chaikin money flow of every row of a block, sum of the money flow volume over the sum of volume."""
+    volume_sum = rolling_sum(volume, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(volume_sum > 0, rolling_sum(bars.close_location_value(high, low, close)*volume, window) / volume_sum, np.nan)
+
+def mfi_block(high, low, close, volume, window):
+    """Money flow index of every row of a block, the rsi of the typical price money flow summed over the window."""
+    typical_price = bars.typical_price(high, low, close)
+    change = typical_price - bars.previous(typical_price)
+    money_flow = typical_price*volume
+    isValid = ~(np.isnan(change) | np.isnan(money_flow))
+    positive = np.where(isValid, np.where(change > 0, money_flow, 0), np.nan)
+    negative = np.where(isValid, np.where(change < 0, money_flow, 0), np.nan)
+    return _strength(rolling_sum(positive, window), rolling_sum(negative, window))
+
+def volume_oscillator_block(volume, fast_window, slow_window):
+    """Volume oscillator of every row of a block, the gap of two moving averages of volume in percent."""
+    slow = rolling_moments(volume, slow_window, isStd=False)[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(slow > 0, 100*(rolling_moments(volume, fast_window, isStd=False)[0] - slow) / slow, np.nan)
+
+def trend_score_block(close, first_lag, last_lag):
+    """Trend score of every row of a block, +1 for every close from first_lag to last_lag days ago below today's, -1 above."""
+    result = np.zeros(close.shape)
+    for lag in range(first_lag, last_lag+1):
+        result += np.sign(close - _lag(close, lag))
+    result[:,:last_lag] = np.nan
+    return result
+
+def pvr_block(close, volume):
+    """Price volume rank of every row of a block.
+
+    Note:
+        1 for price and volume up, 2 for price up and volume down, 3 for both down and 4 for
+        price down and volume up. A day with an unchanged price or volume is nan.
+    """
+    price_change = close - bars.previous(close)
+    volume_change = volume - bars.previous(volume)
+    return np.where(price_change > 0, np.where(volume_change > 0, 1.0, np.where(volume_change < 0, 2.0, np.nan)),
+        np.where(price_change < 0, np.where(volume_change < 0, 3.0, np.where(volume_change > 0, 4.0, np.nan)), np.nan))
+
+### Exponential Filters ###
+
+def pvo_block(volume, fast_state, slow_state, signal_state, history, fast_window, slow_window, signal_window, skip):
+    """Percentage volume oscillator of every row of a block.
+
+    Args:
+        fast_state, slow_state, signal_state (2d-np.array): (rows, 1) filter states of an earlier run, nan to start over
+        history (2d-np.array): pvo of the earlier run on the first skip days, nan elsewhere
+
+    Returns:
+        dict of 2d-np.array, pvo, signal, histogram and the fast and slow volume emas
+
+    Note:
+        The emas carry on from the states on day skip, the signal reads the earlier pvo on the
+        skipped days so it can still seed like a full run.
+    """
+    fast = filters.ew_resume(volume, np.full((1, 1), 2/(1+fast_window)), fast_window, fast_state[:,0], skip)
+    slow = filters.ew_resume(volume, np.full((1, 1), 2/(1+slow_window)), slow_window, slow_state[:,0], skip)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pvo = np.where(slow > 0, 100*(fast - slow) / slow, np.nan)
+    pvo[:,:skip] = history[:,:skip]
+    signal = filters.ew_resume(pvo, np.full((1, 1), 2/(1+signal_window)), signal_window, signal_state[:,0], skip)
+    return {"pvo":pvo, "signal":signal, "histogram":pvo - signal, "fast":fast, "slow":slow}
+
+### Composites ###
+
+def binary_wave_block(high, low, close, fast_window, slow_window, signal_window, ema_window, roc_window, k_window, d_window):
+    """Binary wave of every row of a block.
+
+    Note:
+        +1 or -1 for macd above its signal, the close above its ema, a positive rate of change
+        and the stochastic %D above 50, summed from -4 to 4. A day missing any of them is nan.
+    """
+    lines = macd_block(close, fast_window, slow_window, signal_window)
+    votes = [
+        lines["macd"] - lines["signal"],
+        close - ema_block(close, ema_window),
+        close - _lag(close, roc_window),
+        stochastic_block(high, low, close, k_window, d_window)["d"] - 50,
+    ]
+    return sum(np.where(vote > 0, 1.0, -1.0) + np.where(np.isnan(vote), np.nan, 0) for vote in votes)
+
+### Trading Volume Indicators ###
+
+def obv(pba, start, end, data, *args):
+    """Inner function to calulate on balance volume.
+
+    Args:
+        data (list[2d-np.array]): close, volume and base (assets, 1), (assets, days)
+        *args (tuple): delivers function settings, skip
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    skip = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:3], obv_block, skip)
+
+def chaikin_adl(pba, start, end, data, *args):
+    """Inner function to calulate chaikin accumulation/distribution line.
+
+    Args:
+        data (list[2d-np.array]): high, low, close, volume and base (assets, 1), (assets, days)
+        *args (tuple): delivers function settings, skip
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    skip = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:5], adl_block, skip)
+
+def pvt(pba, start, end, data, *args):
+    """Inner function to calulate price volume trend.
+
+    Args:
+        data (list[2d-np.array]): close, volume and base (assets, 1), (assets, days)
+        *args (tuple): delivers function settings, skip
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    skip = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:3], pvt_block, skip)
+
+def williams_ad(pba, start, end, data, *args):
+    """Inner function to calulate williams accumulation/distribution.
+
+    Args:
+        data (list[2d-np.array]): high, low, close and base (assets, 1), (assets, days)
+        *args (tuple): delivers function settings, skip
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    skip = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:4], williams_ad_block, skip)
+
+def chaikin_mf(pba, start, end, data, *args):
+    """Inner function to calulate chaikin money flow.
+
+    Args:
+        data (list[2d-np.array]): high, low, close and volume, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:4], chaikin_mf_block, window)
+
+def mfi(pba, start, end, data, *args):
+    """Inner function to calulate money flow index.
+
+    Args:
+        data (list[2d-np.array]): high, low, close and volume, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:4], mfi_block, window)
+
+def volume_oscillator(pba, start, end, data, *args):
+    """Inner function to calulate volume oscillator.
+
+    Args:
+        data (list[2d-np.array]): volume, (assets, days)
+        *args (tuple): delivers function settings, fast and slow windows
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    fast_window = args[0][0]
+    slow_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], volume_oscillator_block, fast_window, slow_window)
+
+def trend_score(pba, start, end, data, *args):
+    """Inner function to calulate trend score.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, first_lag and last_lag
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    first_lag = args[0][0]
+    last_lag = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], trend_score_block, first_lag, last_lag)
+
+def pvr(pba, start, end, data, *args):
+    """Inner function to calulate price volume rank.
+
+    Args:
+        data (list[2d-np.array]): close and volume, (assets, days)
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    result = pvr_block(np.asarray(data[0][start:end], dtype=np.float64), np.asarray(data[1][start:end], dtype=np.float64))
+    # tqdm update
+    pba.update(end-start)
+
+    return result
+
+pvr.bar_local = True
+
+def pvo(pba, start, end, data, *args):
+    """Inner function to calulate percentage volume oscillator.
+
+    Args:
+        data (list[2d-np.array]): volume, fast, slow and signal states (assets, 1) and pvo history, (assets, days)
+        *args (tuple): delivers function settings, fast, slow and signal windows and skip
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), pvo, signal, histogram, fast and slow
+    """
+    fast_window = args[0][0]
+    slow_window = args[0][1]
+    signal_window = args[0][2]
+    skip = args[0][3]
+
+    return _by_tiles(pba, start, end, data[:5], pvo_block, fast_window, slow_window, signal_window, skip)
+
+def binary_wave(pba, start, end, data, *args):
+    """Inner function to calulate binary wave.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, macd windows, ema, roc, %K and %D windows
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    fast_window = args[0][0]
+    slow_window = args[0][1]
+    signal_window = args[0][2]
+    ema_window = args[0][3]
+    roc_window = args[0][4]
+    k_window = args[0][5]
+    d_window = args[0][6]
+
+    return _by_tiles(pba, start, end, data[:3], binary_wave_block, fast_window, slow_window, signal_window, ema_window, roc_window, k_window, d_window)
@@ -0,0 +1,225 @@
+
+import numpy as np
+
+from . import bars
+from . ti_pi import _by_tiles, _lag, rolling_moments, rolling_sum, rolling_regression, ema_block
+from . ti_mi import wilder_block, _strength
+
+### Ranges ###
+
+def atr_block(high, low, close, window):
+    """Average true range of every row of a block.
+
+    Returns:
+        dict of 2d-np.array, atr and natr, the atr in percent of the close
+
+    Note:
+        The true range is computed once and Wilder smoothed, the first bar counts high - low.
+    """
+    atr = wilder_block(bars.true_range(high, low, close), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {"atr":atr, "natr":100*atr / close}
+
+def bollinger_width_block(arr, window, sigma):
+    """Bollinger band width of every row of a block, (upper - lower) / middle in percent."""
+    mean, std = rolling_moments(arr, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100*2*sigma*std / mean
+
+def chaikin_volatility_block(high, low, window, change_window):
+    """Chaikin volatility of every row of a block, the percent change of the ema of high - low."""
+    range_ema = ema_block(high - low, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100*(range_ema / _lag(range_ema, change_window) - 1)
+
+### Relative Volatility ###
+
+def _relative_volatility(arr, window, std_window):
+    """Rsi of the standard deviation, Wilder smoothed on the days the price rises and falls."""
+    std = rolling_moments(arr, std_window)[1]
+    change = arr - bars.previous(arr)
+    isValid = ~(np.isnan(change) | np.isnan(std))
+    up = np.where(isValid, np.where(change > 0, std, 0), np.nan)
+    down = np.where(isValid, np.where(change < 0, std, 0), np.nan)
+    return _strength(wilder_block(up, window), wilder_block(down, window))
+
+def rvi_block(close, window, std_window):
+    """Relative volatility index of every row of a block."""
+    return _relative_volatility(close, window, std_window)
+
+def rvi_revised_block(high, low, window, std_window):
+    """Revised relative volatility index of every row of a block, the mean of the rvi of high and low."""
+    return (_relative_volatility(high, window, std_window) + _relative_volatility(low, window, std_window)) / 2
+
+def inertia_block(close, window, rvi_window, std_window):
+    """Inertia of every row of a block, the end of the least squares line of the rvi over window."""
+    return rolling_regression(_relative_volatility(close, rvi_window, std_window), window)
+
+### Range Estimators ###
+# Variances of the log returns from open, high, low and close, averaged over the window and
+# reported as volatility scaled by sqrt(trading_days). A window without any value is nan.
+
+def _sample_variance(arr, window):
+    """Trailing variance with n-1 degrees of freedom, nan for windows with fewer than two values."""
+    count = rolling_sum(np.where(np.isnan(arr), 0.0, 1.0), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 1, rolling_moments(arr, window)[1]**2*count / (count - 1), np.nan)
+
+def parkinson_block(high, low, window, trading_days):
+    """Parkinson volatility of every row of a block, from the high to low log range alone."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        high_low = np.log(high / low)
+    return np.sqrt(rolling_moments(high_low**2, window, isStd=False)[0] / (4*np.log(2))*trading_days)
+
+def range_volatility_block(open, high, low, close, window, trading_days):
+    """Parkinson, Garman-Klass, Rogers-Satchell and Yang-Zhang volatility of every row of a block.
+
+    Returns:
+        dict of 2d-np.array, parkinson, garman_klass, rogers_satchell and yang_zhang
+
+    Note:
+        Yang-Zhang adds the sample variances of the overnight log(O/Cp) and open to close
+        log(C/O) returns to Rogers-Satchell, weighted by k = 0.34 / (1.34 + (n+1)/(n-1)).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_open, log_high, log_low, log_close = np.log(open), np.log(high), np.log(low), np.log(close)
+    high_low = log_high - log_low
+    close_open = log_close - log_open
+    overnight = log_open - bars.previous(log_close)
+
+    garman_klass = rolling_moments(0.5*high_low**2 - (2*np.log(2) - 1)*close_open**2, window, isStd=False)[0]
+    rogers_satchell = rolling_moments((log_high - log_close)*(log_high - log_open) + (log_low - log_close)*(log_low - log_open), window, isStd=False)[0]
+    k = 0.34 / (1.34 + (window + 1) / (window - 1)) if window > 1 else 0.0
+    yang_zhang = _sample_variance(overnight, window) + k*_sample_variance(close_open, window) + (1 - k)*rogers_satchell
+
+    scale = np.sqrt(trading_days)
+    return {
+        "parkinson":parkinson_block(high, low, window, trading_days),
+        "garman_klass":np.sqrt(np.maximum(garman_klass, 0))*scale,
+        "rogers_satchell":np.sqrt(np.maximum(rogers_satchell, 0))*scale,
+        "yang_zhang":np.sqrt(np.maximum(yang_zhang, 0))*scale,
+    }
+
+### Volatility Indicators ###
+
+def atr(pba, start, end, data, *args):
+    """Inner function to calulate average true range.
+
+    Args:
+        data (list[2d-np.array]): high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), atr and natr
+    """
+    window = args[0][0]
+
+    return _by_tiles(pba, start, end, data[:3], atr_block, window)
+
+def bollinger_width(pba, start, end, data, *args):
+    """Inner function to calulate bollinger band width.
+
+    Args:
+        data (list[2d-np.array]): price, (assets, days)
+        *args (tuple): delivers function settings, window and sigma
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    sigma = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], bollinger_width_block, window, sigma)
+
+def chaikin_volatility(pba, start, end, data, *args):
+    """Inner function to calulate chaikin volatility.
+
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, window and change_window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    change_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:2], chaikin_volatility_block, window, change_window)
+
+def rvi(pba, start, end, data, *args):
+    """Inner function to calulate relative volatility index.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window and std_window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    std_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:1], rvi_block, window, std_window)
+
+def inertia(pba, start, end, data, *args):
+    """Inner function to calulate inertia.
+
+    Args:
+        data (list[2d-np.array]): close, (assets, days)
+        *args (tuple): delivers function settings, window, rvi_window and std_window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    rvi_window = args[0][1]
+    std_window = args[0][2]
+
+    return _by_tiles(pba, start, end, data[:1], inertia_block, window, rvi_window, std_window)
+
+def parkinson(pba, start, end, data, *args):
+    """Inner function to calulate parkinson volatility.
+
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, window and trading_days
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    trading_days = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:2], parkinson_block, window, trading_days)
+
+def range_volatility(pba, start, end, data, *args):
+    """Inner function to calulate range based volatility estimators.
+
+    Args:
+        data (list[2d-np.array]): open, high, low and close, (assets, days)
+        *args (tuple): delivers function settings, window and trading_days
+
+    Returns:
+        dict of 2d-np.array of the block (end-start, days), parkinson, garman_klass, rogers_satchell and yang_zhang
+    """
+    window = args[0][0]
+    trading_days = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:4], range_volatility_block, window, trading_days)
+
+### Additionals ###
+
+def rvi_revised(pba, start, end, data, *args):
+    """Inner function to calulate revised relative volatility index.
+
+    Args:
+        data (list[2d-np.array]): high and low, (assets, days)
+        *args (tuple): delivers function settings, window and std_window
+
+    Returns:
+        2d-np.array of the block (end-start, days)
+    """
+    window = args[0][0]
+    std_window = args[0][1]
+
+    return _by_tiles(pba, start, end, data[:2], rvi_revised_block, window, std_window)
@@ -1,29 +1,88 @@
 import numpy as np
 
+from . utils import ols_solve
+
+### Ranks ###
+RANK_METHODS = ["ordinal", "average", "min", "max", "dense"]
+NA_OPTIONS = ["keep", "top", "bottom"]
+
+def rank_block(arr, method="ordinal", na_option="keep"):
+    """Ranks of every row of a block with one sort and a linear scan.
+
+    Args:
+        arr (2d-np.array): (rows, assets) block
+        method (str, one in RANK_METHODS): rank of tied values
+            'ordinal': distinct ranks, ties keep the column order (as argsort(kind='mergesort'))
+            'average', 'min', 'max': average, lowest and highest rank of the tie group
+            'dense': like 'min' but ranks go up by one between groups
+        na_option (str, one in NA_OPTIONS): 'keep' leaves nan, 'top'/'bottom' ranks nan as one tie group below/above every value
+
+    Returns:
+        2d-np.array of 1-based ranks, as scipy.stats.rankdata
+    """
+    number_of_assets = arr.shape[1]
+    order = np.argsort(arr, axis=1, kind="stable")
+    sorted_arr = np.take_along_axis(arr, order, axis=1)
+    sorted_nan = np.isnan(sorted_arr)
+    j = np.arange(number_of_assets)[None,:]
+
+    # a tie group starts where the sorted value changes, nan is one group at the end
+    isFirst = np.ones(arr.shape, dtype=bool)
+    isFirst[:,1:] = (sorted_arr[:,1:] != sorted_arr[:,:-1]) & ~(sorted_nan[:,1:] & sorted_nan[:,:-1])
+
+    if method == "ordinal":
+        ranks = np.broadcast_to(j + 1.0, arr.shape)
+    elif method == "dense":
+        ranks = np.cumsum(isFirst, axis=1).astype(np.float64)
+    else:
+        isLast = np.ones(arr.shape, dtype=bool)
+        isLast[:,:-1] = isFirst[:,1:]
+        first = np.maximum.accumulate(np.where(isFirst, j, 0), axis=1)
+        last = number_of_assets - 1 - np.maximum.accumulate(np.where(isLast[:,::-1], j, 0), axis=1)[:,::-1]
+        if method == "min":
+            ranks = first + 1.0
+        elif method == "max":
+            ranks = last + 1.0
+        elif method == "average":
+            ranks = (first + last) / 2 + 1.0
+
+    if na_option == "keep":
+        ranks = np.where(sorted_nan, np.nan, ranks)
+    elif na_option == "top":
+        # the nan group moves in front of the values
+        number_of_nan = sorted_nan.sum(axis=1, keepdims=True)
+        number_of_values = number_of_assets - number_of_nan
+        if method == "dense":
+            ranks = np.where(sorted_nan, 1.0, ranks + (number_of_nan > 0))
+        else:
+            ranks = np.where(sorted_nan, ranks - number_of_values, ranks + number_of_nan)
+
+    result = np.empty(arr.shape)
+    np.put_along_axis(result, order, ranks, axis=1)
+    return result
+
+def cs_rank_block(arr, method="ordinal", na_option="keep"):
+    """Ranks of every row of a block scaled to 0 ~ 1 by the largest rank."""
+    ranks = rank_block(arr, method, na_option)
+    largest = np.max(np.where(np.isnan(ranks), -np.inf, ranks), axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (ranks - 1) / (largest - 1)
+
 def cs_rank(pba, start, end, data, *args):
     """Rank.
 
     Args:
         arr (2d-np.array): input data
-        *args (): delivers function settings
+        *args (): delivers function settings, method and na_option
 
     Returns:
-        2d-np.array.
+        2d-np.array of the block
     """
     data = data[0]
+    method = args[0][0]
+    na_option = args[0][1]
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-
-    for i in range(start, end):
-        arr = data[i,:]
-        ranks = arr.argsort(kind='mergesort').argsort(kind='mergesort')
-        ranks = np.where(ranks>=(ranks.shape[0]-np.isnan(arr).sum()), np.nan, ranks)
-        result[i,:] = ranks/np.nanmax(ranks)
-        # tqdm update
-        pba.update.remote(1)    
-
-    return result
+    return _by_tiles(pba, start, end, data, cs_rank_block, method, na_option)
 
 def cs_percentile(pba, start, end, data, *args):
     """Percentile.
@@ -45,10 +104,75 @@ def cs_percentile(pba, start, end, data, *args):
         arr = data[i,:]
         result[i,:] = np.nanpercentile(arr, q=percent)
         # tqdm update
-        pba.update.remote(1) 
+        pba.update(1) 
+
+    return result
+
+### Block Reductions ###
+# Each operator is a few axis-1 reductions over a (dates, assets) block, rows that are
+# all nan stay nan without warnings. Kernels feed the block in tiles of about
+# tile_bytes so the passes of one operator run on cached rows.
+tile_bytes = 1024 * 1024
+
+def _by_tiles(pba, start, end, data, function, *args):
+    """Run a block operator over the dates [start:end] tile by tile.
+
+    Returns:
+        2d-np.array of the block (end-start, assets)
+    """
+    number_of_assets = data.shape[1]
+    height = max(1, tile_bytes // (8*max(number_of_assets, 1)))
+
+    result = np.empty((end-start, number_of_assets))
+    for a in range(start, end, height):
+        b = min(a+height, end)
+        result[a-start:b-start] = function(np.asarray(data[a:b], dtype=np.float64), *args)
+        # tqdm update
+        pba.update(b-a)
 
     return result
 
+def _nan_moments(arr):
+    """Row mean and population standard deviation ignoring nan.
+
+    Args:
+        arr (2d-np.array): (dates, assets) block
+
+    Returns:
+        mean, std as (dates, 1) np.array
+    """
+    isValid = ~np.isnan(arr)
+    count = isValid.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(isValid, arr, 0).sum(axis=1, keepdims=True) / count
+        demeaned = np.where(isValid, arr - mean, 0)
+        std = np.sqrt((demeaned*demeaned).sum(axis=1, keepdims=True) / count)
+    return mean, std
+
+def cs_zscore_block(arr):
+    """Zscore of every row of a block."""
+    mean, std = _nan_moments(arr)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (arr - mean) / std
+
+def cs_winsorize_block(arr, sigma):
+    """Winsorize every row of a block to mean +- sigma * std."""
+    mean, std = _nan_moments(arr)
+    return np.clip(arr, mean - sigma*std, mean + sigma*std)
+
+def cs_truncate_block(arr, maxPercent):
+    """Truncate every row of a block to maxPercent of its sum."""
+    available_max = np.nansum(arr, axis=1, keepdims=True) * maxPercent
+    return np.where(arr>available_max, available_max, arr)
+
+def cs_softmax_block(arr):
+    """Softmax of every row of a block."""
+    isEmpty = np.isnan(arr).all(axis=1, keepdims=True)
+    row_max = np.nanmax(np.where(isEmpty, 0, arr), axis=1, keepdims=True)
+    exp = np.exp(arr - np.where(isEmpty, np.nan, row_max))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return exp / np.nansum(exp, axis=1, keepdims=True)
+
 def cs_zscore(pba, start, end, data, *args):
     """Zscore.
     
@@ -57,20 +181,11 @@ def cs_zscore(pba, start, end, data, *args):
         *args (): delivers function settings
     
     Returns:
-        2d-np.array.
+        2d-np.array of the block
     """
     data = data[0]
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-
-    for i in range(start, end):
-        arr = data[i,:]
-        result[i,:] = (arr - np.nanmean(arr))/np.nanstd(arr)
-        # tqdm update
-        pba.update.remote(1) 
-
-    return result
+    return _by_tiles(pba, start, end, data, cs_zscore_block)
 
 def cs_winsorize(pba, start, end, data, *args):
     """Winsorize.
@@ -80,24 +195,12 @@ def cs_winsorize(pba, start, end, data, *args):
         *args (): delivers function settings
 
     Returns:
-        2d-np.array with winsorized data.
+        2d-np.array of the block with winsorized data.
     """
     data = data[0]
     sigma = args[0][0]
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-
-    for i in range(start, end):
-        arr = data[i,:]
-        high_adjust = np.where(arr>np.nanmean(arr)+sigma*np.nanstd(arr), np.nanmean(arr)+sigma*np.nanstd(arr), 0).copy()
-        low_adjust = np.where(arr<np.nanmean(arr)-sigma*np.nanstd(arr), np.nanmean(arr)-sigma*np.nanstd(arr), 0).copy()
-        tmp = high_adjust + low_adjust
-        result[i,:] = np.where(tmp==0, arr, tmp)
-        # tqdm update
-        pba.update.remote(1) 
-
-    return result
+    return _by_tiles(pba, start, end, data, cs_winsorize_block, sigma)
 
 def cs_truncate(pba, start, end, data, *args):
     """Truncate.
@@ -108,22 +211,12 @@ def cs_truncate(pba, start, end, data, *args):
         **kargs (): delivers function settings
     
     Returns:
-        2d-np.array.
+        2d-np.array of the block
     """
     data = data[0]
     maxPercent = args[0][0]
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
-
-    for i in range(start, end):
-        arr = data[i,:]
-        available_max = np.nansum(arr) * maxPercent
-        result[i,:] = np.where(arr>available_max, available_max, arr)
-        # tqdm update
-        pba.update.remote(1) 
-
-    return result
+    return _by_tiles(pba, start, end, data, cs_truncate_block, maxPercent)
 
 def cs_softmax(pba, start, end, data, *args):
     """Softmax.
@@ -133,22 +226,57 @@ def cs_softmax(pba, start, end, data, *args):
         *args (): delivers function settings
     
     Returns:
-        2d-np.array
+        2d-np.array of the block
 
     Note:
         softmax function f(x) = np.exp(x-np.nanmax(x))/np.nansum(np.exp(x-np.nanmax(x)))
     """
     data = data[0]
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
+    return _by_tiles(pba, start, end, data, cs_softmax_block)
 
-    for i in range(start, end):
-        arr = data[i,:]
-        result[i,:] = np.exp(arr-np.nanmax(arr))/np.nansum(np.exp(arr-np.nanmax(arr)))
-        # tqdm update
-        pba.update.remote(1) 
+def _top_mask(arr, n, ties):
+    """Mask of the n largest values of every row by partial selection.
+
+    Args:
+        arr (2d-np.array): (dates, assets) block
+        n (int): number of assets to pick
+        ties (str, one in ['all', 'first']): 'all' keeps every asset tied with the n-th value,
+                                             'first' keeps exactly n, ties go to the left columns
+
+    Returns:
+        2d-np.array of bool, nan is never picked, rows with fewer than n values pick all of them
+    """
+    number_of_assets = arr.shape[1]
+    if n <= 0 or number_of_assets == 0:
+        return np.zeros(arr.shape, dtype=bool)
+    k = number_of_assets - min(n, number_of_assets)
+    # nan sorts below every value, a row short of values gets -inf as its n-th value
+    nth = np.partition(np.where(np.isnan(arr), -np.inf, arr), k, axis=1)[:, k:k+1]
+
+    if ties == "all":
+        return arr >= nth
+    isGreater = arr > nth
+    isEqual = arr == nth
+    room = n - isGreater.sum(axis=1, keepdims=True)
+    return isGreater | (isEqual & (np.cumsum(isEqual, axis=1) <= room))
+
+def cs_top_block(arr, n, satify, otherwise, ties):
+    """Top 'n' of every row of a block, rows without any value stay nan."""
+    result = np.where(_top_mask(arr, n, ties), satify, otherwise).astype(np.float64)
+    result[np.isnan(arr).all(axis=1)] = np.nan
+    return result
 
+def cs_bottom_block(arr, n, satify, otherwise, ties):
+    """Bottom 'n' of every row of a block, rows without any value stay nan."""
+    return cs_top_block(-arr, n, satify, otherwise, ties)
+
+def cs_top_bottom_block(arr, n, long, short, otherwise, ties):
+    """Top 'n' as long and bottom 'n' as short of every row of a block, top wins an overlap."""
+    isTop = _top_mask(arr, n, ties)
+    isBottom = _top_mask(-arr, n, ties) & ~isTop
+    result = np.where(isTop, long, np.where(isBottom, short, otherwise)).astype(np.float64)
+    result[np.isnan(arr).all(axis=1)] = np.nan
     return result
 
 def cs_top(pba, start, end, data, *args):
@@ -156,35 +284,58 @@ def cs_top(pba, start, end, data, *args):
 
     Args:
         data (2d-np.array): input data
-        **kargs (): delivers function settings
+        *args (): delivers function settings
 
     Returns:
-        2d-np.array
+        2d-np.array of the block
+
+    Note:
+        The n-th largest value comes from np.partition over the whole tile, no row is sorted.
     """
     data = data[0]
     n = args[0][0]
     satify = args[0][1]
     otherwise = args[0][2]
+    ties = args[0][3]
 
-    result = np.zeros_like(data)
-    result[start:end,:] = np.nan
+    return _by_tiles(pba, start, end, data, cs_top_block, n, satify, otherwise, ties)
 
-    for i in range(start, end):
-        arr = data[i]
-        num_nan = np.sum(np.isnan(arr))
-        if num_nan == len(arr):
-            pass
-        else:
-            tmp = arr.argsort(kind="mergesort")
-            if n < num_nan:
-                tmp = tmp[:-num_nan]
-            tmp = arr[tmp]
-            nth = tmp[-n]
-            result[i] = np.where(arr>=nth, satify, otherwise)
-        # tqdm update
-        pba.update.remote(1) 
+def cs_bottom(pba, start, end, data, *args):
+    """Bottom.
 
-    return result
+    Args:
+        data (2d-np.array): input data
+        *args (): delivers function settings
+
+    Returns:
+        2d-np.array of the block
+    """
+    data = data[0]
+    n = args[0][0]
+    satify = args[0][1]
+    otherwise = args[0][2]
+    ties = args[0][3]
+
+    return _by_tiles(pba, start, end, data, cs_bottom_block, n, satify, otherwise, ties)
+
+def cs_top_bottom(pba, start, end, data, *args):
+    """Top and bottom.
+
+    Args:
+        data (2d-np.array): input data
+        *args (): delivers function settings
+
+    Returns:
+        2d-np.array of the block
+    """
+    data = data[0]
+    n = args[0][0]
+    long = args[0][1]
+    short = args[0][2]
+    otherwise = args[0][3]
+    ties = args[0][4]
+
+    return _by_tiles(pba, start, end, data, cs_top_bottom_block, n, long, short, otherwise, ties)
 
 def cs_apply(pba, start, end, data, *args):
     """Apply user-defined function.
@@ -210,7 +361,7 @@ def cs_apply(pba, start, end, data, *args):
         arr = data[i,:]
         result[i,:] = func(arr, *inner_args)
         # tqdm update
-        pba.update.remote(1) 
+        pba.update(1) 
 
     return result
 
@@ -240,7 +391,7 @@ def cs_dual_apply(pba, start, end, data, *args):
         x_arr = x_mat[i,:]
         result[i,:] = func(y_arr, x_arr, *inner_args)
         # tqdm update
-        pba.update.remote(1) 
+        pba.update(1) 
 
     return result
 
@@ -269,6 +420,315 @@ def cs_multi_apply(pba, start, end, data, *args):
         result_args = tuple(data_args_arr + inner_args)
         result[i,:] = func(*result_args)
         # tqdm update
-        pba.update.remote(1) 
+        pba.update(1) 
+
+    return result
+
+def cs_regression(pba, start, end, data, *args):
+    """Cross-sectional OLS regression.
+
+    Args:
+        y_mat (2d-np.array): dependent variable
+        x_mats (2d-np.array): independent variables
+        *args (): delivers function settings
+
+    Returns:
+        dict of the block, "intercept", "slope0", "slope1", ..., "r2" as 1d-np.array, "residual" as 2d-np.array
+
+    Note:
+        Every row is its own regression, all rows of the block are solved in one batched call.
+        Assets with any NaN are dropped from the row, rows with a constant or collinear regressor are NaN.
+    """
+    y_mat = data[0]
+    x_mats = data[1:]
+
+    y = np.array(y_mat[start:end], dtype=np.float64)
+    xs = [np.array(x_mat[start:end], dtype=np.float64) for x_mat in x_mats]
+    p = len(xs) + 1
+
+    isValid = np.isfinite(y)
+    for x in xs:
+        isValid = isValid & np.isfinite(x)
+    v = isValid.astype(np.float64)
+
+    # center with the mean of valid observations
+    count = v.sum(axis=1)
+    safe_count = np.maximum(count, 1)[:,None]
+    y_mean = np.where(isValid, y, 0).sum(axis=1, keepdims=True) / safe_count
+    x_means = [np.where(isValid, x, 0).sum(axis=1, keepdims=True) / safe_count for x in xs]
+    yc = np.where(isValid, y - y_mean, 0)
+    xc = np.stack([np.where(isValid, x - x_mean, 0) for x, x_mean in zip(xs, x_means)], axis=-1)
+    x_squares = np.stack([np.where(isValid, x*x, 0).sum(axis=1) for x in xs], axis=-1)
+
+    sxx = np.einsum("nai,naj->nij", xc, xc)
+    sxy = np.einsum("nai,na->ni", xc, yc)
+    syy = np.einsum("na,na->n", yc, yc)
+
+    slopes, r2 = ols_solve(sxx, sxy, syy, count, x_squares)
+
+    intercept = y_mean[:,0]
+    for k in range(p-1):
+        intercept = intercept - slopes[:,k]*x_means[k][:,0]
+    fitted = intercept[:,None] + np.zeros_like(y)
+    for k in range(p-1):
+        fitted = fitted + slopes[:,k,None]*xs[k]
+
+    result = {"intercept":intercept, "r2":r2, "residual":np.where(isValid, y - fitted, np.nan)}
+    for k in range(p-1):
+        result["slope{k}".format(k=k)] = slopes[:,k]
+    # tqdm update
+    pba.update(end-start)
+
+    return result
+
+### Groups ###
+# Every (row, group) pair of a tile is one segment, statistics are segment reductions
+# with np.bincount over all rows at once. Assets without a group or without a value
+# belong to no segment and come back nan.
+def _group_codes(groups):
+    """Integer codes of group labels.
+
+    Args:
+        groups (2d-np.array): group labels, nan for no group
+
+    Returns:
+        codes (2d-np.array of int, -1 for no group), number of codes
+    """
+    groups = np.asarray(groups, dtype=np.float64)
+    isLabel = ~np.isnan(groups)
+    labels = groups[isLabel]
+    if labels.shape[0] == 0:
+        return np.zeros(groups.shape, dtype=np.int64) - 1, 1
+    # small non-negative integer labels, eg) sector codes, are codes already
+    if labels.min() >= 0 and labels.max() < 2**15 and (labels == np.round(labels)).all():
+        return np.where(isLabel, groups, -1).astype(np.int64), int(labels.max()) + 1
+    uniques, inverse = np.unique(labels, return_inverse=True)
+    codes = np.zeros(groups.shape, dtype=np.int64) - 1
+    codes[isLabel] = inverse
+    return codes, uniques.shape[0]
+
+def _group_tiles(pba, start, end, data, function, *args):
+    """Run a group operator over the dates [start:end] tile by tile.
+
+    Args:
+        data (list[2d-np.array]): values, group labels (one row is used for every row) and exposures
+        function (function): block operator, function(arr, codes, number_of_codes, exposures, *args)
+
+    Returns:
+        2d-np.array of the block (end-start, assets)
+    """
+    groups = data[1]
+    codes, number_of_codes = _group_codes(groups[start:end] if groups.shape[0] > 1 else groups)
+    number_of_assets = data[0].shape[1]
+    height = max(1, tile_bytes // (8*max(number_of_assets, 1)))
+
+    result = np.empty((end-start, number_of_assets))
+    for a in range(start, end, height):
+        b = min(a+height, end)
+        arr = np.asarray(data[0][a:b], dtype=np.float64)
+        tile_codes = np.broadcast_to(codes[a-start:b-start] if codes.shape[0] > 1 else codes, arr.shape)
+        exposures = [np.asarray(x_mat[a:b], dtype=np.float64) for x_mat in data[2:]]
+        result[a-start:b-start] = function(arr, tile_codes, number_of_codes, exposures, *args)
+        # tqdm update
+        pba.update(b-a)
+
+    return result
 
-    return result
\ No newline at end of file
+def _segment_keys(arr, codes, number_of_codes):
+    """Segment id of every element and the number of segments.
+
+    Note:
+        Elements without a segment get the spare id 'number of segments', its statistics are nan.
+    """
+    size = arr.shape[0]*number_of_codes
+    key = np.arange(arr.shape[0])[:,None]*number_of_codes + codes
+    return np.where(~np.isnan(arr) & (codes >= 0), key, size), size
+
+def _group_count(key, size):
+    """Number of assets in the group of every element."""
+    count = np.bincount(key.ravel(), minlength=size+1).astype(np.float64)
+    count[size] = np.nan
+    return count[key]
+
+def _group_moments(arr, key, size):
+    """Group mean and population standard deviation of every element."""
+    flat_key = key.ravel()
+    values = np.where(key < size, arr, 0).ravel()
+
+    count = np.bincount(flat_key, minlength=size+1).astype(np.float64)
+    count[size] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (np.bincount(flat_key, weights=values, minlength=size+1) / count)[flat_key]
+        demeaned = values - mean
+        std = np.sqrt(np.bincount(flat_key, weights=demeaned*demeaned, minlength=size+1) / count)[flat_key]
+
+    return mean.reshape(arr.shape), std.reshape(arr.shape)
+
+def _group_position(arr, codes, number_of_codes):
+    """Position of every element in its group sorted by value, 0 for the smallest, nan for no group.
+
+    Note:
+        Rows are sorted by value, then stably by group code, so ties keep the asset order
+        as the mergesort ranks of cs_rank. Codes fit in int16, numpy radix sorts them.
+    """
+    isValid = ~np.isnan(arr) & (codes >= 0)
+    codes = np.where(isValid, codes, number_of_codes).astype(np.int16 if number_of_codes < 2**15 else np.int64)
+
+    order = np.argsort(arr, axis=1, kind="stable")
+    order = np.take_along_axis(order, np.argsort(np.take_along_axis(codes, order, axis=1), axis=1, kind="stable"), axis=1)
+    sorted_codes = np.take_along_axis(codes, order, axis=1)
+
+    j = np.arange(arr.shape[1])[None,:]
+    isFirst = np.ones(arr.shape, dtype=bool)
+    isFirst[:,1:] = sorted_codes[:,1:] != sorted_codes[:,:-1]
+    first = np.maximum.accumulate(np.where(isFirst, j, 0), axis=1)
+
+    position = np.empty(arr.shape)
+    np.put_along_axis(position, order, (j - first).astype(np.float64), axis=1)
+    return np.where(isValid, position, np.nan)
+
+def _group_demean_block(arr, codes, number_of_codes, exposures):
+    key, size = _segment_keys(arr, codes, number_of_codes)
+    mean, _ = _group_moments(arr, key, size)
+    return arr - mean
+
+def _group_zscore_block(arr, codes, number_of_codes, exposures):
+    key, size = _segment_keys(arr, codes, number_of_codes)
+    mean, std = _group_moments(arr, key, size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (arr - mean) / std
+
+def _group_winsorize_block(arr, codes, number_of_codes, exposures, sigma):
+    key, size = _segment_keys(arr, codes, number_of_codes)
+    mean, std = _group_moments(arr, key, size)
+    return np.clip(arr, mean - sigma*std, mean + sigma*std)
+
+def _group_rank_block(arr, codes, number_of_codes, exposures):
+    key, size = _segment_keys(arr, codes, number_of_codes)
+    count = _group_count(key, size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _group_position(arr, codes, number_of_codes) / (count - 1)
+
+def _group_top_block(arr, codes, number_of_codes, exposures, n, satify, otherwise):
+    key, size = _segment_keys(arr, codes, number_of_codes)
+    count = _group_count(key, size)
+    position = _group_position(arr, codes, number_of_codes)
+
+    # the n-th largest value of every group, the smallest one for groups with fewer assets
+    isNth = position == np.maximum(count - n, 0)
+    nth = np.zeros(size+1) * np.nan
+    nth[key[isNth]] = arr[isNth]
+    nth = nth[key]
+
+    result = np.where(arr >= nth, satify, otherwise).astype(np.float64)
+    # rows without any value stay nan
+    result[np.isnan(arr).all(axis=1)] = np.nan
+    return result
+
+def _group_neutralize_block(arr, codes, number_of_codes, exposures):
+    for x in exposures:
+        arr = arr + 0*x
+    key, size = _segment_keys(arr, codes, number_of_codes)
+    mean, _ = _group_moments(arr, key, size)
+    residual = arr - mean
+    if len(exposures) == 0:
+        return residual
+
+    xs = []
+    for x in exposures:
+        x_mean, _ = _group_moments(x, key, size)
+        xs.append(np.where(key < size, x - x_mean, 0))
+    z = np.stack(xs, axis=-1)
+    zz = np.einsum("nak,nal->nkl", z, z)
+    zy = np.einsum("nak,na->nk", z, np.where(key < size, residual, 0))
+    try:
+        beta = np.linalg.solve(zz, zy[...,None])[...,0]
+    except np.linalg.LinAlgError:
+        beta = np.einsum("nkl,nl->nk", np.linalg.pinv(zz), zy)
+    return residual - np.einsum("nak,nk->na", z, beta)
+
+def cs_group_demean(pba, start, end, data, *args):
+    """Demean within groups.
+
+    Args:
+        data (list[2d-np.array]): input data and group labels
+        *args (): delivers function settings
+
+    Returns:
+        2d-np.array of the block
+    """
+    return _group_tiles(pba, start, end, data, _group_demean_block)
+
+def cs_group_zscore(pba, start, end, data, *args):
+    """Zscore within groups.
+
+    Args:
+        data (list[2d-np.array]): input data and group labels
+        *args (): delivers function settings
+
+    Returns:
+        2d-np.array of the block
+    """
+    return _group_tiles(pba, start, end, data, _group_zscore_block)
+
+def cs_group_winsorize(pba, start, end, data, *args):
+    """Winsorize within groups.
+
+    Args:
+        data (list[2d-np.array]): input data and group labels
+        *args (): delivers function settings
+
+    Returns:
+        2d-np.array of the block
+    """
+    sigma = args[0][0]
+
+    return _group_tiles(pba, start, end, data, _group_winsorize_block, sigma)
+
+def cs_group_rank(pba, start, end, data, *args):
+    """Rank within groups.
+
+    Args:
+        data (list[2d-np.array]): input data and group labels
+        *args (): delivers function settings
+
+    Returns:
+        2d-np.array of the block, values 0 ~ 1 as cs_rank
+    """
+    return _group_tiles(pba, start, end, data, _group_rank_block)
+
+def cs_group_top(pba, start, end, data, *args):
+    """Top 'n' within groups.
+
+    Args:
+        data (list[2d-np.array]): input data and group labels
+        *args (): delivers function settings
+
+    Returns:
+        2d-np.array of the block
+
+    Note:
+        Ties with the n-th largest value of the group are in the top as cs_top
+    """
+    n = args[0][0]
+    satify = args[0][1]
+    otherwise = args[0][2]
+
+    return _group_tiles(pba, start, end, data, _group_top_block, n, satify, otherwise)
+
+def cs_group_neutralize(pba, start, end, data, *args):
+    """Neutralize to groups and exposures.
+
+    Args:
+        data (list[2d-np.array]): input data, group labels and exposures
+        *args (): delivers function settings
+
+    Returns:
+        2d-np.array of the block, residual of data on group dummies and exposures
+
+    Note:
+        Demeaning within groups removes the dummies (Frisch-Waugh-Lovell), the demeaned
+        data is then regressed on the demeaned exposures row by row in one batched solve.
+        Assets with a nan exposure are dropped from the row.
+    """
+    return _group_tiles(pba, start, end, data, _group_neutralize_block)
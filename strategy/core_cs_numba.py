@@ -20,7 +20,7 @@ def cs_rank(pba, start, end, data, *args):
     for i in range(start, end):
         result[i,:] = core_cs_numba_inner.cs_rank_inner(data[i,:])
         # tqdm update
-        pba.update.remote(1)    
+        pba.update(1)    
 
     return result
 
@@ -43,7 +43,7 @@ def cs_percentile(pba, start, end, data, *args):
     for i in range(start, end):
         result[i,:] = core_cs_numba_inner.cs_percentile_inner(data[i,:], percent)
         # tqdm update
-        pba.update.remote(1) 
+        pba.update(1) 
 
     return result
 
@@ -65,7 +65,7 @@ def cs_zscore(pba, start, end, data, *args):
     for i in range(start, end):
         result[i,:] = core_cs_numba_inner.cs_zscore_inner(data[i,:])
         # tqdm update
-        pba.update.remote(1) 
+        pba.update(1) 
 
     return result
 
@@ -88,7 +88,7 @@ def cs_winsorize(pba, start, end, data, *args):
     for i in range(start, end):
         result[i,:] = core_cs_numba_inner.cs_winsorize_inner(data[i,:], sigma)
         # tqdm update
-        pba.update.remote(1) 
+        pba.update(1) 
 
     return result
 
@@ -112,7 +112,7 @@ def cs_truncate(pba, start, end, data, *args):
     for i in range(start, end):
         result[i,:] = core_cs_numba_inner.cs_truncate_inner(data[i,:], maxPercent)
         # tqdm update
-        pba.update.remote(1) 
+        pba.update(1) 
 
     return result
 
@@ -137,7 +137,7 @@ def cs_softmax(pba, start, end, data, *args):
     for i in range(start, end):
         result[i,:] = core_cs_numba_inner.cs_softmax_inner(data[i,:])
         # tqdm update
-        pba.update.remote(1)  
+        pba.update(1)  
 
     return result
 
@@ -155,13 +155,14 @@ def cs_top(pba, start, end, data, *args):
     n = args[0][0]
     satify = args[0][1]
     otherwise = args[0][2]
+    ties = args[0][3]
 
     result = np.zeros_like(data)
     result[start:end,:] = np.nan
 
     for i in range(start, end):
-        result[i,:] = core_cs_numba_inner.cs_top_inner(data[i,:], n, satify, otherwise)
+        result[i,:] = core_cs_numba_inner.cs_top_inner(data[i,:], n, satify, otherwise, ties)
         # tqdm update
-        pba.update.remote(1)  
+        pba.update(1)  
 
     return result
\ No newline at end of file
@@ -97,23 +97,41 @@ def cs_softmax_inner(arr):
 
     return result
 
-def cs_top_inner(arr, n, satify, otherwise):
+def cs_top_inner(arr, n, satify, otherwise, ties):
     """Top.
 
     Args:
-        progress_proxy (numba-progress obj): used for tqdm progressbar
-        data (2d-np.array): input data
+        arr (1d-np.array): input data
+        n (int): number of assets to pick
+        satify (int/float): value to give if an asset is in the top 'n'
+        otherwise (int/float): value to give if an asset isn't in the top 'n'
+        ties (str, one in ['all', 'first']): keep every asset tied with the n-th value or exactly n
 
     Returns:
-        2d-np.array
+        1d-np.array
+
+    Note:
+        The n-th largest value comes from np.partition of the valid values, nan is never picked
     """
-    num_nan = np.sum(np.isnan(arr))
-    tmp = arr.argsort(kind="mergesort")
-    if n < num_nan:
-        tmp = tmp[:-num_nan]
-    tmp = arr[tmp]
-    nth = tmp[-n]
-    result = np.where(arr>=nth, satify, otherwise)
+    result = np.zeros(arr.shape[0]) * np.nan
+    valid = arr[~np.isnan(arr)]
+    if valid.shape[0] == 0:
+        return result
+    if n <= 0:
+        result[:] = otherwise
+        return result
+
+    k = max(valid.shape[0] - n, 0)
+    nth = np.partition(valid, k)[k]
+    room = n - np.sum(valid > nth)
+    for i in range(arr.shape[0]):
+        if arr[i] > nth:
+            result[i] = satify
+        elif arr[i] == nth and (ties == "all" or room > 0):
+            result[i] = satify
+            room -= 1
+        else:
+            result[i] = otherwise
 
     return result
 
@@ -1,35 +1,107 @@
+import inspect
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from . utils import ols_solve
+
+def _window_rank(arr, lookback, method, na_option):
+    """Scaled rank of the last value of every window of one asset by counting.
+
+    Args:
+        arr (1d-np.array): data
+        lookback (int): lookback period
+        method (str): one in ['ordinal', 'average', 'min', 'max', 'dense']
+        na_option (str): one in ['keep', 'top', 'bottom']
+
+    Returns:
+        1d-np.array, rank of the last value over the largest rank of the window, 0 ~ 1
+
+    Note:
+        Only the last value is ranked, comparing it with the window is O(lookback),
+        only 'dense' sorts the window to count distinct values.
+    """
+    result = np.zeros(arr.shape[0]) * np.nan
+    if arr.shape[0] < lookback:
+        return result
+
+    window = sliding_window_view(arr, lookback)
+    last = window[:,-1:]
+    isNan = np.isnan(window)
+    isLastNan = isNan[:,-1]
+    number_of_nan = isNan.sum(axis=1)
+    number_of_values = lookback - number_of_nan
+
+    less = (window < last).sum(axis=1)
+    ties = (window == last).sum(axis=1) - 1
+    largest = np.max(np.where(isNan, -np.inf, window), axis=1, keepdims=True)
+    largest_ties = (window == largest).sum(axis=1)
+
+    # 0-based rank of the last value when it is a value, nan is a group above the values
+    if method == "dense":
+        sorted_window = np.sort(window, axis=1)
+        isNew = np.ones(window.shape, dtype=bool)
+        isNew[:,1:] = sorted_window[:,1:] != sorted_window[:,:-1]
+        isNew = isNew & ~np.isnan(sorted_window)
+        distinct = isNew.sum(axis=1)
+        rank = np.where(isLastNan, distinct, (isNew & (sorted_window < last)).sum(axis=1))
+    else:
+        low = np.where(isLastNan, number_of_values, less)
+        high = low + np.where(isLastNan, number_of_nan - 1, ties)
+        rank = {"ordinal": high, "min": low, "max": high, "average": (low + high) / 2}[method]
+
+    # the largest 0-based rank of the window
+    isNanRanked = (na_option != "keep") & (number_of_nan > 0)
+    number_ranked = number_of_values if na_option == "keep" else lookback
+    if method == "dense":
+        top_rank = distinct - 1 + isNanRanked
+    else:
+        # size of the tie group holding the largest rank
+        if na_option == "bottom":
+            top_ties = np.where(number_of_nan > 0, number_of_nan, largest_ties)
+        elif na_option == "top":
+            top_ties = np.where(number_of_values > 0, largest_ties, number_of_nan)
+        else:
+            top_ties = largest_ties
+        top_rank = {"ordinal": number_ranked - 1, "max": number_ranked - 1,
+                    "min": number_ranked - top_ties, "average": number_ranked - 1 - (top_ties - 1) / 2}[method]
+
+    if na_option == "top":
+        # nan moves below the values
+        if method == "dense":
+            rank = np.where(isLastNan, 0, rank + isNanRanked)
+        else:
+            rank = np.where(isLastNan, rank - number_of_values, rank + number_of_nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaled = rank / top_rank
+    if na_option == "keep":
+        scaled = np.where(isLastNan, np.nan, scaled)
+    result[lookback-1:] = scaled
+    return result
 
 def ts_rank(pba, start, end, data, *args):
     """Inner function to calulate rank.
 
     Args:
         data (2d-np.array): array, length is lookback period
-        lookback (int): lookback period
-        *args (tuple): delivers function settings
-    
+        *args (): delivers function settings, lookback, method and na_option
+
     Returns:
         2d-np.array
     """
     data = data[0]
     lookback = args[0][0]
+    method = args[0][1]
+    na_option = args[0][2]
 
-    result = np.zeros_like(data)
+    result = np.zeros_like(data, dtype=np.float64)
     result[start:end,:] = np.nan
-    number_of_days = result.shape[1] + 1
 
     for j in range(start, end):
-        arr = data[j]
-        for i in range(lookback, number_of_days):
-            _arr = arr[i-lookback:i].copy()
-            if np.sum(np.isnan(_arr)) == lookback:
-                continue
-            else:
-                ranks = _arr.argsort(kind='mergesort').argsort(kind='mergesort')
-                ranks = np.where(ranks>=(ranks.shape[0]-np.isnan(_arr).sum()), np.nan, ranks)
-                result[j,i-1] = (ranks/np.nanmax(ranks))[-1]
+        result[j] = _window_rank(np.asarray(data[j], dtype=np.float64), lookback, method, na_option)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -60,7 +132,7 @@ def ts_zscore(pba, start, end, data, *args):
             else:
                 result[j,i-1] = np.divide(_arr - np.nanmean(_arr), np.nanstd(_arr))[-1]
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -95,7 +167,7 @@ def ts_winsorize(pba, start, end, data, *args):
                 tmp = high_adjust + low_adjust
                 result[j,i-1] = (np.where(tmp==0, _arr, tmp))[-1]
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -128,7 +200,7 @@ def ts_truncate(pba, start, end, data, *args):
                 available_max = np.nansum(_arr) * maxPercent
                 result[j,i-1] = (np.where(_arr>available_max, available_max, _arr))[-1]
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -163,7 +235,7 @@ def ts_corr_pearson(pba, start, end, data, *args):
                 # calculate correlation
                 result[j,i-1] = np.corrcoef(_y_arr, _x_arr)[0,1]
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -203,49 +275,261 @@ def ts_corr_spearman(pba, start, end, data, *args):
                 # calculate correlation
                 result[j,i-1] = np.corrcoef(y_ranks, x_ranks)[0,1]
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
-# def ts_corr_kendall(y_mat, x_vec, lookback, **kargs):
-#     """Inner function to calculate Kendall's rank correlation.
+def _kendall_terms(y_arr, x_arr, lookback):
+    """Windowed pair sums of Kendall's tau for every day of one asset.
 
-#     Args:
-#         y_mat (2d-np.array): data
-#         x_vec (1d-np.array): data
-#         lookback (int): lookback period
-#         **kargs (): delivers function settings
-    
-#     Returns:
-#         2d-np.array
-#     """
-#     result = np.zeros_like(y_mat) * np.nan
-#     number_of_stocks = result.shape[0]
-#     number_of_days = result.shape[1] + 1
-
-#     for j in tqdm(range(number_of_stocks), disable=kargs["_off_tqdm"], desc="ts_truncate"):
-#         arr = y_mat[j]
-#         for i in range(lookback, number_of_days):
-#             # select window
-#             _y_arr = arr[i-lookback:i]
-#             _x_arr = x_vec[i-lookback:i]
-#             # prepare nan mask
-#             y_mask = _y_arr * 0
-#             x_mask = _x_arr * 0
-#             # calculate ranks
-#             y_ranks = _y_arr.argsort(kind='mergesort').argsort(kind='mergesort')
-#             y_ranks = np.where(y_ranks>=(y_ranks.shape[0]-np.isnan(_y_arr).sum()), np.nan, y_ranks)
-#             x_ranks = _x_arr.argsort(kind='mergesort').argsort(kind='mergesort')
-#             x_ranks = np.where(x_ranks>=(x_ranks.shape[0]-np.isnan(_x_arr).sum()), np.nan, x_ranks)
-#             # nan masking
-#             y_ranks = y_mask * y_ranks
-#             x_ranks = x_mask * x_ranks
-#             # calculate correlation
-#             result[j,i-1] = np.corrcoef(y_ranks, x_ranks)[0,1]
-
-#     return result
-
-### Applies don't support use_numba = True.
+    Args:
+        y_arr (1d-np.array): data
+        x_arr (1d-np.array): data
+        lookback (int): lookback period
+
+    Returns:
+        tuple of 1d-np.array: sum of sign products, tied pairs in y, tied pairs in x
+    """
+    pad = np.full(lookback, np.nan)
+    # row t holds the days [t-lookback, t], the first day leaves and the last day enters the window
+    y_win = sliding_window_view(np.concatenate([pad, y_arr]), lookback+1)
+    x_win = sliding_window_view(np.concatenate([pad, x_arr]), lookback+1)
+
+    def pair_sums(col):
+        dy = np.sign(y_win[:, [col]] - y_win[:, 1:-1])
+        dx = np.sign(x_win[:, [col]] - x_win[:, 1:-1])
+        # pairs with a nan compare as nan and drop out of every sum
+        return np.stack([np.nansum(dy*dx, axis=1), np.sum(dy == 0, axis=1), np.sum(dx == 0, axis=1)])
+
+    # window sums = running total of entering pairs minus leaving pairs
+    return np.cumsum(pair_sums(-1) - pair_sums(0), axis=1)
+
+def ts_corr_kendall(pba, start, end, data, *args):
+    """Inner function to calculate Kendall's rank correlation (tau-b).
+
+    Args:
+        y_mat (2d-np.array): data
+        x_vec (1d-np.array): data
+        *args (): delivers function settings
+
+    Returns:
+        2d-np.array
+
+    Note:
+        Window sums are updated with the pairs of the entering and the leaving day,
+        O(lookback) per day instead of O(lookback^2)
+    """
+    y_mat = data[0]
+    x_vec = data[1]
+    lookback = args[0][0]
+
+    result = np.zeros_like(y_mat)
+    result[start:end,:] = np.nan
+    number_of_days = result.shape[1]
+    number_of_pairs = lookback * (lookback-1) / 2
+
+    for j in range(start, end):
+        arr = y_mat[j]
+        s, y_ties, x_ties = _kendall_terms(arr, x_vec, lookback)
+        # windows with any nan stay nan
+        isNan = np.concatenate([[0], np.cumsum(np.isnan(arr) | np.isnan(x_vec))])
+        isValid = np.zeros(number_of_days, dtype=bool)
+        isValid[lookback-1:] = (isNan[lookback:] - isNan[:-lookback]) == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tau = s / np.sqrt((number_of_pairs-y_ties) * (number_of_pairs-x_ties))
+        result[j] = np.where(isValid & np.isfinite(tau), tau, np.nan)
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+### Exponential Weights ###
+def _ew_moments(x, y, alpha, min_periods, bias):
+    """Exponentially weighted means and covariance, every row at once.
+
+    Args:
+        x (2d-np.array): (rows, days) data
+        y (2d-np.array): (rows, days) data
+        alpha (float): smoothing factor
+        min_periods (int): observations needed for a value
+        bias (bool): skip the bias correction of the covariance
+
+    Returns:
+        tuple of 2d-np.array: ew mean of x, ew mean of y, ew covariance
+
+    Note:
+        Same recursion as pd.DataFrame.ewm(adjust=True, ignore_na=False), weights of
+        past observations keep decaying over days with nan. The loop runs over days,
+        every step is vectorized over rows.
+    """
+    n, number_of_days = x.shape
+    factor = 1 - alpha
+    min_periods = max(min_periods, 1)
+
+    mean_x = np.zeros(n) * np.nan
+    mean_y = np.zeros(n) * np.nan
+    cov = np.zeros(n)
+    sum_wt = np.ones(n)
+    sum_wt2 = np.ones(n)
+    old_wt = np.ones(n)
+    nobs = np.zeros(n)
+
+    result_x = np.zeros((n, number_of_days)) * np.nan
+    result_y = np.zeros((n, number_of_days)) * np.nan
+    result_cov = np.zeros((n, number_of_days)) * np.nan
+
+    for i in range(number_of_days):
+        cur_x = x[:, i]
+        cur_y = y[:, i]
+        isObs = ~np.isnan(cur_x) & ~np.isnan(cur_y)
+        isStarted = ~np.isnan(mean_x)
+        isUpdate = isStarted & isObs
+        nobs += isObs
+
+        # decay
+        sum_wt = np.where(isStarted, sum_wt*factor, sum_wt)
+        sum_wt2 = np.where(isStarted, sum_wt2*factor**2, sum_wt2)
+        old_wt = np.where(isStarted, old_wt*factor, old_wt)
+
+        # update
+        old_mean_x = mean_x
+        old_mean_y = mean_y
+        with np.errstate(invalid="ignore"):
+            mean_x = np.where(isUpdate & (mean_x != cur_x), (old_wt*old_mean_x + cur_x) / (old_wt+1), mean_x)
+            mean_y = np.where(isUpdate & (mean_y != cur_y), (old_wt*old_mean_y + cur_y) / (old_wt+1), mean_y)
+            cov = np.where(isUpdate, (old_wt*(cov + (old_mean_x-mean_x)*(old_mean_y-mean_y)) + (cur_x-mean_x)*(cur_y-mean_y)) / (old_wt+1), cov)
+        sum_wt = sum_wt + isUpdate
+        sum_wt2 = sum_wt2 + isUpdate
+        old_wt = old_wt + isUpdate
+
+        # first observation
+        mean_x = np.where(~isStarted & isObs, cur_x, mean_x)
+        mean_y = np.where(~isStarted & isObs, cur_y, mean_y)
+
+        isEnough = nobs >= min_periods
+        result_x[:, i] = np.where(isEnough, mean_x, np.nan)
+        result_y[:, i] = np.where(isEnough, mean_y, np.nan)
+        if bias:
+            result_cov[:, i] = np.where(isEnough, cov, np.nan)
+        else:
+            numerator = sum_wt * sum_wt
+            denominator = numerator - sum_wt2
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result_cov[:, i] = np.where(isEnough & (denominator > 0), numerator / denominator * cov, np.nan)
+
+    return result_x, result_y, result_cov
+
+def _ew_pair(data, start, end):
+    """Rows [start:end] of y and x, x with one row is broadcast to every asset."""
+    y = np.array(data[0][start:end], dtype=np.float64)
+    x_mat = data[1]
+    x = np.array(np.broadcast_to(x_mat[start:end] if x_mat.shape[0] > 1 else x_mat, y.shape), dtype=np.float64)
+    return y, x
+
+def ts_ew_mean(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted mean.
+
+    Args:
+        data (2d-np.array): input data
+        *args (): delivers function settings, alpha and min_periods
+
+    Returns:
+        2d-np.array of the block
+    """
+    alpha, min_periods = args[0][0], args[0][1]
+    x = np.array(data[0][start:end], dtype=np.float64)
+
+    result, _, _ = _ew_moments(x, x, alpha, min_periods, True)
+    # tqdm update
+    pba.update(end-start)
+
+    return result
+
+def ts_ew_std(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted standard deviation.
+
+    Args:
+        data (2d-np.array): input data
+        *args (): delivers function settings, alpha, min_periods and bias
+
+    Returns:
+        2d-np.array of the block
+    """
+    alpha, min_periods, bias = args[0][0], args[0][1], args[0][2]
+    x = np.array(data[0][start:end], dtype=np.float64)
+
+    _, _, var = _ew_moments(x, x, alpha, min_periods, bias)
+    # tqdm update
+    pba.update(end-start)
+
+    return np.sqrt(var)
+
+def ts_ew_zscore(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted z-score.
+
+    Args:
+        data (2d-np.array): input data
+        *args (): delivers function settings, alpha, min_periods and bias
+
+    Returns:
+        2d-np.array of the block
+    """
+    alpha, min_periods, bias = args[0][0], args[0][1], args[0][2]
+    x = np.array(data[0][start:end], dtype=np.float64)
+
+    mean, _, var = _ew_moments(x, x, alpha, min_periods, bias)
+    # tqdm update
+    pba.update(end-start)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (x - mean) / np.sqrt(var)
+
+def ts_ew_cov(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted covariance.
+
+    Args:
+        y_mat (2d-np.array): data
+        x_mat (2d-np.array): data, one row is broadcast to every asset
+        *args (): delivers function settings, alpha, min_periods and bias
+
+    Returns:
+        2d-np.array of the block
+    """
+    alpha, min_periods, bias = args[0][0], args[0][1], args[0][2]
+    y, x = _ew_pair(data, start, end)
+
+    _, _, cov = _ew_moments(y, x, alpha, min_periods, bias)
+    # tqdm update
+    pba.update(end-start)
+
+    return cov
+
+def ts_ew_corr(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted correlation.
+
+    Args:
+        y_mat (2d-np.array): data
+        x_mat (2d-np.array): data, one row is broadcast to every asset
+        *args (): delivers function settings, alpha and min_periods
+
+    Returns:
+        2d-np.array of the block
+    """
+    alpha, min_periods = args[0][0], args[0][1]
+    y, x = _ew_pair(data, start, end)
+    # variances use the days on which both are valid
+    y, x = y + 0*x, x + 0*y
+
+    _, _, cov = _ew_moments(y, x, alpha, min_periods, True)
+    _, _, y_var = _ew_moments(y, y, alpha, min_periods, True)
+    _, _, x_var = _ew_moments(x, x, alpha, min_periods, True)
+    # tqdm update
+    pba.update(end-start)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cov / np.sqrt(np.maximum(y_var*x_var, 0))
+
+### Applies ###
 def ts_apply(pba, start, end, data, *args):
     """Apply user-defined function.
 
@@ -271,7 +555,105 @@ def ts_apply(pba, start, end, data, *args):
             _arr = arr[i-lookback:i].copy()
             result[j,i-1] = func(_arr, *inner_args)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
+
+    return result
+
+def _window_call(func, windows, inner_args):
+    """Call func on a stack of windows, telling it the window axis if it takes one.
+
+    Note:
+        NumPy reductions take an axis argument, so eg) np.nanpercentile can be applied
+        as ts.apply(data, 20, np.nanpercentile, 90, engine="vector") without a lambda
+    """
+    try:
+        accepts_axis = "axis" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        accepts_axis = False
+
+    if accepts_axis:
+        return func(windows, *inner_args, axis=-1)
+    return func(windows, *inner_args)
+
+def ts_apply_vector(pba, start, end, data, *args):
+    """Apply vectorizable user-defined function to every window of an asset at once.
+
+    Args:
+        data (2d-np.array): input data
+        *args (): arguments for user-defined function
+
+    Returns:
+        2d-np.array
+
+    Note:
+        func gets a zero-copy (number of windows, lookback) view, one window per row,
+        and must return one value per window, eg) lambda w: np.nanmean(w, axis=-1)
+        If it does not, falls back to ts_apply
+    """
+    data = data[0]
+    lookback = args[0][0]
+    func = args[0][1]
+    inner_args = args[0][2]
+
+    result = np.zeros_like(data)
+    result[start:end,:] = np.nan
+    if data.shape[1] < lookback:
+        return result
+
+    for j in range(start, end):
+        windows = sliding_window_view(data[j], lookback)
+        if j == start:
+            try:
+                values = np.asarray(_window_call(func, windows, inner_args))
+            except Exception:
+                values = None
+            if values is None or values.shape != (windows.shape[0],):
+                # Not vectorizable, call func window by window
+                return ts_apply(pba, start, end, [data], *args)
+        else:
+            values = _window_call(func, windows, inner_args)
+        result[j,lookback-1:] = values
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def ts_apply_block(pba, start, end, data, *args):
+    """Apply vectorizable user-defined function to every window of the block in one call.
+
+    Args:
+        data (2d-np.array): input data
+        *args (): arguments for user-defined function
+
+    Returns:
+        2d-np.array of the block
+
+    Note:
+        func gets a zero-copy (assets, number of windows, lookback) view and must return
+        a (assets, number of windows) array, eg) lambda w: np.nanmean(w, axis=-1)
+        If it does not, falls back to ts_apply_vector
+    """
+    data = data[0]
+    lookback = args[0][0]
+    func = args[0][1]
+    inner_args = args[0][2]
+
+    result = np.zeros((end-start, data.shape[1]))
+    result[:,:] = np.nan
+    if data.shape[1] < lookback:
+        return result
+
+    windows = sliding_window_view(data[start:end], lookback, axis=1)
+    try:
+        values = np.asarray(_window_call(func, windows, inner_args))
+    except Exception:
+        values = None
+    if values is None or values.shape != windows.shape[:2]:
+        return ts_apply_vector(pba, start, end, [data], *args)
+
+    result[:,lookback-1:] = values
+    # tqdm update
+    pba.update(end-start)
 
     return result
 
@@ -307,7 +689,7 @@ def ts_dual_apply(pba, start, end, data, *args):
             _x_arr = x_arr[i-lookback:i].copy()
             result[j,i-1] = func(_y_arr, _x_arr, *inner_args)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -337,6 +719,194 @@ def ts_multi_apply(pba, start, end, data, *args):
             result_args = tuple(data_args_arr + inner_args)
             result[j,i-1] = func(*result_args)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
+
+    return result
+
+def ts_regression(pba, start, end, data, *args):
+    """Inner function to calculate rolling OLS regression.
 
-    return result
\ No newline at end of file
+    Args:
+        y_mat (2d-np.array): dependent variable
+        x_mats (2d-np.array): independent variables, one row is broadcast to every asset
+        lookback (int): lookback period
+        *args (): delivers function settings
+
+    Returns:
+        dict of 2d-np.array of the block, "intercept", "slope0", "slope1", ..., "residual", "r2"
+
+    Note:
+        Cross-products of the window are differences of cumulative sums, so every window
+        costs O(1) regardless of lookback, and are centered with the mean of the window.
+        Data are shifted by the first valid observation of each asset first to keep the
+        cumulative sums accurate, so no window reads a later observation.
+        Observations with any NaN are dropped from the window, windows with a constant
+        or collinear regressor are NaN. residual is the error of the last observation of the window.
+    """
+    y_mat = data[0]
+    x_mats = data[1:]
+    lookback = args[0][0]
+
+    y = np.array(y_mat[start:end], dtype=np.float64)
+    xs = [np.array(np.broadcast_to(x_mat[start:end] if x_mat.shape[0] > 1 else x_mat, y.shape), dtype=np.float64) for x_mat in x_mats]
+    n, number_of_days = y.shape
+    p = len(xs) + 1
+
+    result = {key: np.zeros((n, number_of_days)) * np.nan for key in ["intercept", "residual", "r2"] + ["slope{k}".format(k=k) for k in range(p-1)]}
+    if number_of_days < lookback:
+        return result
+
+    isValid = np.isfinite(y)
+    for x in xs:
+        isValid = isValid & np.isfinite(x)
+    v = isValid.astype(np.float64)
+
+    # shift by the first valid observation, earlier than every window reading it
+    first = isValid.argmax(axis=1)[:,None]
+    y_shift = np.where(isValid.any(axis=1, keepdims=True), np.take_along_axis(y, first, axis=1), 0)
+    x_shifts = [np.where(isValid.any(axis=1, keepdims=True), np.take_along_axis(x, first, axis=1), 0) for x in xs]
+    ys = np.where(isValid, y - y_shift, 0)
+    z = np.stack([v] + [np.where(isValid, x - x_shift, 0) for x, x_shift in zip(xs, x_shifts)], axis=-1)
+
+    def window_sum(arr):
+        cum = np.cumsum(arr, axis=1)
+        windowed = cum[:, lookback-1:].copy()
+        windowed[:, 1:] -= cum[:, :-lookback]
+        return windowed
+
+    zz = window_sum(z[...,:,None] * z[...,None,:])
+    zy = window_sum(z * ys[...,None])
+    yy = window_sum(ys * ys)
+
+    # center every window with its own mean
+    count = zz[...,0,0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_sum = zz[...,0,1:]
+        y_sum = zy[...,0]
+        sxx = zz[...,1:,1:] - x_sum[...,:,None]*x_sum[...,None,:] / count[...,None,None]
+        sxy = zy[...,1:] - x_sum*y_sum[...,None] / count[...,None]
+        syy = yy - y_sum**2 / count
+        x_means = x_sum / count[...,None]
+        y_means = y_sum / count
+
+    slopes, r2 = ols_solve(sxx, sxy, syy, count, np.diagonal(zz[...,1:,1:], axis1=-2, axis2=-1))
+
+    intercept = y_means + y_shift - np.einsum("...k,...k->...", slopes, x_means)
+    for k in range(p-1):
+        intercept = intercept - slopes[...,k]*x_shifts[k]
+    fitted = intercept.copy()
+    for k in range(p-1):
+        fitted = fitted + slopes[...,k]*xs[k][:, lookback-1:]
+
+    result["intercept"][:, lookback-1:] = intercept
+    result["r2"][:, lookback-1:] = r2
+    result["residual"][:, lookback-1:] = np.where(isValid[:, lookback-1:], y[:, lookback-1:] - fitted, np.nan)
+    for k in range(p-1):
+        result["slope{k}".format(k=k)][:, lookback-1:] = slopes[...,k]
+    # tqdm update
+    pba.update(end-start)
+
+    return result
+
+### Matrices ###
+def ts_cov_matrix_iter(data, lookback, halflife, isCorr):
+    """Rolling covariance (or correlation) matrix, one date at a time.
+
+    Args:
+        data (2d-np.array): date-major panel (days, assets)
+        lookback (int/None): lookback period, None keeps every past day
+        halflife (float/None): halflife of exponential weights, None weights days equally
+        isCorr (bool): return correlation instead of covariance
+
+    Yields:
+        (int, 2d-np.array): date position and the (assets, assets) matrix
+
+    Note:
+        Window sums are kept with rank-1 updates, the entering day is added and the leaving
+        day subtracted, so a date costs O(assets^2) regardless of lookback.
+        Pairs use the days on which both assets are valid, as pd.DataFrame.rolling().cov().
+        Weighted covariance is bias-corrected, as pd.DataFrame.ewm(adjust=True).cov().
+        Dates before the first full window and pairs with fewer than 2 days are NaN.
+        Sums are kept around an anchor per asset, first its first valid value. Once the sums of
+        squares around the anchor have grown a million times the centered ones, eg) after a level
+        shift left the window, the sums are rebuilt from the window around its mean, so digits
+        are not lost to cancellation. Anchors only read past days, the matrix at a date does not
+        depend on later dates.
+    """
+    arr = np.array(data, dtype=np.float64)
+    number_of_days, n = arr.shape
+    decay = 1.0 if halflife is None else 0.5 ** (1/halflife)
+
+    # center for accurate running sums, covariance does not depend on the anchor
+    isValid = np.isfinite(arr)
+    first = isValid.argmax(axis=0)
+    anchor = np.where(isValid.any(axis=0), arr[first, np.arange(n)], 0)
+    anchor = np.where(np.isfinite(anchor), anchor, 0)
+    v = isValid.astype(np.float64)
+    # days a rebuild reads, without lookback the days whose weight is above machine epsilon
+    horizon = lookback if lookback is not None else int(np.ceil(np.log(np.finfo(np.float64).eps) / np.log(decay)))
+    peak = np.zeros(n)
+
+    # without nan every pair shares the same days, pairwise sums collapse to one column
+    isDense = bool(isValid.all())
+    m = 1 if isDense else n
+    ones = np.ones(1)
+
+    C = np.zeros((m, m))    # days of the pair
+    W = np.zeros((m, m))    # weights of the pair
+    W2 = np.zeros((m, m))   # squared weights of the pair
+    A = np.zeros((n, m))    # weighted sum of asset i over the pair
+    B = np.zeros((n, m))    # weighted sum of squares of asset i over the pair
+    P = np.zeros((n, n))    # weighted sum of cross products
+
+    def rank_one(days, weights):
+        # entering and leaving days go in one pass, every sum takes a single matrix product
+        w = np.array(weights)[:,None]
+        vi = np.ones((len(days), 1)) if isDense else v[days]
+        xi = np.where(isValid[days], arr[days] - anchor, 0)
+        C[...] += vi.T @ (np.sign(w) * vi)
+        W[...] += vi.T @ (w * vi)
+        W2[...] += vi.T @ (np.sign(w) * w**2 * vi)
+        A[...] += xi.T @ (w * vi)
+        B[...] += (xi**2).T @ (w * vi)
+        P[...] += xi.T @ (w * xi)
+
+    for i in range(number_of_days):
+        if decay != 1.0:
+            for s in [W, A, B, P]:
+                s *= decay
+            W2 *= decay**2
+        if lookback is not None and i >= lookback:
+            rank_one([i, i-lookback], [1.0, -decay**lookback])
+        else:
+            rank_one([i], [1.0])
+
+        # sums of squares around the anchor against the centered ones of each asset
+        w, a, b = (W[0,0], A[:,0], B[:,0]) if isDense else (np.diag(W), np.diag(A), np.diag(B))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centered = np.where(w > 0, b - a**2/w, 0)
+        peak = np.maximum(peak, b)
+        if (peak > 1e6 * centered).any():
+            # re-anchor on the window mean and rebuild its sums
+            days = np.arange(max(i-horizon+1, 0), i+1)
+            with np.errstate(invalid="ignore"):
+                window_mean = np.where(isValid[days], arr[days], 0).sum(axis=0) / isValid[days].sum(axis=0)
+            anchor = np.where(np.isfinite(window_mean), window_mean, anchor)
+            for s in [C, W, W2, A, B, P]:
+                s[...] = 0
+            rank_one(days, decay ** (i - days))
+            peak = B[:,0].copy() if isDense else np.diag(B).copy()
+
+        if (lookback is not None and i < lookback-1) or (isDense and C[0,0] < 2):
+            yield i, np.zeros((n, n)) * np.nan
+            continue
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = A / W
+            factor = W**2 / (W**2 - W2)
+            matrix = (P/W - mean*mean.T) * factor
+            if isCorr:
+                var = (B/W - mean**2) * factor
+                matrix = matrix / np.sqrt(var*var.T)
+                np.fill_diagonal(matrix, np.where(np.isfinite(np.diag(matrix)), 1.0, np.nan))
+        yield i, matrix if isDense else np.where(C >= 2, matrix, np.nan)
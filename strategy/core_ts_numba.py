@@ -1,5 +1,9 @@
 import numpy as np
+from numba import njit, errors
+from numba.core.dispatcher import Dispatcher
+from numpy.lib.stride_tricks import sliding_window_view
 
+from . import core_ts
 from . import core_ts_numba_inner
 
 def ts_rank(pba, start, end, data, *args):
@@ -23,7 +27,7 @@ def ts_rank(pba, start, end, data, *args):
     for j in range(start, end):
         result[j] = core_ts_numba_inner.ts_rank_inner(data[j], lookback, number_of_days)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -48,7 +52,7 @@ def ts_zscore(pba, start, end, data, *args):
     for j in range(start, end):
         result[j] = core_ts_numba_inner.ts_zscore_inner(data[j], lookback, number_of_days)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -74,7 +78,7 @@ def ts_winsorize(pba, start, end, data, *args):
     for j in range(start, end):
         result[j] = core_ts_numba_inner.ts_winsorize_inner(data[j], lookback, number_of_days, sigma)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -98,9 +102,9 @@ def ts_truncate(pba, start, end, data, *args):
     number_of_days = result.shape[1] + 1
 
     for j in range(start, end):
-        result[j] = core_ts_numba_inner.ts_winsorize_inner(data[j], lookback, number_of_days, maxPercent)
+        result[j] = core_ts_numba_inner.ts_truncate_inner(data[j], lookback, number_of_days, maxPercent)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -126,7 +130,7 @@ def ts_corr_pearson(pba, start, end, data, *args):
     for j in range(start, end):
         result[j] = core_ts_numba_inner.ts_corr_pearson_inner(y_mat[j], x_vec, lookback, number_of_days)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
@@ -152,51 +156,196 @@ def ts_corr_spearman(pba, start, end, data, *args):
     for j in range(start, end):
         result[j] = core_ts_numba_inner.ts_corr_spearman_inner(y_mat[j], x_vec, lookback, number_of_days)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
-# def ts_corr_kendall(y_mat, x_vec, lookback, **kargs):
-#     """Inner function to calculate Kendall's rank correlation.
+def ts_corr_kendall(pba, start, end, data, *args):
+    """Inner function to calculate Kendall's rank correlation (tau-b).
 
-#     Args:
-#         y_mat (2d-np.array): data
-#         x_vec (1d-np.array): data
-#         lookback (int): lookback period
-#         **kargs (): delivers function settings
+    Args:
+        y_mat (2d-np.array): data
+        x_vec (1d-np.array): data
+        *args (): delivers function settings
     
-#     Returns:
-#         2d-np.array
-#     """
-#     result = np.zeros_like(y_mat) * np.nan
-#     number_of_stocks = result.shape[0]
-#     number_of_days = result.shape[1] + 1
-
-#     for j in tqdm(range(number_of_stocks), disable=kargs["_off_tqdm"], desc="ts_truncate"):
-#         arr = y_mat[j]
-#         for i in range(lookback, number_of_days):
-#             # select window
-#             _y_arr = arr[i-lookback:i]
-#             _x_arr = x_vec[i-lookback:i]
-#             # prepare nan mask
-#             y_mask = _y_arr * 0
-#             x_mask = _x_arr * 0
-#             # calculate ranks
-#             y_ranks = _y_arr.argsort(kind='mergesort').argsort(kind='mergesort')
-#             y_ranks = np.where(y_ranks>=(y_ranks.shape[0]-np.isnan(_y_arr).sum()), np.nan, y_ranks)
-#             x_ranks = _x_arr.argsort(kind='mergesort').argsort(kind='mergesort')
-#             x_ranks = np.where(x_ranks>=(x_ranks.shape[0]-np.isnan(_x_arr).sum()), np.nan, x_ranks)
-#             # nan masking
-#             y_ranks = y_mask * y_ranks
-#             x_ranks = x_mask * x_ranks
-#             # calculate correlation
-#             result[j,i-1] = np.corrcoef(y_ranks, x_ranks)[0,1]
-
-#     return result
-
-### Applies don't support use_numba = True.
+    Returns:
+        2d-np.array
+    """
+    y_mat = data[0]
+    x_vec = data[1]
+    lookback = args[0][0]
+
+    result = np.zeros_like(y_mat)
+    result[start:end,:] = np.nan
+    number_of_days = result.shape[1] + 1
+
+    for j in range(start, end):
+        result[j] = core_ts_numba_inner.ts_corr_kendall_inner(y_mat[j], x_vec, lookback, number_of_days)
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+### Exponential Weights ###
+def ts_ew_mean(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted mean.
+
+    Args:
+        data (2d-np.array): input data
+        *args (): delivers function settings, alpha and min_periods
+
+    Returns:
+        2d-np.array
+    """
+    data = data[0]
+    alpha, min_periods = args[0][0], args[0][1]
+
+    result = np.zeros_like(data)
+    result[start:end,:] = np.nan
+
+    for j in range(start, end):
+        result[j] = core_ts_numba_inner.ts_ew_moments_inner(data[j], data[j], alpha, min_periods, True)[0]
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def ts_ew_std(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted standard deviation.
+
+    Args:
+        data (2d-np.array): input data
+        *args (): delivers function settings, alpha, min_periods and bias
+
+    Returns:
+        2d-np.array
+    """
+    data = data[0]
+    alpha, min_periods, bias = args[0][0], args[0][1], args[0][2]
+
+    result = np.zeros_like(data)
+    result[start:end,:] = np.nan
+
+    for j in range(start, end):
+        result[j] = np.sqrt(core_ts_numba_inner.ts_ew_moments_inner(data[j], data[j], alpha, min_periods, bias)[2])
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def ts_ew_zscore(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted z-score.
+
+    Args:
+        data (2d-np.array): input data
+        *args (): delivers function settings, alpha, min_periods and bias
+
+    Returns:
+        2d-np.array
+    """
+    data = data[0]
+    alpha, min_periods, bias = args[0][0], args[0][1], args[0][2]
+
+    result = np.zeros_like(data)
+    result[start:end,:] = np.nan
+
+    for j in range(start, end):
+        mean, _, var = core_ts_numba_inner.ts_ew_moments_inner(data[j], data[j], alpha, min_periods, bias)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[j] = (data[j] - mean) / np.sqrt(var)
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def ts_ew_cov(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted covariance.
+
+    Args:
+        y_mat (2d-np.array): data
+        x_mat (2d-np.array): data, one row is broadcast to every asset
+        *args (): delivers function settings, alpha, min_periods and bias
+
+    Returns:
+        2d-np.array
+    """
+    y_mat = data[0]
+    x_mat = data[1]
+    alpha, min_periods, bias = args[0][0], args[0][1], args[0][2]
+
+    result = np.zeros_like(y_mat)
+    result[start:end,:] = np.nan
+
+    for j in range(start, end):
+        x_arr = x_mat[j] if x_mat.shape[0] > 1 else x_mat[0]
+        result[j] = core_ts_numba_inner.ts_ew_moments_inner(y_mat[j], x_arr, alpha, min_periods, bias)[2]
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+def ts_ew_corr(pba, start, end, data, *args):
+    """Inner function to calculate exponentially weighted correlation.
+
+    Args:
+        y_mat (2d-np.array): data
+        x_mat (2d-np.array): data, one row is broadcast to every asset
+        *args (): delivers function settings, alpha and min_periods
+
+    Returns:
+        2d-np.array
+    """
+    y_mat = data[0]
+    x_mat = data[1]
+    alpha, min_periods = args[0][0], args[0][1]
+
+    result = np.zeros_like(y_mat)
+    result[start:end,:] = np.nan
+
+    for j in range(start, end):
+        y_arr = y_mat[j]
+        x_arr = x_mat[j] if x_mat.shape[0] > 1 else x_mat[0]
+        # variances use the days on which both are valid
+        y_arr, x_arr = y_arr + 0*x_arr, x_arr + 0*y_arr
+        cov = core_ts_numba_inner.ts_ew_moments_inner(y_arr, x_arr, alpha, min_periods, True)[2]
+        y_var = core_ts_numba_inner.ts_ew_moments_inner(y_arr, y_arr, alpha, min_periods, True)[2]
+        x_var = core_ts_numba_inner.ts_ew_moments_inner(x_arr, x_arr, alpha, min_periods, True)[2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[j] = cov / np.sqrt(np.maximum(y_var*x_var, 0))
+        # tqdm update
+        pba.update(1)
+
+    return result
+
+### Applies ###
+# User functions decorated with numba.njit run inside the compiled window loop.
+# Plain python functions are jitted on the fly, when numba cannot compile them
+# the applies fall back to core_ts. apply and dual_apply skip windows holding only nan,
+# on the fallback as well, so both paths return the same values.
+
+# UnsupportedBytecodeError does not derive from NumbaError
+_COMPILE_ERRORS = (errors.NumbaError, errors.UnsupportedBytecodeError)
+
+def is_jitted(func):
+    """Whether func is already a numba function."""
+    return isinstance(func, Dispatcher)
+
+def _jit(func):
+    if is_jitted(func):
+        return func
+    return njit(func)
+
+def _skip_empty_windows(result, data, lookback, start, end):
+    """Set nan where a window of any data in the block holds only nan."""
+    if result.shape[1] < lookback:
+        return result
+    for each_data in data:
+        isEmpty = sliding_window_view(np.isnan(each_data[start:end]), lookback, axis=1).all(axis=-1)
+        result[start:end,lookback-1:][isEmpty] = np.nan
+    return result
+
 def ts_apply(pba, start, end, data, *args):
-    """Apply user-defined function.
+    """Apply user-defined function inside compiled window loop.
 
     Args:
         data (2d-np.array): input data
@@ -204,31 +353,37 @@ def ts_apply(pba, start, end, data, *args):
 
     Returns:
         2d-np.array
+
+    Note:
+        Windows holding only nan are skipped and stay nan.
+        If func cannot be compiled, falls back to core_ts.ts_apply_vector
     """
     data = data[0]
     lookback = args[0][0]
     func = args[0][1]
-    inner_args = args[0][2]
+    inner_args = tuple(args[0][2])
 
     result = np.zeros_like(data)
     result[start:end,:] = np.nan
     number_of_days = result.shape[1] + 1
 
-    for j in range(start, end):
-        arr = data[j]
-        for i in range(lookback, number_of_days):
-            _arr = arr[i-lookback:i].copy()
-            if np.sum(np.isnan(_arr)) == lookback:
-                continue
-            else:
-                result[j,i-1] = func(_arr, *inner_args)
+    try:
+        jitted = _jit(func)
+        result[start] = core_ts_numba_inner.ts_apply_inner(data[start], lookback, number_of_days, jitted, inner_args)
+    except _COMPILE_ERRORS:
+        return _skip_empty_windows(core_ts.ts_apply_vector(pba, start, end, [data], *args), [data], lookback, start, end)
+    # tqdm update
+    pba.update(1)
+
+    for j in range(start+1, end):
+        result[j] = core_ts_numba_inner.ts_apply_inner(data[j], lookback, number_of_days, jitted, inner_args)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
 def ts_dual_apply(pba, start, end, data, *args):
-    """Apply user-defined function with two data arguments.
+    """Apply user-defined function with two data arguments inside compiled window loop.
     
     Args:
         y_mat (2d-np.array): input data1
@@ -239,37 +394,64 @@ def ts_dual_apply(pba, start, end, data, *args):
 
     Returns:
         2d-np.array
+
+    Note:
+        Windows where y or x holds only nan are skipped and stay nan.
+        If func cannot be compiled, falls back to core_ts.ts_dual_apply
     """
     y_mat = data[0]
     x_mat = data[1]
 
     lookback = args[0][0]
     func = args[0][1]
-    inner_args = args[0][2]
+    inner_args = tuple(args[0][2])
 
     result = np.zeros_like(y_mat)
     result[start:end,:] = np.nan
     number_of_days = result.shape[1] + 1
 
-    for j in range(start, end):
-        y_arr = y_mat[j,:]
-        x_arr = x_mat[j,:]
-        for i in range(lookback, number_of_days):
-            _y_arr = y_arr[i-lookback:i].copy()
-            _x_arr = x_arr[i-lookback:i].copy()
-            if np.sum(np.isnan(_y_arr)) == lookback:
-                continue
-            elif np.sum(np.isnan(_x_arr)) == lookback:
-                continue
-            else:
-                result[j,i-1] = func(_y_arr, _x_arr, *inner_args)
+    try:
+        jitted = _jit(func)
+        result[start] = core_ts_numba_inner.ts_dual_apply_inner(y_mat[start], x_mat[start], lookback, number_of_days, jitted, inner_args)
+    except _COMPILE_ERRORS:
+        return _skip_empty_windows(core_ts.ts_dual_apply(pba, start, end, data, *args), data, lookback, start, end)
+    # tqdm update
+    pba.update(1)
+
+    for j in range(start+1, end):
+        result[j] = core_ts_numba_inner.ts_dual_apply_inner(y_mat[j], x_mat[j], lookback, number_of_days, jitted, inner_args)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
     return result
 
+_multi_apply_inner = {}
+
+def _get_multi_apply_inner(number_of_data):
+    """Compile the window loop for a given number of data arguments.
+
+    Note:
+        numba cannot build a tuple of windows in a loop, so the loop is generated with
+        one argument per data, keeping the call as func(window_1, ..., window_n, *args)
+    """
+    if number_of_data not in _multi_apply_inner:
+        arrs = ", ".join(["arr{k}".format(k=k) for k in range(number_of_data)])
+        windows = ", ".join(["arr{k}[i-lookback:i]".format(k=k) for k in range(number_of_data)])
+        code = (
+            "def ts_multi_apply_inner({arrs}, lookback, number_of_days, func, inner_args):\n"
+            "    inner_result = np.zeros(arr0.shape[0]) * np.nan\n"
+            "    for i in range(lookback, number_of_days):\n"
+            "        inner_result[i-1] = func({windows}, *inner_args)\n"
+            "    return inner_result\n"
+        ).format(arrs=arrs, windows=windows)
+        namespace = {"np":np}
+        exec(code, namespace)
+        _multi_apply_inner[number_of_data] = njit(namespace["ts_multi_apply_inner"])
+
+    return _multi_apply_inner[number_of_data]
+
 def ts_multi_apply(pba, start, end, data, *args):
-    """Apply user-defined function with multiple data arguments.
+    """Apply user-defined function with multiple data arguments inside compiled window loop.
     
     Args:
         lookback (int): lookback period
@@ -277,24 +459,31 @@ def ts_multi_apply(pba, start, end, data, *args):
     
     Returns:
         2d-np.array
+
+    Note:
+        Every window is passed to func, including windows holding only nan.
+        If func cannot be compiled, falls back to core_ts.ts_multi_apply
     """
     lookback = args[0][0]
     func = args[0][1]
-    inner_args = list(args[0][2])
+    inner_args = tuple(args[0][2])
 
     result = np.zeros_like(data[0])
     result[start:end,:] = np.nan
     number_of_days = result.shape[1] + 1
 
-    for j in range(start, end):
-        for i in range(lookback, number_of_days):
-            data_args_arr = []
-            for each_data in data:
-                data_args_arr.append(each_data[j,:][i-lookback:i])
-
-            result_args = tuple(data_args_arr + inner_args)
-            result[j,i-1] = func(*result_args)
+    inner = _get_multi_apply_inner(len(data))
+    try:
+        jitted = _jit(func)
+        result[start] = inner(*[each_data[start] for each_data in data], lookback, number_of_days, jitted, inner_args)
+    except _COMPILE_ERRORS:
+        return core_ts.ts_multi_apply(pba, start, end, data, *args)
+    # tqdm update
+    pba.update(1)
+
+    for j in range(start+1, end):
+        result[j] = inner(*[each_data[j] for each_data in data], lookback, number_of_days, jitted, inner_args)
         # tqdm update
-        pba.update.remote(1)
+        pba.update(1)
 
-    return result
\ No newline at end of file
+    return result
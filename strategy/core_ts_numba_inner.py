@@ -152,4 +152,193 @@ def ts_corr_spearman_inner(y_arr, x_arr, lookback, number_of_days):
 
     return inner_result
 
+def ts_corr_kendall_inner(y_arr, x_arr, lookback, number_of_days):
+    """Inner function for ts_corr_kendall numba iteration.
+
+    Args:
+        y_arr (1d-np.array): array, length is lookback period
+        x_arr (1d-np.array): array, length is lookback period
+        lookback (int): lookback period
+        number_of_days (int): total data period
+    
+    Returns:
+        1d-np.array
+
+    Note:
+        Pair sums are carried from window to window, only the pairs of the
+        leaving and the entering day are visited
+    """
+    inner_result = np.zeros(y_arr.shape[0]) * np.nan
+    number_of_pairs = lookback * (lookback-1) / 2
+    s = 0.0
+    y_ties = 0.0
+    x_ties = 0.0
+    nan_count = 0
+    for i in range(number_of_days-1):
+        # drop the pairs of the leaving day
+        if i >= lookback:
+            o = i - lookback
+            for k in range(o+1, i):
+                dy = np.sign(y_arr[o] - y_arr[k])
+                dx = np.sign(x_arr[o] - x_arr[k])
+                if np.isnan(dy) or np.isnan(dx):
+                    continue
+                s -= dy * dx
+                y_ties -= dy == 0
+                x_ties -= dx == 0
+            nan_count -= np.isnan(y_arr[o]) or np.isnan(x_arr[o])
+        # add the pairs of the entering day
+        for k in range(max(i-lookback+1, 0), i):
+            dy = np.sign(y_arr[i] - y_arr[k])
+            dx = np.sign(x_arr[i] - x_arr[k])
+            if np.isnan(dy) or np.isnan(dx):
+                continue
+            s += dy * dx
+            y_ties += dy == 0
+            x_ties += dx == 0
+        nan_count += np.isnan(y_arr[i]) or np.isnan(x_arr[i])
+        # calculate correlation
+        if i >= lookback-1 and nan_count == 0:
+            denominator = np.sqrt((number_of_pairs-y_ties) * (number_of_pairs-x_ties))
+            if denominator > 0:
+                inner_result[i] = s / denominator
+
+    return inner_result
+
+def ts_ew_moments_inner(x_arr, y_arr, alpha, min_periods, bias):
+    """Inner function for exponentially weighted moments numba iteration.
+
+    Args:
+        x_arr (1d-np.array): array
+        y_arr (1d-np.array): array
+        alpha (float): smoothing factor
+        min_periods (int): observations needed for a value
+        bias (bool): skip the bias correction of the covariance
+    
+    Returns:
+        tuple of 1d-np.array: ew mean of x, ew mean of y, ew covariance
+
+    Note:
+        Same recursion as pd.DataFrame.ewm(adjust=True, ignore_na=False)
+    """
+    number_of_days = x_arr.shape[0]
+    factor = 1 - alpha
+    min_periods = max(min_periods, 1)
+
+    result_x = np.zeros(number_of_days) * np.nan
+    result_y = np.zeros(number_of_days) * np.nan
+    result_cov = np.zeros(number_of_days) * np.nan
+
+    mean_x = np.nan
+    mean_y = np.nan
+    cov = 0.0
+    sum_wt = 1.0
+    sum_wt2 = 1.0
+    old_wt = 1.0
+    nobs = 0
+    for i in range(number_of_days):
+        cur_x = x_arr[i]
+        cur_y = y_arr[i]
+        isObs = not np.isnan(cur_x) and not np.isnan(cur_y)
+        nobs += isObs
+        if not np.isnan(mean_x):
+            # decay
+            sum_wt *= factor
+            sum_wt2 *= factor * factor
+            old_wt *= factor
+            # update
+            if isObs:
+                old_mean_x = mean_x
+                old_mean_y = mean_y
+                if mean_x != cur_x:
+                    mean_x = (old_wt*old_mean_x + cur_x) / (old_wt+1)
+                if mean_y != cur_y:
+                    mean_y = (old_wt*old_mean_y + cur_y) / (old_wt+1)
+                cov = (old_wt*(cov + (old_mean_x-mean_x)*(old_mean_y-mean_y)) + (cur_x-mean_x)*(cur_y-mean_y)) / (old_wt+1)
+                sum_wt += 1
+                sum_wt2 += 1
+                old_wt += 1
+        elif isObs:
+            # first observation
+            mean_x = cur_x
+            mean_y = cur_y
+
+        if nobs >= min_periods:
+            result_x[i] = mean_x
+            result_y[i] = mean_y
+            if bias:
+                result_cov[i] = cov
+            else:
+                numerator = sum_wt * sum_wt
+                denominator = numerator - sum_wt2
+                if denominator > 0:
+                    result_cov[i] = numerator / denominator * cov
+
+    return result_x, result_y, result_cov
+
+def ts_apply_inner(arr, lookback, number_of_days, func, inner_args):
+    """Inner function for ts_apply numba iteration.
+
+    Args:
+        arr (1d-np.array): array, length is lookback period
+        lookback (int): lookback period
+        number_of_days (int): total data period
+        func (numba function): jitted user-defined function
+        inner_args (tuple): arguments for user-defined function
+    
+    Returns:
+        1d-np.array
+
+    Note:
+        Windows holding only nan are skipped and stay nan
+    """
+    inner_result = np.zeros(arr.shape[0]) * np.nan
+    isValid = (~np.isnan(arr)).astype(np.int64)
+    valid_count = 0
+    for i in range(lookback, number_of_days):
+        if i == lookback:
+            valid_count = np.sum(isValid[:lookback])
+        else:
+            valid_count += isValid[i-1] - isValid[i-lookback-1]
+        if valid_count == 0:
+            continue
+        inner_result[i-1] = func(arr[i-lookback:i], *inner_args)
+
+    return inner_result
+
+def ts_dual_apply_inner(y_arr, x_arr, lookback, number_of_days, func, inner_args):
+    """Inner function for ts_dual_apply numba iteration.
+
+    Args:
+        y_arr (1d-np.array): array, length is lookback period
+        x_arr (1d-np.array): array, length is lookback period
+        lookback (int): lookback period
+        number_of_days (int): total data period
+        func (numba function): jitted user-defined function
+        inner_args (tuple): arguments for user-defined function
+    
+    Returns:
+        1d-np.array
+
+    Note:
+        Windows where y or x holds only nan are skipped and stay nan
+    """
+    inner_result = np.zeros(y_arr.shape[0]) * np.nan
+    y_isValid = (~np.isnan(y_arr)).astype(np.int64)
+    x_isValid = (~np.isnan(x_arr)).astype(np.int64)
+    y_count = 0
+    x_count = 0
+    for i in range(lookback, number_of_days):
+        if i == lookback:
+            y_count = np.sum(y_isValid[:lookback])
+            x_count = np.sum(x_isValid[:lookback])
+        else:
+            y_count += y_isValid[i-1] - y_isValid[i-lookback-1]
+            x_count += x_isValid[i-1] - x_isValid[i-lookback-1]
+        if y_count == 0 or x_count == 0:
+            continue
+        inner_result[i-1] = func(y_arr[i-lookback:i], x_arr[i-lookback:i], *inner_args)
+
+    return inner_result
+
 jit_module(nopython=True, cache=True)
\ No newline at end of file
@@ -1,16 +1,25 @@
 
+import numpy as np
 import pandas as pd
 
 from . raymaster import RayMaster, RayManager
 from . import core_cs
-from . import core_cs_numba
 
 off_numba = False
+# rank, zscore, winsorize, truncate, softmax and top run the block-vectorized core_cs kernels,
+# set False to run them on the backend picked by off_numba
+vectorized = True
 
 ### Ray Initialization ###
 ray = RayManager()
 ray._initialize(isWhere='cs')
 
+### Lazy Numba Backend ###
+def _core_cs_numba():
+    """Import the numba backend on first use, importing numba takes a while."""
+    from . import core_cs_numba
+    return core_cs_numba
+
 ### Global Functions ###
 """
 나중에 utils로 따로 빼야할 필요 있음
@@ -35,11 +44,15 @@ def __type_check(data):
         raise ValueError("arg 'data' must be '2d-np.array' or 'pd.DataFrame'")
 
 ### Product Functions ###
-def rank(data):
+def rank(data, method="ordinal", na_option="keep"):
     """Rank.
 
     Args:
         data (pd.DataFrame): input data
+        method (str, one in ['ordinal', 'average', 'min', 'max', 'dense']): rank of tied values,
+            'ordinal' gives ties distinct ranks in column order
+        na_option (str, one in ['keep', 'top', 'bottom']): 'keep' leaves nan,
+            'top'/'bottom' ranks nan as one tie group below/above every value
 
     Returns:
         pd.DataFrame with values 0 ~ 1, size is same as input
@@ -47,12 +60,16 @@ def rank(data):
     Note:
         Calculate the ranking of the data and divide with the largest rank
     """
+    if method not in core_cs.RANK_METHODS:
+        raise ValueError("method must be one in {methods}".format(methods=core_cs.RANK_METHODS))
+    if na_option not in core_cs.NA_OPTIONS:
+        raise ValueError("na_option must be one in {options}".format(options=core_cs.NA_OPTIONS))
     _data = __type_check(data)
 
-    if off_numba == False:
-        worker = RayMaster("cs_rank", ray.batch, [_data], 0, core_cs_numba.cs_rank)
-    elif off_numba == True:
-        worker = RayMaster("cs_rank", ray.batch, [_data], 0, core_cs.cs_rank)
+    if off_numba == False and vectorized == False and method == "ordinal" and na_option == "keep":
+        worker = RayMaster("cs_rank", ray.batch, [_data], 0, _core_cs_numba().cs_rank, isCrossSection=True)
+    else:
+        worker = RayMaster("cs_rank", ray.batch, [_data], 0, core_cs.cs_rank, method, na_option, isCrossSection=True)
     result = worker.run()
     
     return pd.DataFrame(result, index=data.index, columns=data.columns)
@@ -70,9 +87,9 @@ def percentile(data, percent):
     _data = __type_check(data)
 
     if off_numba == False:
-        worker = RayMaster("cs_percentile", ray.batch, [_data], 0, core_cs_numba.cs_percentile, percent)
+        worker = RayMaster("cs_percentile", ray.batch, [_data], 0, _core_cs_numba().cs_percentile, percent, isCrossSection=True)
     elif off_numba == True:
-        worker = RayMaster("cs_percentile", ray.batch, [_data], 0, core_cs.cs_percentile, percent)
+        worker = RayMaster("cs_percentile", ray.batch, [_data], 0, core_cs.cs_percentile, percent, isCrossSection=True)
     result = worker.run()
     
     return pd.DataFrame(result.iloc[0,:], index=data.index, columns=["{per}% percentile".format(per=percent)])
@@ -88,10 +105,10 @@ def zscore(data):
     """
     _data = __type_check(data)
 
-    if off_numba == False:
-        worker = RayMaster("cs_zscore", ray.batch, [_data], 0, core_cs_numba.cs_zscore)
-    elif off_numba == True:
-        worker = RayMaster("cs_zscore", ray.batch, [_data], 0, core_cs.cs_zscore)
+    if off_numba == False and vectorized == False:
+        worker = RayMaster("cs_zscore", ray.batch, [_data], 0, _core_cs_numba().cs_zscore, isCrossSection=True)
+    else:
+        worker = RayMaster("cs_zscore", ray.batch, [_data], 0, core_cs.cs_zscore, isCrossSection=True)
     result = worker.run()
     
     return pd.DataFrame(result, index=data.index, columns=data.columns)
@@ -108,10 +125,10 @@ def winsorize(data, sigma=4):
     """
     _data = __type_check(data)
 
-    if off_numba == False:
-        worker = RayMaster("cs_winsorize", ray.batch, [_data], 0, core_cs_numba.cs_winsorize, sigma)
-    elif off_numba == True:
-        worker = RayMaster("cs_winsorize", ray.batch, [_data], 0, core_cs.cs_winsorize, sigma)
+    if off_numba == False and vectorized == False:
+        worker = RayMaster("cs_winsorize", ray.batch, [_data], 0, _core_cs_numba().cs_winsorize, sigma, isCrossSection=True)
+    else:
+        worker = RayMaster("cs_winsorize", ray.batch, [_data], 0, core_cs.cs_winsorize, sigma, isCrossSection=True)
     result = worker.run()
     
     return pd.DataFrame(result, index=data.index, columns=data.columns)
@@ -128,10 +145,10 @@ def truncate(data, maxPercent):
     """
     _data = __type_check(data)
 
-    if off_numba == False:
-        worker = RayMaster("cs_truncate", ray.batch, [_data], 0, core_cs_numba.cs_truncate, maxPercent)
-    elif off_numba == True:
-        worker = RayMaster("cs_truncate", ray.batch, [_data], 0, core_cs.cs_truncate, maxPercent)
+    if off_numba == False and vectorized == False:
+        worker = RayMaster("cs_truncate", ray.batch, [_data], 0, _core_cs_numba().cs_truncate, maxPercent, isCrossSection=True)
+    else:
+        worker = RayMaster("cs_truncate", ray.batch, [_data], 0, core_cs.cs_truncate, maxPercent, isCrossSection=True)
     result = worker.run()
     
     return pd.DataFrame(result, index=data.index, columns=data.columns)
@@ -147,35 +164,236 @@ def softmax(data):
     """
     _data = __type_check(data)
 
-    if off_numba == False:
-        worker = RayMaster("cs_softmax", ray.batch, [_data], 0, core_cs_numba.cs_softmax)
-    elif off_numba == True:
-        worker = RayMaster("cs_softmax", ray.batch, [_data], 0, core_cs.cs_softmax)
+    if off_numba == False and vectorized == False:
+        worker = RayMaster("cs_softmax", ray.batch, [_data], 0, _core_cs_numba().cs_softmax, isCrossSection=True)
+    else:
+        worker = RayMaster("cs_softmax", ray.batch, [_data], 0, core_cs.cs_softmax, isCrossSection=True)
     result = worker.run()
     
     return pd.DataFrame(result, index=data.index, columns=data.columns)
 
-def top(data, n, satify=1, otherwise=0):
+def __check_ties(ties):
+    if ties not in ["all", "first"]:
+        raise ValueError("ties must be one in ['all', 'first']")
+
+def __sparse(data, picked, ascending):
+    """Column labels picked on every row, ordered by value.
+
+    Args:
+        data (pd.DataFrame/2d-np.array): input data
+        picked (2d-np.array): True where an asset is picked
+        ascending (bool): smallest value first
+
+    Returns:
+        pd.Series of lists
+    """
+    _data = __type_check(data)
+    columns = np.asarray(data.columns) if "DataFrame" in str(type(data)) else np.arange(_data.shape[1])
+    lists = []
+    for i in range(_data.shape[0]):
+        idx = np.flatnonzero(picked[i])
+        values = _data[i, idx] if ascending else -_data[i, idx]
+        # ties keep the column order
+        lists.append(list(columns[idx[np.lexsort((idx, values))]]))
+    return pd.Series(lists, index=data.index if "DataFrame" in str(type(data)) else None)
+
+def top(data, n, satify=1, otherwise=0, ties="all", sparse=False):
     """Screen top 'n' assets.
 
     Args:
         data (pd.DataFrame): input data
+        n (int): number of assets to pick
         satify (int/float): value to give if an asset is in the top 'n'
         otherwise (int/float): value to give if an asset isn't in the top 'n'
+        ties (str, one in ['all', 'first']): 'all' picks every asset tied with the n-th value,
+                                             'first' picks exactly n, ties go to the left columns
+        sparse (bool): return the picked column labels of every row instead of a panel
 
     Returns:
-        pd.DataFrame top 'n' elements will be 1(satisfy), otherwise 0(otherwise)
+        pd.DataFrame top 'n' elements will be 1(satisfy), otherwise 0(otherwise),
+        pd.Series of lists of columns, largest first, if sparse
+
+    Note:
+        nan is never picked, rows with fewer than 'n' values pick all of them, rows without any value are nan.
     """
+    __check_ties(ties)
     _data = __type_check(data)
 
-    if off_numba == False:
-        worker = RayMaster("cs_top", ray.batch, [_data], 0, core_cs_numba.cs_top, n, satify, otherwise)
-    elif off_numba == True:
-        worker = RayMaster("cs_top", ray.batch, [_data], 0, core_cs.cs_top, n, satify, otherwise)
+    if sparse:
+        worker = RayMaster("cs_top", ray.batch, [_data], 0, core_cs.cs_top, n, True, False, ties, isCrossSection=True)
+        return __sparse(data, worker.run() == True, False)
+    if off_numba == False and vectorized == False:
+        worker = RayMaster("cs_top", ray.batch, [_data], 0, _core_cs_numba().cs_top, n, satify, otherwise, ties, isCrossSection=True)
+    else:
+        worker = RayMaster("cs_top", ray.batch, [_data], 0, core_cs.cs_top, n, satify, otherwise, ties, isCrossSection=True)
     result = worker.run()
-    
+
     return pd.DataFrame(result, index=data.index, columns=data.columns)
 
+def bottom(data, n, satify=1, otherwise=0, ties="all", sparse=False):
+    """Screen bottom 'n' assets.
+
+    Args:
+        data (pd.DataFrame): input data
+        n (int): number of assets to pick
+        satify (int/float): value to give if an asset is in the bottom 'n'
+        otherwise (int/float): value to give if an asset isn't in the bottom 'n'
+        ties (str, one in ['all', 'first']): 'all' picks every asset tied with the n-th value,
+                                             'first' picks exactly n, ties go to the left columns
+        sparse (bool): return the picked column labels of every row instead of a panel
+
+    Returns:
+        pd.DataFrame, pd.Series of lists of columns, smallest first, if sparse
+    """
+    __check_ties(ties)
+    _data = __type_check(data)
+
+    if sparse:
+        worker = RayMaster("cs_bottom", ray.batch, [_data], 0, core_cs.cs_bottom, n, True, False, ties, isCrossSection=True)
+        return __sparse(data, worker.run() == True, True)
+    worker = RayMaster("cs_bottom", ray.batch, [_data], 0, core_cs.cs_bottom, n, satify, otherwise, ties, isCrossSection=True)
+    result = worker.run()
+
+    return pd.DataFrame(result, index=data.index, columns=data.columns)
+
+def top_bottom(data, n, long=1, short=-1, otherwise=0, ties="all", sparse=False):
+    """Screen top 'n' and bottom 'n' assets, eg) a long-short basket.
+
+    Args:
+        data (pd.DataFrame): input data
+        n (int): number of assets to pick on each side
+        long (int/float): value to give if an asset is in the top 'n'
+        short (int/float): value to give if an asset is in the bottom 'n'
+        otherwise (int/float): value to give to the others
+        ties (str, one in ['all', 'first']): 'all' picks every asset tied with the n-th value,
+                                             'first' picks exactly n, ties go to the left columns
+        sparse (bool): return the picked column labels of every row instead of a panel
+
+    Returns:
+        pd.DataFrame, pd.DataFrame with 'top' and 'bottom' lists of columns if sparse
+
+    Note:
+        On rows with fewer than 2n values an asset in both goes to the top.
+    """
+    __check_ties(ties)
+    _data = __type_check(data)
+
+    if sparse:
+        worker = RayMaster("cs_top_bottom", ray.batch, [_data], 0, core_cs.cs_top_bottom, n, 1, -1, 0, ties, isCrossSection=True)
+        result = worker.run()
+        return pd.DataFrame({"top": __sparse(data, result == 1, False), "bottom": __sparse(data, result == -1, True)})
+    worker = RayMaster("cs_top_bottom", ray.batch, [_data], 0, core_cs.cs_top_bottom, n, long, short, otherwise, ties, isCrossSection=True)
+    result = worker.run()
+
+    return pd.DataFrame(result, index=data.index, columns=data.columns)
+
+def __group(desc, function, data, groups, exposures, *args):
+    _data = __type_check(data)
+    if "Series" in str(type(groups)):
+        # one label per asset, used for every row
+        _groups = groups.reindex(data.columns).values[None,:] if "DataFrame" in str(type(data)) else groups.values[None,:]
+    else:
+        _groups = __type_check(groups)
+    if _groups.shape[1] != _data.shape[1] or _groups.shape[0] not in [1, _data.shape[0]]:
+        raise ValueError("groups must have the same columns as data and either one row or the same rows as data")
+    _exposures = [__type_check(x) for x in exposures]
+    for _x in _exposures:
+        if _x.shape != _data.shape:
+            raise ValueError("exposures must have the same shape as data")
+
+    worker = RayMaster(desc, ray.batch, [_data, _groups] + _exposures, 0, function, *args, isCrossSection=True)
+    result = worker.run()
+
+    return pd.DataFrame(result, index=data.index, columns=data.columns)
+
+def group_demean(data, groups):
+    """Demean within groups.
+
+    Args:
+        data (pd.DataFrame): input data
+        groups (pd.DataFrame/pd.Series): group labels of the same shape as data, eg) sector codes,
+                                         or one label per column used for every row
+
+    Returns:
+        pd.DataFrame
+
+    Note:
+        Assets with a nan label belong to no group and are nan.
+    """
+    return __group("cs_group_demean", core_cs.cs_group_demean, data, groups, [])
+
+def group_zscore(data, groups):
+    """Zscore within groups.
+
+    Args:
+        data (pd.DataFrame): input data
+        groups (pd.DataFrame/pd.Series): group labels of the same shape as data, or one label per column
+
+    Returns:
+        pd.DataFrame with zscores
+    """
+    return __group("cs_group_zscore", core_cs.cs_group_zscore, data, groups, [])
+
+def group_winsorize(data, groups, sigma=4):
+    """Winsorize within groups.
+
+    Args:
+        data (pd.DataFrame): input data
+        groups (pd.DataFrame/pd.Series): group labels of the same shape as data, or one label per column
+        sigma (int/float): hurdle sigma rate, data which higher/lower than group mean +- sigma * group standard deviation are winsorized
+
+    Returns:
+        pd.DataFrame with winsorized data
+    """
+    return __group("cs_group_winsorize", core_cs.cs_group_winsorize, data, groups, [], sigma)
+
+def group_rank(data, groups):
+    """Rank within groups.
+
+    Args:
+        data (pd.DataFrame): input data
+        groups (pd.DataFrame/pd.Series): group labels of the same shape as data, or one label per column
+
+    Returns:
+        pd.DataFrame with values 0 ~ 1 in every group, as rank
+    """
+    return __group("cs_group_rank", core_cs.cs_group_rank, data, groups, [])
+
+def group_top(data, groups, n, satify=1, otherwise=0):
+    """Screen top 'n' assets of every group.
+
+    Args:
+        data (pd.DataFrame): input data
+        groups (pd.DataFrame/pd.Series): group labels of the same shape as data, or one label per column
+        n (int): number of assets to pick in every group
+        satify (int/float): value to give if an asset is in the top 'n' of its group
+        otherwise (int/float): value to give if an asset isn't in the top 'n' of its group
+
+    Returns:
+        pd.DataFrame
+    """
+    return __group("cs_group_top", core_cs.cs_group_top, data, groups, [], n, satify, otherwise)
+
+def group_neutralize(data, groups, exposures=None):
+    """Neutralize to groups and exposures.
+
+    Args:
+        data (pd.DataFrame): input data
+        groups (pd.DataFrame/pd.Series): group labels of the same shape as data, or one label per column
+        exposures (pd.DataFrame/list[pd.DataFrame]): other exposures to remove, eg) log market cap
+
+    Returns:
+        pd.DataFrame, residual of data regressed on group dummies and exposures row by row
+
+    Note:
+        Without exposures it is the same as group_demean.
+    """
+    if exposures is None:
+        exposures = []
+    elif type(exposures) != list:
+        exposures = [exposures]
+    return __group("cs_group_neutralize", core_cs.cs_group_neutralize, data, groups, exposures)
+
 def apply(data, func, *args):
     """Apply user-defined function with one data argument.
 
@@ -196,7 +414,7 @@ def apply(data, func, *args):
     """
     _data = __type_check(data)
 
-    worker = RayMaster("cs_apply", ray.batch, [_data], 0, core_cs.cs_apply, func, args)
+    worker = RayMaster("cs_apply", ray.batch, [_data], 0, core_cs.cs_apply, func, args, isCrossSection=True)
     result = worker.run()
 
     return pd.DataFrame(result, index=data.index, columns=data.columns)
@@ -218,7 +436,7 @@ def dual_apply(y, x, func, *args):
     _y = __type_check(y)
     _x = __type_check(x)
 
-    worker = RayMaster("ts_dual_apply", ray.batch, [_y, _x], 0, core_cs.cs_dual_apply, func, args)
+    worker = RayMaster("ts_dual_apply", ray.batch, [_y, _x], 0, core_cs.cs_dual_apply, func, args, isCrossSection=True)
     result = worker.run()
 
     return pd.DataFrame(result, index=y.index, columns=y.columns)
@@ -240,27 +458,51 @@ def multi_apply(data, func, *args):
         raise ValueError("data must be list of pd.DataFrame or np.array")
     data = [__type_check(each_data) for each_data in data]
          
-    worker = RayMaster("ts_multi_apply", ray.batch, data, 0, core_cs.cs_multi_apply, func, args)
+    worker = RayMaster("ts_multi_apply", ray.batch, data, 0, core_cs.cs_multi_apply, func, args, isCrossSection=True)
     result = worker.run()
 
     return pd.DataFrame(result, index=result_idx, columns=result_col)
 
-# def regression(y, x, returns="slope"):
-#     """Correlation between two data.
+def regression(y, x, returns="slope"):
+    """Cross-sectional OLS regression.
 
-#     Args:
-#         y (pd.DataFrame): data for dependent variable.
-#         x (pd.DataFrame): data for independent varialbe.
-#         returns (str, one in ['slope','constant']): decide which to return.
+    Args:
+        y (pd.DataFrame): data for dependent variable.
+        x (pd.DataFrame/list[pd.DataFrame]): data for independent variables, same size as y.
+        returns (str, one in ['slope','intercept','residual','r2','all']): decide which to return.
     
-#     Returns:
-#         pd.DataFrame
+    Returns:
+        'residual': pd.DataFrame, same size as y
+        'slope', 'intercept', 'r2': pd.DataFrame, same rownumber, one column per coefficient
+        'all': dict of them
     
-#     Note:
-#         Function implements the OLS regression with y = a + bx.
-#         You can choose which to return 'a' (costant) or 'b' (slope) 
-#     """
-#     _y = __type_check(y)
-#     _x = __type_check(x)
-
-    
\ No newline at end of file
+    Note:
+        Function implements the OLS regression with y = a + b1*x1 + ... + bk*xk on every row.
+        Assets with NaN are dropped, rows need at least k+2 assets.
+    """
+    if returns == "constant":
+        returns = "intercept"
+    if returns not in ["slope", "intercept", "residual", "r2", "all"]:
+        raise ValueError("returns must be one in ['slope','intercept','residual','r2','all']")
+
+    xs = x if type(x) == list else [x]
+    _y = __type_check(y)
+    _xs = [__type_check(each_x) for each_x in xs]
+    for _x in _xs:
+        if _x.shape != _y.shape:
+            raise ValueError("x must be the same size as y")
+
+    worker = RayMaster("cs_regression", ray.batch, [_y] + _xs, 0, core_cs.cs_regression, isCrossSection=True)
+    result = worker.run()
+
+    slope_columns = ["slope"] if type(x) != list else ["slope{k}".format(k=k) for k in range(len(xs))]
+    result = {
+        "slope": pd.DataFrame(np.stack([result["slope{k}".format(k=k)] for k in range(len(xs))], axis=1), index=y.index, columns=slope_columns),
+        "intercept": pd.DataFrame(result["intercept"], index=y.index, columns=["intercept"]),
+        "r2": pd.DataFrame(result["r2"], index=y.index, columns=["r2"]),
+        "residual": pd.DataFrame(result["residual"], index=y.index, columns=y.columns),
+    }
+
+    if returns == "all":
+        return result
+    return result[returns]
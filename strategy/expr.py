@@ -0,0 +1,265 @@
+import numpy as np
+import pandas as pd
+
+from . raymaster import RayMaster, RayManager
+from . import core_ts_numba_inner
+from . import core_cs_numba_inner
+from . import core_cs
+
+### Ray Initialization ###
+ray = RayManager()
+ray._initialize(isWhere='ts')
+
+# Bytes of one tile, sized to stay in the L2 cache while every operator of a stage runs on it
+tile_bytes = 256 * 1024
+
+### Global Functions ###
+def _type_check(data):
+    """Data type checker.
+
+    Arg:
+        data (np.array/pd.DataFrame): whatever user put
+
+    Return:
+        2-D np.array
+
+    Note:
+        Check the data and return as np.array to calculate things
+    """
+    if "ndarray" in str(type(data)):
+        return data
+    elif "DataFrame" in str(type(data)):
+        return data.values
+    else:
+        raise ValueError("arg 'data' must be '2d-np.array' or 'pd.DataFrame'")
+
+### Tile Operators ###
+# ts operators get an asset-major tile (assets, days), cs operators a date-major tile (days, assets).
+TS_OPS = {
+    "rank": core_ts_numba_inner.ts_rank_inner,
+    "zscore": core_ts_numba_inner.ts_zscore_inner,
+    "winsorize": core_ts_numba_inner.ts_winsorize_inner,
+    "truncate": core_ts_numba_inner.ts_truncate_inner,
+}
+
+CS_OPS = {
+    "rank": core_cs_numba_inner.cs_rank_inner,
+    "zscore": core_cs_numba_inner.cs_zscore_inner,
+    "winsorize": core_cs_numba_inner.cs_winsorize_inner,
+    "truncate": core_cs_numba_inner.cs_truncate_inner,
+    "softmax": core_cs_numba_inner.cs_softmax_inner,
+}
+
+# cs operators with a block-vectorized form take the whole tile at once
+CS_BLOCK_OPS = {
+    "rank": core_cs.cs_rank_block,
+    "zscore": core_cs.cs_zscore_block,
+    "winsorize": core_cs.cs_winsorize_block,
+    "truncate": core_cs.cs_truncate_block,
+    "softmax": core_cs.cs_softmax_block,
+}
+
+def _ts_tile(name, tile, args):
+    """Run one ts operator over an asset-major tile."""
+    function = TS_OPS[name]
+    lookback = args[0]
+    number_of_days = tile.shape[1] + 1
+    result = np.empty_like(tile)
+    for j in range(tile.shape[0]):
+        result[j] = function(tile[j], lookback, number_of_days, *args[1:])
+    return result
+
+def _cs_tile(name, tile, args):
+    """Run one cs operator over a date-major tile."""
+    if name in CS_BLOCK_OPS:
+        return CS_BLOCK_OPS[name](tile, *args)
+    function = CS_OPS[name]
+    result = np.empty_like(tile)
+    for i in range(tile.shape[0]):
+        result[i] = function(tile[i], *args)
+    return result
+
+def _run_ts_stage(pba, start, end, data, *args):
+    """Run a chain of ts operators on the assets [start:end] tile by tile.
+
+    Args:
+        data (list[2d-np.array]): date-major panel (days, assets)
+        *args (tuple): delivers the operator chain
+
+    Returns:
+        2d-np.array of the block (days, end-start)
+    """
+    data = data[0]
+    ops = args[0][0]
+
+    number_of_days = data.shape[0]
+    width = max(1, tile_bytes // (8*max(number_of_days, 1)))
+
+    result = np.empty((number_of_days, end-start))
+    for a in range(start, end, width):
+        b = min(a+width, end)
+        # Only the tile is turned asset-major, the panel itself stays date-major
+        tile = np.ascontiguousarray(data[:, a:b].T, dtype=np.float64)
+        for name, op_args in ops:
+            tile = _ts_tile(name, tile, op_args)
+        result[:, a-start:b-start] = tile.T
+        # tqdm update
+        pba.update(b-a)
+
+    return result
+
+def _run_cs_stage(pba, start, end, data, *args):
+    """Run a chain of cs operators on the dates [start:end] tile by tile.
+
+    Args:
+        data (list[2d-np.array]): date-major panel (days, assets)
+        *args (tuple): delivers the operator chain
+
+    Returns:
+        2d-np.array of the block (end-start, assets)
+    """
+    data = data[0]
+    ops = args[0][0]
+
+    number_of_assets = data.shape[1]
+    height = max(1, tile_bytes // (8*max(number_of_assets, 1)))
+
+    result = np.empty((end-start, number_of_assets))
+    for a in range(start, end, height):
+        b = min(a+height, end)
+        tile = np.array(data[a:b], dtype=np.float64)
+        for name, op_args in ops:
+            tile = _cs_tile(name, tile, op_args)
+        result[a-start:b-start] = tile
+        # tqdm update
+        pba.update(b-a)
+
+    return result
+
+### Expression ###
+class Expr:
+    """Lazily recorded chain of ts/cs operators over one panel.
+
+    Example:
+        >>> from strategy import expr
+        >>> x = expr.Expr(close)
+        >>> alpha = expr.cs.zscore(expr.ts.winsorize(expr.ts.zscore(x, 20), 60)).run()
+        >>> alpha = x.ts_zscore(20).ts_winsorize(60).cs_zscore().run() # same thing
+
+    Note:
+        Consecutive operators of the same kind form a stage. A stage is dispatched once,
+        runs every operator on cache-sized tiles and writes a single panel, so the chain
+        above makes two passes instead of three and never transposes the whole panel.
+    """
+
+    def __init__(self, data, ops=()):
+        self.data = data
+        self.ops = tuple(ops)
+
+    def __repr__(self):
+        chain = " -> ".join(["{kind}.{name}{args}".format(kind=kind, name=name, args=args) for kind, name, args in self.ops])
+        return "Expr({chain})".format(chain=chain if chain else "data")
+
+    def _chain(self, kind, name, *args):
+        return Expr(self.data, self.ops + ((kind, name, args),))
+
+    def ts_rank(self, lookback):
+        return self._chain("ts", "rank", lookback)
+
+    def ts_zscore(self, lookback):
+        return self._chain("ts", "zscore", lookback)
+
+    def ts_winsorize(self, lookback, sigma=4):
+        return self._chain("ts", "winsorize", lookback, sigma)
+
+    def ts_truncate(self, lookback, maxPercent):
+        return self._chain("ts", "truncate", lookback, maxPercent)
+
+    def cs_rank(self):
+        return self._chain("cs", "rank")
+
+    def cs_zscore(self):
+        return self._chain("cs", "zscore")
+
+    def cs_winsorize(self, sigma=4):
+        return self._chain("cs", "winsorize", sigma)
+
+    def cs_truncate(self, maxPercent):
+        return self._chain("cs", "truncate", maxPercent)
+
+    def cs_softmax(self):
+        return self._chain("cs", "softmax")
+
+    def stages(self):
+        """Group the chain into stages of consecutive operators of the same kind.
+
+        Returns:
+            list of (kind, [(name, args), ...])
+        """
+        stages = []
+        for kind, name, args in self.ops:
+            if len(stages) == 0 or stages[-1][0] != kind:
+                stages.append((kind, []))
+            stages[-1][1].append((name, args))
+        return stages
+
+    def run(self):
+        """Execute the chain.
+
+        Returns:
+            pd.DataFrame, same size as input
+        """
+        result = _type_check(self.data)
+
+        for kind, ops in self.stages():
+            desc = "expr_{kind}({names})".format(kind=kind, names=",".join([name for name, _ in ops]))
+            if kind == "ts":
+                worker = RayMaster(desc, ray.batch, [result], 1, _run_ts_stage, ops)
+            elif kind == "cs":
+                worker = RayMaster(desc, ray.batch, [result], 0, _run_cs_stage, ops, isCrossSection=True)
+            result = worker.run()
+
+        if "DataFrame" in str(type(self.data)):
+            return pd.DataFrame(result, index=self.data.index, columns=self.data.columns)
+        return pd.DataFrame(result)
+
+def _as_expr(data):
+    if type(data) == Expr:
+        return data
+    return Expr(data)
+
+class TimeSeries:
+    """Expression versions of the strategy.ts operators."""
+
+    def rank(self, data, lookback):
+        return _as_expr(data).ts_rank(lookback)
+
+    def zscore(self, data, lookback):
+        return _as_expr(data).ts_zscore(lookback)
+
+    def winsorize(self, data, lookback, sigma=4):
+        return _as_expr(data).ts_winsorize(lookback, sigma)
+
+    def truncate(self, data, lookback, maxPercent):
+        return _as_expr(data).ts_truncate(lookback, maxPercent)
+
+class CrossSection:
+    """Expression versions of the strategy.cs operators."""
+
+    def rank(self, data):
+        return _as_expr(data).cs_rank()
+
+    def zscore(self, data):
+        return _as_expr(data).cs_zscore()
+
+    def winsorize(self, data, sigma=4):
+        return _as_expr(data).cs_winsorize(sigma)
+
+    def truncate(self, data, maxPercent):
+        return _as_expr(data).cs_truncate(maxPercent)
+
+    def softmax(self, data):
+        return _as_expr(data).cs_softmax()
+
+ts = TimeSeries()
+cs = CrossSection()
@@ -1,124 +1,581 @@
+import pandas as pd
+
+from . utils import __type_check
+from . raymaster import RayMaster, RayManager
+
+from . core import ti_mi
+
+### Ray Initialization ###
+ray = RayManager()
+ray._initialize(isWhere='cs')
+
 
 ### Momentum Indicators ###
 
-def disparity():
+def disparity(close, window=20):
     """Disparity.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): moving average window
+
+    Returns:
+        pd.DataFrame, 100 * close / moving average
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Disparity", ray.batch, [_close], 0, ti_mi.disparity, window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
 
-def asi():
+def asi(open, high, low, close, limit_move):
     """Accumulation Swing Index.
+
+    Args:
+        open (pd.DataFrame): open price
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        limit_move (float): largest price change allowed in one day
+
+    Returns:
+        pd.DataFrame, running sum of Wilder's swing index
     """
-    pass
+    _open = __type_check(open).T
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Accumulation_Swing_Index", ray.batch, [_open, _high, _low, _close], 0, ti_mi.asi, limit_move)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
 
-def eom():
+def eom(high, low, volume, window=14, volume_scale=1e8):
     """Arm's Ease of Movement.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        volume (pd.DataFrame): volume
+        window (int): moving average window
+        volume_scale (float): volume unit of the box ratio
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _volume = __type_check(volume).T
+
+    worker = RayMaster("Ease_of_Movement", ray.batch, [_high, _low, _volume], 0, ti_mi.eom, window, volume_scale)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=high.index, columns=high.columns)
 
-def chaikin_oscillator():
+def chaikin_oscillator(high, low, close, volume, fast_window=3, slow_window=10):
     """Chaikin Oscillator.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        fast_window (int): fast ema window of the A/D line
+        slow_window (int): slow ema window of the A/D line
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+    _volume = __type_check(volume).T
+
+    worker = RayMaster("Chaikin_Oscillator", ray.batch, [_high, _low, _close, _volume], 0, ti_mi.chaikin_oscillator, fast_window, slow_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
 
-def cmo():
+def cmo(close, window=14):
     """Chande Momentum Oscillator.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): number of price changes
+
+    Returns:
+        pd.DataFrame, from -100 to 100
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Chande_Momentum_Oscillator", ray.batch, [_close], 0, ti_mi.cmo, window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
 
-def dpo():
+def dpo(close, window=20):
     """Detrend Price Oscillator.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): moving average window
+
+    Returns:
+        pd.DataFrame, close window//2+1 days ago minus the moving average
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Detrend_Price_Oscillator", ray.batch, [_close], 0, ti_mi.dpo, window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
 
-def dmi():
+def dmi(close, window=14, std_window=5, average_window=10, min_window=5, max_window=30):
     """Dynamic Momentum Index.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): rsi window at average volatility
+        std_window (int): standard deviation window of the close
+        average_window (int): moving average window of the standard deviation
+        min_window (int): shortest rsi window
+        max_window (int): longest rsi window
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Dynamic_Momentum_Index", ray.batch, [_close], 0, ti_mi.dmi, window, std_window, average_window, min_window, max_window)
+    result = worker.run()
 
-def imi():
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def imi(open, close, window=14):
     """Intraday Momentum Index.
+
+    Args:
+        open (pd.DataFrame): open price
+        close (pd.DataFrame): close price
+        window (int): window period
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _open = __type_check(open).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Intraday_Momentum_Index", ray.batch, [_open, _close], 0, ti_mi.imi, window)
+    result = worker.run()
 
-def ko():
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def ko(high, low, close, volume, fast_window=34, slow_window=55, signal_window=13):
     """Klinger Oscillator.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        fast_window (int): fast ema window of the volume force
+        slow_window (int): slow ema window of the volume force
+        signal_window (int): ema window of the signal line
+
+    Returns:
+        dict of pd.DataFrame, ko and signal
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+    _volume = __type_check(volume).T
+
+    worker = RayMaster("Klinger_Oscillator", ray.batch, [_high, _low, _close, _volume], 0, ti_mi.ko, fast_window, slow_window, signal_window)
+    result = worker.run()
 
-def mass_index():
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
+
+    return result
+
+def mass_index(high, low, window=9, sum_window=25):
     """Mass Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        window (int): ema window of the range
+        sum_window (int): number of ema ratios summed
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
 
-def mesa_sinewave():
+    worker = RayMaster("Mass_Index", ray.batch, [_high, _low], 0, ti_mi.mass_index, window, sum_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=high.index, columns=high.columns)
+
+def mesa_sinewave(data):
     """MESA Sinewave.
+
+    Args:
+        data (pd.DataFrame): price
+
+    Returns:
+        dict of pd.DataFrame, sine and lead_sine
+
+    Note:
+        The first 63 prices of every asset are nan.
     """
-    pass
+    _data = __type_check(data).T
+
+    worker = RayMaster("MESA_Sinewave", ray.batch, [_data], 0, ti_mi.mesa_sinewave)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=data.index, columns=data.columns)
 
-def nvi():
+    return result
+
+def nvi(close, volume, base=1000):
     """Negative Volume Index.
+
+    Args:
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        base (float): starting value
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
+    _volume = __type_check(volume).T
+
+    worker = RayMaster("Negative_Volume_Index", ray.batch, [_close, _volume], 0, ti_mi.nvi, base)
+    result = worker.run()
 
-def pop():
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def pop(close, fast_window=12, slow_window=26):
     """Price Oscillator Percent.
+
+    Args:
+        close (pd.DataFrame): close price
+        fast_window (int): fast ema window
+        slow_window (int): slow ema window
+
+    Returns:
+        pd.DataFrame, 100 * (fast ema - slow ema) / slow ema
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Price_Oscillator_Percent", ray.batch, [_close], 0, ti_mi.pop, fast_window, slow_window)
+    result = worker.run()
 
-def projection_bandwidth():
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def projection_bandwidth(high, low, close, window=14):
     """Projection Bandwidth.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): linear regression window of the projection band
+
+    Returns:
+        pd.DataFrame, 200 * (upper - lower) / (upper + lower)
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
 
-def projection_oscillaor():
+    worker = RayMaster("Projection_Bandwidth", ray.batch, [_high, _low, _close], 0, ti_mi.projection, window)
+    result = worker.run()
+
+    return pd.DataFrame(result["bandwidth"].T, index=close.index, columns=close.columns)
+
+def projection_oscillaor(high, low, close, window=14):
     """Projection Oscillator.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): linear regression window of the projection band
+
+    Returns:
+        pd.DataFrame, 100 * (close - lower) / (upper - lower)
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
 
-def range_indicator():
+    worker = RayMaster("Projection_Oscillator", ray.batch, [_high, _low, _close], 0, ti_mi.projection, window)
+    result = worker.run()
+
+    return pd.DataFrame(result["oscillator"].T, index=close.index, columns=close.columns)
+
+def range_indicator(high, low, close, window=10, smoothing=3):
     """Range Indicator.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): stochastic window of the range ratio
+        smoothing (int): ema window
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
 
-def rmi():
+    worker = RayMaster("Range_Indicator", ray.batch, [_high, _low, _close], 0, ti_mi.range_indicator, window, smoothing)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def rmi(close, window=20, momentum=5):
     """Relative Momentum Index.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): Wilder smoothing window
+        momentum (int): days of each price change
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
 
-def rsi():
+    worker = RayMaster("Relative_Momentum_Index", ray.batch, [_close], 0, ti_mi.rmi, window, momentum)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def rsi(close, window=14):
     """Relative Strength Index.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): Wilder smoothing window
+
+    Returns:
+        pd.DataFrame
+
+    Note:
+        The first value is on row window, seeded with the average of the first window changes as in TA-Lib.
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Relative_Strength_Index", ray.batch, [_close], 0, ti_mi.rsi, window)
+    result = worker.run()
 
-def rwi():
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def rwi(high, low, close, window=14):
     """Random Walk Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): longest lookback
+
+    Returns:
+        dict of pd.DataFrame, high and low
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Random_Walk_Index", ray.batch, [_high, _low, _close], 0, ti_mi.rwi, window)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
+
+    return result
 
-def smi():
+def smi(high, low, close, window=10, first_smoothing=3, second_smoothing=3, signal_window=10):
     """Stochastic Momentum Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): window of the highest high and lowest low
+        first_smoothing (int): first ema window
+        second_smoothing (int): second ema window
+        signal_window (int): ema window of the signal line
+
+    Returns:
+        dict of pd.DataFrame, smi and signal
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Stochastic_Momentum_Index", ray.batch, [_high, _low, _close], 0, ti_mi.smi, window, first_smoothing, second_smoothing, signal_window)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
 
-def stochastic():
+    return result
+
+def stochastic(high, low, close, k_window=14, d_window=3):
     """Stochastic.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        k_window (int): window of the highest high and lowest low
+        d_window (int): moving average window of %K
+
+    Returns:
+        dict of pd.DataFrame, k and d
+
+    Note:
+        %K is nan where the highest high equals the lowest low.
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Stochastic", ray.batch, [_high, _low, _close], 0, ti_mi.stochastic, k_window, d_window)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
+
+    return result
 
-def slow_stochastic():
+def slow_stochastic(high, low, close, k_window=14, d_window=3, slow_window=3):
     """Slow Stocahstic.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        k_window (int): window of the highest high and lowest low
+        d_window (int): moving average window of the fast %K, the slow %K
+        slow_window (int): moving average window of the slow %K
+
+    Returns:
+        dict of pd.DataFrame, k and d
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Slow_Stochastic", ray.batch, [_high, _low, _close], 0, ti_mi.stochastics, k_window, d_window, slow_window)
+    result = worker.run()
+
+    return {
+        "k":pd.DataFrame(result["slow_k"].T, index=close.index, columns=close.columns),
+        "d":pd.DataFrame(result["slow_d"].T, index=close.index, columns=close.columns),
+    }
 
-def ultimate_oscillator():
+def ultimate_oscillator(high, low, close, short_window=7, medium_window=14, long_window=28):
     """Ultimate Oscillator.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        short_window (int): short window, weight 4
+        medium_window (int): medium window, weight 2
+        long_window (int): long window, weight 1
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Ultimate_Oscillator", ray.batch, [_high, _low, _close], 0, ti_mi.ultimate_oscillator, short_window, medium_window, long_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
 
-def williams_percent_r():
+def williams_percent_r(high, low, close, window=14):
     """Williams %R.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): window of the highest high and lowest low
+
+    Returns:
+        pd.DataFrame, from -100 at the lowest low to 0 at the highest high
+    """
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Williams_%R", ray.batch, [_high, _low, _close], 0, ti_mi.williams_percent_r, window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+### Additionals ###
+
+def gain_loss(close, window=14, rmi_window=20, momentum=5):
+    """RSI, CMO and RMI from one pass over the price changes.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): rsi and cmo window
+        rmi_window (int): rmi window
+        momentum (int): days of each rmi price change
+
+    Returns:
+        dict of pd.DataFrame, rsi, cmo and rmi
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Gain_Loss", ray.batch, [_close], 0, ti_mi.gain_loss, window, rmi_window, momentum)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
+
+    return result
+
+def stochastics(high, low, close, k_window=14, d_window=3, slow_window=3):
+    """Fast and slow stochastic and Williams %R from one pass over the ranges.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        k_window (int): window of the highest high and lowest low
+        d_window (int): moving average window of the fast %K
+        slow_window (int): moving average window of the slow %K
+
+    Returns:
+        dict of pd.DataFrame, k, d, slow_k, slow_d and williams_percent_r
+    """
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Stochastics", ray.batch, [_high, _low, _close], 0, ti_mi.stochastics, k_window, d_window, slow_window)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
 
-### Additionals ###
\ No newline at end of file
+    return result
@@ -5,53 +5,64 @@ from . utils import __type_check
 from . raymaster import RayMaster, RayManager
 
 from . core import ti_pi
-from . core import ti_pi_numba
 
-off_numba = False
+# False runs the compiled core.ti_pi_numba kernels, True the NumPy core.ti_pi kernels,
+# every indicator with both backends also takes use_numba to pick one per call
+off_numba = True
 
 ### Ray Initialization ###
 ray = RayManager()
 ray._initialize(isWhere='cs')
 
+### Lazy Numba Backend ###
+def _ti_pi_numba():
+    """Import the numba backend on first use, loading its compiled kernels takes a while."""
+    from . core import ti_pi_numba
+    return ti_pi_numba
+
+def __backend(use_numba):
+    """Kernel module of a call, use_numba None follows off_numba."""
+    if use_numba is None:
+        use_numba = off_numba == False
+    return _ti_pi_numba() if use_numba else ti_pi
+
 ### Price Indicators ###
-def ma(data, window):
+def ma(data, window, use_numba=None):
     """Moving Average.
     """
     _data = __type_check(data).T
 
-    if off_numba == False:
-        worker = RayMaster("Moving_Average", ray.batch, [_data], 0, ti_pi.ma, window)
-    # elif off_numba == True:
-    #     worker = RayMaster("MA{window}".format(window=window), ray.batch, [_data], 0, ti_pi_numba.ma)
+    worker = RayMaster("Moving_Average", ray.batch, [_data], 0, __backend(use_numba).ma, window)
     result = worker.run()
     
     return pd.DataFrame(result.T, index=data.index, columns=data.columns)
 
-def vama(data, volume, window):
+def vama(data, volume, window, use_numba=None):
     """Volume Adjusted Moving Average.
     """
     _data = __type_check(data).T
     _volume = __type_check(volume).T 
 
-    if off_numba == False:
-        worker = RayMaster("Volume_Adjusted_Moving_Average", ray.batch, [_data, _volume], 0, ti_pi.vama, window)
-    # elif off_numba == True:
-    #     worker = RayMaster("Volume_Adjusted_Moving_Average({window})".format(window=window), ray.batch, [_data, _volume], 0, ti_pi.vama)
+    worker = RayMaster("Volume_Adjusted_Moving_Average", ray.batch, [_data, _volume], 0, __backend(use_numba).vama, window)
     result = worker.run()
     
     return pd.DataFrame(result.T, index=data.index, columns=data.columns)
 
-def imkkh(high, low, close, tenkan_window=9, kijun_window=26, senkou2_window=52, chikou_window=26):
+def imkkh(high, low, close, tenkan_window=9, kijun_window=26, senkou2_window=52, chikou_window=26, use_numba=None):
     """Ichi Moku Kin Kou Hyo.
+
+    Returns:
+        dict of pd.DataFrame, tenkan, kijun, senkou1, senkou2 and chikou
+
+    Note:
+        Lines are dated the day they are known, shift senkou1/senkou2 by kijun_window to draw
+        them ahead. chikou is the close chikou_window days before.
     """
     _high = __type_check(high).T
     _low = __type_check(low).T
     _close = __type_check(close).T 
 
-    if off_numba == False:
-        worker = RayMaster("Ichi_Moku_Kin_Kou_Hyo", ray.batch, [_high, _low, _close], 0, ti_pi.imkkh, tenkan_window, kijun_window, senkou2_window, chikou_window)
-    # elif off_numba == True:
-    #     worker = RayMaster("Volume_Adjusted_Moving_Average({window})".format(window=window), ray.batch, [_data, _volume], 0, ti_pi.vama)
+    worker = RayMaster("Ichi_Moku_Kin_Kou_Hyo", ray.batch, [_high, _low, _close], 0, __backend(use_numba).imkkh, tenkan_window, kijun_window, senkou2_window, chikou_window)
     result = worker.run()
     
     for key in list(result.keys()):
@@ -59,15 +70,12 @@ def imkkh(high, low, close, tenkan_window=9, kijun_window=26, senkou2_window=52,
 
     return result
 
-def bollinger(data, window, sigma=2):
+def bollinger(data, window, sigma=2, use_numba=None):
     """Bollinger Band.
     """
     _data = __type_check(data).T
 
-    if off_numba == False:
-        worker = RayMaster("Bollinger_Band", ray.batch, [_data], 0, ti_pi.bollinger, window, sigma)
-    # elif off_numba == True:
-    #     worker = RayMaster("Volume_Adjusted_Moving_Average({window})".format(window=window), ray.batch, [_data, _volume], 0, ti_pi.vama)
+    worker = RayMaster("Bollinger_Band", ray.batch, [_data], 0, __backend(use_numba).bollinger, window, sigma)
     result = worker.run()
     
     for key in list(result.keys()):
@@ -75,17 +83,17 @@ def bollinger(data, window, sigma=2):
 
     return result
 
-def cftpp(high, low, close):
+def cftpp(high, low, close, use_numba=None):
     """Chicago Floor Traders Pivotal Point.
+
+    Note:
+        Bar-local, the NumPy kernel is elementwise over the whole panel and runs without ray.
     """
     _high = __type_check(high).T
     _low = __type_check(low).T
     _close = __type_check(close).T
 
-    if off_numba == False:
-        worker = RayMaster("Chicago_Floor_Traders_Pivotal_Point", ray.batch, [_high, _low, _close], 0, ti_pi.cftpp)
-    # elif off_numba == True:
-    #     worker = RayMaster("Volume_Adjusted_Moving_Average({window})".format(window=window), ray.batch, [_data, _volume], 0, ti_pi.vama)
+    worker = RayMaster("Chicago_Floor_Traders_Pivotal_Point", ray.batch, [_high, _low, _close], 0, __backend(use_numba).cftpp)
     result = worker.run()
     
     for key in list(result.keys()):
@@ -93,84 +101,253 @@ def cftpp(high, low, close):
 
     return result
 
-def dema(data, window):
+def dema(data, window, use_numba=None):
     """Double Exponential Moving Average.
+
+    Note:
+        2*ema - ema(ema), every ema seeded like `ema`.
     """
     _data = __type_check(data).T
 
-    if off_numba == False:
-        worker = RayMaster("Double_Exponential_Moving_Average", ray.batch, [_data], 0, ti_pi.dema, window)
-    # elif off_numba == True:
-    #     worker = RayMaster("Volume_Adjusted_Moving_Average({window})".format(window=window), ray.batch, [_data, _volume], 0, ti_pi.vama)
+    worker = RayMaster("Double_Exponential_Moving_Average", ray.batch, [_data], 0, __backend(use_numba).dema, window)
     result = worker.run()
 
     return pd.DataFrame(result.T, index=data.index, columns=data.columns)
 
-def envelope(data, window, width):
+def envelope(data, window, width, use_numba=None):
     """Envelope.
     """
     _data = __type_check(data).T
 
-    if off_numba == False:
-        worker = RayMaster("Envelope", ray.batch, [_data], 0, ti_pi.envelope, window, width)
-    # elif off_numba == True:
-    #     worker = RayMaster("Volume_Adjusted_Moving_Average({window})".format(window=window), ray.batch, [_data, _volume], 0, ti_pi.vama)
+    worker = RayMaster("Envelope", ray.batch, [_data], 0, __backend(use_numba).envelope, window, width)
     result = worker.run()
 
-    return pd.DataFrame(result.T, index=data.index, columns=data.columns)
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=data.index, columns=data.columns)
+
+    return result
 
 
-def psar(high, low):
+def psar(high, low, af=0.02, max_af=0.2, use_numba=None):
     """Parabolic Stop And Reversal.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        af (float): starting acceleration factor, also added on every new extreme point
+        max_af (float): largest acceleration factor
+
+    Returns:
+        dict of pd.DataFrame, psar and trend (1 up, -1 down)
+
+    Note:
+        The trend starts on the second bar of each asset. A bar missing high or low is nan.
     """
     _high = __type_check(high).T
     _low = __type_check(low).T
 
-    if off_numba == False:
-        worker = RayMaster("Envelope", ray.batch, [_high, _low], 0, ti_pi.psar)
-    # elif off_numba == True:
-    #     worker = RayMaster("Volume_Adjusted_Moving_Average({window})".format(window=window), ray.batch, [_data, _volume], 0, ti_pi.vama)
+    worker = RayMaster("Parabolic_SAR", ray.batch, [_high, _low], 0, __backend(use_numba).psar, af, max_af)
     result = worker.run()
 
-    return pd.DataFrame(result.T, index=high.index, columns=high.columns)
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=high.index, columns=high.columns)
+
+    return result
 
-def price_channel():
+def price_channel(high, low, window):
     """Price Channel.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        window (int): window period
+
+    Returns:
+        dict of pd.DataFrame, upper and lower
+
+    Note:
+        Highest high and lowest low of the window days before each day, the day itself excluded.
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+
+    worker = RayMaster("Price_Channel", ray.batch, [_high, _low], 0, ti_pi.price_channel, window)
+    result = worker.run()
 
-def projection_band():
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=high.index, columns=high.columns)
+
+    return result
+
+def donchian(high, low, window):
+    """Donchian Channel.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        window (int): window period
+
+    Returns:
+        dict of pd.DataFrame, upper, middle and lower
+
+    Note:
+        Highest high and lowest low of the window days ending on each day.
+    """
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+
+    worker = RayMaster("Donchian_Channel", ray.batch, [_high, _low], 0, ti_pi.donchian, window)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=high.index, columns=high.columns)
+
+    return result
+
+def projection_band(high, low, window=14):
     """Projection Band.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        window (int): linear regression window
+
+    Returns:
+        dict of pd.DataFrame, upper and lower
+
+    Note:
+        Highs and lows of the window are projected to each day along their regression slope,
+        the bands are the highest and lowest projection.
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
 
-def t3():
+    worker = RayMaster("Projection_Band", ray.batch, [_high, _low], 0, ti_pi.projection_band, window)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=high.index, columns=high.columns)
+
+    return result
+
+def t3(data, window, volume_factor=0.7):
     """T3.
+
+    Args:
+        data (pd.DataFrame): price
+        window (int): window period of every ema
+        volume_factor (float): weight of the second ema in each of the three generalized demas
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _data = __type_check(data).T
+
+    worker = RayMaster("T3", ray.batch, [_data], 0, ti_pi.t3, window, volume_factor)
+    result = worker.run()
 
-def tema():
+    return pd.DataFrame(result.T, index=data.index, columns=data.columns)
+
+def tema(data, window):
     """Tripple Exponential Moving Average.
+
+    Note:
+        3*ema - 3*ema(ema) + ema(ema(ema)), every ema seeded like `ema`.
     """
-    pass
+    _data = __type_check(data).T
+
+    worker = RayMaster("Tripple_Exponential_Moving_Average", ray.batch, [_data], 0, ti_pi.tema, window)
+    result = worker.run()
 
-def vidya():
+    return pd.DataFrame(result.T, index=data.index, columns=data.columns)
+
+def vidya(data, window, cmo_window=9):
     """Variable Index Dynamic Average.
+
+    Args:
+        data (pd.DataFrame): price
+        window (int): window period, the base alpha is 2/(1+window)
+        cmo_window (int): number of price changes of the Chande momentum oscillator
+
+    Returns:
+        pd.DataFrame
+
+    Note:
+        alpha of each day is the base alpha times the absolute Chande momentum oscillator.
+    """
+    _data = __type_check(data).T
+
+    worker = RayMaster("Variable_Index_Dynamic_Average", ray.batch, [_data], 0, ti_pi.vidya, window, cmo_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=data.index, columns=data.columns)
+
+
+### Bar-Local Indicators ###
+def typical_price(high, low, close):
+    """Typical Price, (high + low + close) / 3.
+    """
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Typical_Price", ray.batch, [_high, _low, _close], 0, ti_pi.typical_price)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def true_range(high, low, close):
+    """True Range, max(high, previous close) - min(low, previous close).
+
+    Note:
+        high - low where the previous close is missing.
+    """
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("True_Range", ray.batch, [_high, _low, _close], 0, ti_pi.true_range)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def candle(open, high, low, close):
+    """Candle Body and Shadows.
+
+    Returns:
+        dict of pd.DataFrame
+            body: close - open
+            upper_shadow: high - max(open, close)
+            lower_shadow: min(open, close) - low
+            range: high - low
+            body_ratio: |body| / range, nan for a bar without range
     """
-    pass
+    _open = __type_check(open).T
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Candle", ray.batch, [_open, _high, _low, _close], 0, ti_pi.candle)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
+
+    return result
 
 
 ### Additionals ###
 
-def ema(data, window):
+def ema(data, window, use_numba=None):
     """Exponential Moving Average.
+
+    Note:
+        Seeded on the first day from window-1 on whose window has a value, with the mean of that
+        window. A nan day is nan and keeps the average as it was.
     """
     _data = __type_check(data).T
 
-    if off_numba == False:
-        worker = RayMaster("Double_Exponential_Moving_Average", ray.batch, [_data], 0, ti_pi.ema, window)
-    # elif off_numba == True:
-    #     worker = RayMaster("Volume_Adjusted_Moving_Average({window})".format(window=window), ray.batch, [_data, _volume], 0, ti_pi.vama)
+    worker = RayMaster("Exponential_Moving_Average", ray.batch, [_data], 0, __backend(use_numba).ema, window)
     result = worker.run()
 
     return pd.DataFrame(result.T, index=data.index, columns=data.columns)
\ No newline at end of file
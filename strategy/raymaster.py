@@ -1,59 +1,255 @@
+import time
+import hashlib
 from os import cpu_count
-from asyncio import Event
-from typing import Tuple
+from collections import OrderedDict
 
-import ray
-from ray.actor import ActorHandle
 import numpy as np
 from tqdm import tqdm
 
+### Lazy Ray Import ###
+# Importing ray costs a noticeable amount of time and starting a cluster costs seconds,
+# so both are postponed until the first parallel dispatch.
+_ray = None
+
+def _import_ray():
+    """Import ray on first use.
+
+    Returns:
+        ray module
+    """
+    global _ray
+    if _ray is None:
+        import ray
+        _ray = ray
+    return _ray
+
+def _take_block(result, start, end, axis):
+    """Cut the [start:end] block along axis out of a kernel result.
+
+    Args:
+        result (np.array/dict): kernel output, either full-size or already block-size
+        start (int): first index of the block
+        end (int): last index of the block (exclusive)
+        axis (int): axis the work was split on
+
+    Returns:
+        np.array/dict holding only the block
+    """
+    if type(result) == dict:
+        return {key: _take_block(value, start, end, axis) for key, value in result.items()}
+
+    if result.shape[axis] == end - start:
+        return result
+    index = [slice(None)] * result.ndim
+    index[axis] = slice(start, end)
+    return np.ascontiguousarray(result[tuple(index)])
+
+def _run_task(function, pba, start, end, axis, data, args):
+    """Ray task body, runs the kernel on one chunk and times it.
+
+    Args:
+        data (list): object refs of the input arrays, read zero-copy from the object store
+
+    Returns:
+        tuple of (block result, elapsed seconds)
+    """
+    data = _import_ray().get(list(data))
+    begin = time.perf_counter()
+    result = function(pba, start, end, data, args)
+    seconds = time.perf_counter() - begin
+    return _take_block(result, start, end, axis), seconds
+
+_remote_task_handle = None
+
+def _remote_task():
+    """Register `_run_task` with ray once per session."""
+    global _remote_task_handle
+    if _remote_task_handle is None:
+        _remote_task_handle = _import_ray().remote(_run_task)
+    return _remote_task_handle
+
+class ObjectCache:
+    """LRU cache of ray object refs keyed by array content.
+
+    Note:
+        Pipelines feed the same panel to many operators, eg) ts.zscore(close, 20), ts.rank(close, 60).
+        The key is a sha1 digest of the whole buffer plus shape and dtype, so the same panel is put
+        into the object store once per session, even through a new DataFrame.values or .T view, and
+        an in-place edit anywhere in the panel is a miss. Hashing reads the buffer once, which costs
+        a fraction of ray.put. C- and F-contiguous arrays are hashed in their own memory order, so
+        transposed inputs are copied only on the first put, when they are stored C-contiguous.
+        Least recently used refs are dropped once the cached bytes exceed the capacity.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(arr):
+        """(memory order, shape, dtype, sha1 of the buffer in that order)."""
+        if arr.flags.c_contiguous:
+            order, buffer = "C", arr
+        elif arr.flags.f_contiguous:
+            order, buffer = "F", arr.T
+        else:
+            order, buffer = "C", np.ascontiguousarray(arr)
+        digest = hashlib.sha1(buffer.reshape(-1).view(np.uint8)).digest()
+        return (order, arr.shape, arr.dtype.str, digest)
+
+    def put(self, arr):
+        """Return an object ref holding arr, putting it only on a cache miss."""
+        ray = _import_ray()
+        capacity = RayManager()._cache_capacity()
+        if capacity == 0 or arr.dtype.hasobject or arr.size == 0:
+            return ray.put(np.ascontiguousarray(arr))
+
+        key = self._key(arr)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+        self.misses += 1
+        ref = ray.put(np.ascontiguousarray(arr))
+        self.entries[key] = (ref, arr.nbytes)
+        self.nbytes += arr.nbytes
+        # Keep the newest entry even when it alone exceeds the capacity, it is in use right now
+        while self.nbytes > capacity and len(self.entries) > 1:
+            _, (_, nbytes) = self.entries.popitem(last=False)
+            self.nbytes -= nbytes
+        return ref
+
+    def clear(self):
+        """Drop every cached ref, ray frees the objects once no task holds them."""
+        self.entries.clear()
+        self.nbytes = 0
+
 class RayMaster:
 
-    def __init__(self, desc, num_cpu, data, axis, function, *args):
+    def __init__(self, desc, num_cpu, data, axis, function, *args, isCrossSection=False):
         # tqdm description
         self.desc = desc
+        # rows split on are dates holding one cross-section each, instead of assets
+        self.isCrossSection = isCrossSection
 
-        # Create Batch
-        y = [i.shape[axis] for i in np.array_split(data[0], num_cpu, axis=axis)]
-        x = [0] + y[:-1]
-        xx = [np.sum(x[:i]) for i in range(1, len(x)+1)]
-        yy = [np.sum(y[:i]) for i in range(1, len(y)+1)]
-        self.batch = zip(xx, yy)
-
+        self.num_cpu = num_cpu
+        self.axis = axis
         self.shape = data[0].shape
-        self.data = ray.put(data)
-        self.function = ray.remote(function)
+        self.data = data
+        self.function = function
         self.args = args
-    
-    def run(self):
-        pb = ProgressBar(self.shape[0], self.desc)
-        actor = pb.actor
+        self.report = []
 
-        results = [self.function.remote(actor, start, end, self.data, self.args) for start,end in self.batch]
-        pb.print_until_done()
-        results = ray.get(results)
-        
-        if type(results[0]) == dict:
-            result = results[0].copy()
-            for segment_result in results:
-                for key in list(result.keys()):
-                    result[key] = result[key] + segment_result[key]
+    def _make_chunks(self):
+        """Split the work along axis into chunks of roughly equal cost.
 
-            for key in list(result.keys()):
-                result[key] = result[key] - results[0][key]
+        Returns:
+            list of (start, end, cost)
 
+        Note:
+            The cost of an asset is the length of its history from the first non-NaN value onward
+            plus a constant overhead, so assets listed late or mostly empty are packed together
+            instead of leaving one worker busy. The cost of a cross-section is its number of
+            non-NaN values plus the same overhead, so early dates with few listed assets are
+            packed together the same way. There are num_cpu * RayManager.num_chunks_per_batch
+            chunks, more than workers, letting idle workers pick up the remaining chunks.
+        """
+        length = self.shape[self.axis]
+        num_chunks = max(min(length, self.num_cpu * RayManager.num_chunks_per_batch), 1)
+
+        arr = np.moveaxis(self.data[0], self.axis, 0).reshape(length, -1)
+        other_size = arr.shape[1]
+        if np.issubdtype(arr.dtype, np.floating) and other_size > 0:
+            isValid = ~np.isnan(arr)
+            if self.isCrossSection:
+                work = isValid.sum(axis=1)
+            else:
+                work = np.where(isValid.any(axis=1), other_size - isValid.argmax(axis=1), 0)
+            cost = work + 0.1*other_size + 1
         else:
-            result = np.zeros_like(results[0])
-            for segment_result in results:
-                result = result + segment_result
-
+            cost = np.full(length, other_size + 1.0)
+
+        cum_cost = np.cumsum(cost)
+        targets = cum_cost[-1] * np.arange(1, num_chunks) / num_chunks
+        bounds = np.unique(np.concatenate([[0], np.searchsorted(cum_cost, targets) + 1, [length]]))
+        bounds = bounds[bounds <= length]
+
+        chunks = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            chunks.append((int(start), int(end), float(np.sum(cost[start:end]))))
+        return chunks
+
+    def _assemble(self, blocks):
+        """Stitch (start, end, block) results back into one array or dict."""
+        first = blocks[0][2]
+        if type(first) == dict:
+            return {key: self._assemble([(start, end, block[key]) for start, end, block in blocks]) for key in first.keys()}
+
+        shape = list(first.shape)
+        shape[self.axis] = self.shape[self.axis]
+        result = np.empty(shape, dtype=first.dtype)
+        for start, end, block in blocks:
+            index = [slice(None)] * result.ndim
+            index[self.axis] = slice(start, end)
+            result[tuple(index)] = block
         return result
 
+    def run(self):
+        length = self.shape[self.axis]
+
+        # Small jobs and bar-local kernels, elementwise and bound by memory bandwidth,
+        # are cheaper to run in this process than to ship to ray workers
+        isInline = sum([each_data.size for each_data in self.data]) <= RayManager.inline_threshold
+        isInline = isInline or getattr(self.function, "bar_local", False)
+        if isInline:
+            pbar = tqdm(desc=self.desc, total=length, disable=not RayManager.progress)
+            begin = time.perf_counter()
+            result = self.function(pbar if RayManager.progress else NullProgress(), 0, length, self.data, self.args)
+            self.report = [{"start":0, "end":length, "cost":float(length), "seconds":time.perf_counter()-begin}]
+            RayManager.last_report = self.report
+            pbar.close()
+            return result
+
+        ray = _import_ray()
+        RayManager()._start()
+
+        chunks = self._make_chunks()
+        task = _remote_task()
+        data = [RayManager.object_cache.put(each_data) for each_data in self.data]
+        # Every chunk is queued at once, ray hands the next chunk to whichever worker frees up first
+        pending = {task.remote(self.function, NullProgress(), start, end, self.axis, data, self.args):(start, end, cost) for start,end,cost in chunks}
+
+        pbar = tqdm(desc=self.desc, total=length, disable=not RayManager.progress)
+        self.report = []
+        blocks = []
+        while pending:
+            ready, _ = ray.wait(list(pending.keys()), num_returns=1)
+            start, end, cost = pending.pop(ready[0])
+            block, seconds = ray.get(ready[0])
+            self.report.append({"start":start, "end":end, "cost":cost, "seconds":seconds})
+            blocks.append((start, end, block))
+            pbar.update(end - start)
+        pbar.close()
+
+        self.report.sort(key=lambda x: x["start"])
+        RayManager.last_report = self.report
+
+        return self._assemble(blocks)
+
 class RayManager:
 
     num_cpus = 0
     num_max_cpus = cpu_count()
     num_largest_batch = 0
+    num_chunks_per_batch = 4
+    inline_threshold = 250000
+    progress = True
+    last_report = []
+    object_cache = ObjectCache()
+    cache_capacity = None
 
     def __init__(self):
         self.__batch = 0
@@ -70,6 +266,21 @@ class RayManager:
     def __get_max_cpus(cls):
         return cls.num_max_cpus
 
+    @classmethod
+    def __get_planned_cpus(cls):
+        # Number of cpus ray will be started with, leave one for the driver
+        if cls.num_cpus > 0:
+            return cls.num_cpus
+        return max(cls.num_max_cpus-1, 1)
+
+    @classmethod
+    def _cache_capacity(cls):
+        # Half of the object store unless set by user
+        if cls.cache_capacity is None:
+            store = _import_ray().available_resources().get("object_store_memory", 2*1024**3)
+            cls.cache_capacity = int(store // 2)
+        return cls.cache_capacity
+
     @classmethod
     def __get_largest_batch(cls):
         return cls.num_largest_batch
@@ -85,6 +296,12 @@ class RayManager:
     def batch(self):
         return self.__batch
 
+    @property
+    def report(self):
+        """Per-chunk durations of the last job, one row per chunk."""
+        import pandas as pd
+        return pd.DataFrame(self.last_report, columns=["start", "end", "cost", "seconds"])
+
     @property
     def cpu_info(self):
         return {
@@ -99,23 +316,28 @@ class RayManager:
 
 
     def _initialize(self, isWhere):
-        if ray.is_initialized():
-            if isWhere == 'ts':
-                self.__batch = self.__get_num_cpus()
-            elif isWhere == 'cs':
-                self.__batch = 1
+        """Set the number of batches, ray itself is started lazily by `_start`."""
+        # Both time-series and cross-sectional jobs split on rows, so both use every cpu
+        if isWhere in ['ts', 'cs']:
+            self.__batch = self.__get_planned_cpus()
 
-        else:
-            ray.init(num_cpus=self.__get_max_cpus()-1, log_to_driver=False, include_dashboard=False)
-            self.__change_num_cpus(self.__get_max_cpus()-1)
-            if isWhere == 'ts':
-                self.__batch = self.__get_num_cpus()
-            elif isWhere == 'cs':
-                self.__batch = 1
+        self.__change_largest_batch(self.__batch)
 
-            self.__print_cpu_info()
+    def _start(self):
+        """Start ray on the first parallel dispatch."""
+        ray = _import_ray()
+        if ray.is_initialized():
+            if self.__get_num_cpus() == 0:
+                RayManager.object_cache.clear()
+                self.__change_num_cpus(int(ray.cluster_resources().get("CPU", 1)))
+            return
 
-        self.__change_largest_batch(self.__batch)
+        # Refs cached before a shutdown are dead
+        RayManager.object_cache.clear()
+        ray.init(num_cpus=self.__get_planned_cpus(), log_to_driver=False, include_dashboard=False)
+        self.__change_num_cpus(self.__get_planned_cpus())
+
+        self.__print_cpu_info()
 
     def restart(self, num_cpus, num_batches):
         # ValueError Check
@@ -132,7 +354,9 @@ class RayManager:
             raise ValueError("num_batches must be at least 1")
 
         # Ray Restart
+        ray = _import_ray()
         ray.shutdown()
+        RayManager.object_cache.clear()
         ray.init(num_cpus=num_cpus, log_to_driver=False, include_dashboard=False)
 
         # Reset number of cpus allocated, largest number of batches
@@ -151,8 +375,8 @@ class RayManager:
     def set_batch(self, num_batches=None, info=True):
         if type(num_batches) != int:
             raise ValueError("num_batches must be int")
-        elif num_batches > self.__get_num_cpus():
-            raise ValueError("num_batches cannot be larger than your number of cpus allocation({cpu})".format(cpu=self.__get_num_cpus()))
+        elif num_batches > self.__get_planned_cpus():
+            raise ValueError("num_batches cannot be larger than your number of cpus allocation({cpu})".format(cpu=self.__get_planned_cpus()))
         elif num_batches < 1:
             raise ValueError("num_batches must be at least 1")
 
@@ -161,80 +385,69 @@ class RayManager:
             self.__print_cpu_info()
             print("Current number of batches: {batch}".format(batch=self.__batch))
 
-### Ray-tqdm Code source comes from official ray-document
-# https://docs.ray.io/en/releases-1.11.1/ray-core/examples/progress_bar.html#progress-bar-for-ray-actors-tqdm
+    def set_chunks_per_batch(self, num_chunks):
+        """Set how many chunks each batch is cut into.
 
-@ray.remote
-class ProgressBarActor:
-    counter: int
-    delta: int
-    event: Event
+        Args:
+            num_chunks (int): chunks per batch, more chunks balance uneven rows better but cost more dispatches
+        """
+        if type(num_chunks) != int:
+            raise ValueError("num_chunks must be int")
+        elif num_chunks < 1:
+            raise ValueError("num_chunks must be at least 1")
 
-    def __init__(self) -> None:
-        self.counter = 0
-        self.delta = 0
-        self.event = Event()
+        RayManager.num_chunks_per_batch = num_chunks
 
-    def update(self, num_items_completed: int) -> None:
-        """Updates the ProgressBar with the incremental
-        number of items that were just completed.
+    def set_cache_capacity(self, num_bytes=None):
+        """Set how many bytes of input panels stay cached in the ray object store.
+
+        Args:
+            num_bytes (int/None): capacity in bytes, 0 disables the cache, None uses half of the object store
         """
-        self.counter += num_items_completed
-        self.delta += num_items_completed
-        self.event.set()
+        if num_bytes is not None:
+            if type(num_bytes) != int:
+                raise ValueError("num_bytes must be int or None")
+            elif num_bytes < 0:
+                raise ValueError("num_bytes cannot be negative")
 
-    async def wait_for_update(self) -> Tuple[int, int]:
-        """Blocking call.
+        RayManager.cache_capacity = num_bytes
+        if num_bytes == 0:
+            RayManager.object_cache.clear()
 
-        Waits until somebody calls `update`, then returns a tuple of
-        the number of updates since the last call to
-        `wait_for_update`, and the total number of completed items.
-        """
-        await self.event.wait()
-        self.event.clear()
-        saved_delta = self.delta
-        self.delta = 0
-        return saved_delta, self.counter
+    def clear_cache(self):
+        """Release every input panel cached in the ray object store."""
+        RayManager.object_cache.clear()
 
-    def get_counter(self) -> int:
-        """
-        Returns the total number of complete items.
+    def set_progress(self, show=True):
+        """Turn the tqdm progress bar on or off.
+
+        Args:
+            show (bool): False skips creating progress bars entirely
         """
-        return self.counter
-
-class ProgressBar:
-    progress_actor: ActorHandle
-    total: int
-    description: str
-    pbar: tqdm
-
-    def __init__(self, total: int, description: str = ""):
-        # Ray actors don't seem to play nice with mypy, generating
-        # a spurious warning for the following line,
-        # which we need to suppress. The code is fine.
-        self.progress_actor = ProgressBarActor.remote()  # type: ignore
-        self.total = total
-        self.description = description
+        if type(show) != bool:
+            raise ValueError("show must be bool")
 
-    @property
-    def actor(self) -> ActorHandle:
-        """Returns a reference to the remote `ProgressBarActor`.
+        RayManager.progress = show
+
+    def set_inline_threshold(self, num_elements):
+        """Set the input size under which jobs run in this process without ray.
 
-        When you complete tasks, call `update` on the actor.
+        Args:
+            num_elements (int): total number of elements of the input arrays, 0 to always use ray
         """
-        return self.progress_actor
+        if type(num_elements) != int:
+            raise ValueError("num_elements must be int")
+        elif num_elements < 0:
+            raise ValueError("num_elements cannot be negative")
 
-    def print_until_done(self) -> None:
-        """Blocking call.
+        RayManager.inline_threshold = num_elements
 
-        Do this after starting a series of remote Ray tasks, to which you've
-        passed the actor handle. Each of them calls `update` on the actor.
-        When the progress meter reaches 100%, this method returns.
-        """
-        pbar = tqdm(desc=self.description, total=self.total)
-        while True:
-            delta, counter = ray.get(self.actor.wait_for_update.remote())
-            pbar.update(delta)
-            if counter >= self.total:
-                pbar.close()
-                return
+### Progress Reporting ###
+# Kernels call `pba.update(1)` once per row. Inside ray tasks `pba` is a NullProgress, the driver
+# advances its own tqdm bar as chunks finish, so reporting progress costs no remote calls.
+
+class NullProgress:
+    """Progress sink that ignores updates."""
+
+    def update(self, num_items_completed: int) -> None:
+        pass
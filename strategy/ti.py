@@ -1,113 +1,458 @@
+import pandas as pd
+
+from . utils import __type_check
+from . raymaster import RayMaster, RayManager
+
+from . core import ti_ti
+
+### Ray Initialization ###
+ray = RayManager()
+ray._initialize(isWhere='cs')
 
 
 ### Trend Indicators ###
 
-def dmi():
+def dmi(high, low, close, window=14):
     """Directional Movement Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): Wilder smoothing window
+
+    Returns:
+        dict of pd.DataFrame, pdi and mdi
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Directional_Movement_Index", ray.batch, [_high, _low, _close], 0, ti_ti.dmi, window, ("pdi", "mdi"))
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
 
-def dx():
+    return result
+
+def dx(high, low, close, window=14):
     """Directional Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): Wilder smoothing window
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
 
-def adx():
+    worker = RayMaster("Directional_Index", ray.batch, [_high, _low, _close], 0, ti_ti.dmi, window, ("dx",))
+    result = worker.run()
+
+    return pd.DataFrame(result["dx"].T, index=close.index, columns=close.columns)
+
+def adx(high, low, close, window=14):
     """Average Directional Movement Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): Wilder smoothing window of the directional lines and of dx
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Average_Directional_Movement_Index", ray.batch, [_high, _low, _close], 0, ti_ti.dmi, window, ("adx",))
+    result = worker.run()
+
+    return pd.DataFrame(result["adx"].T, index=close.index, columns=close.columns)
 
-def adxr():
+def adxr(high, low, close, window=14):
     """Average Directional Movement Index Rating.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): Wilder smoothing window, adx is averaged with adx window-1 days before
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Average_Directional_Movement_Index_Rating", ray.batch, [_high, _low, _close], 0, ti_ti.dmi, window, ("adxr",))
+    result = worker.run()
 
-def csi():
+    return pd.DataFrame(result["adxr"].T, index=close.index, columns=close.columns)
+
+def csi(high, low, close, point_value, margin, commission, window=14):
     """Commodity Selection Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        point_value (float): value of a one point move
+        margin (float): margin requirement
+        commission (float): commission
+        window (int): Wilder smoothing window
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
 
-def aroon():
+    worker = RayMaster("Commodity_Selection_Index", ray.batch, [_high, _low, _close], 0, ti_ti.csi, window, point_value, margin, commission)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def aroon(high, low, window=25):
     """Aroon.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        window (int): lookback period
+
+    Returns:
+        dict of pd.DataFrame, up and down
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+
+    worker = RayMaster("Aroon", ray.batch, [_high, _low], 0, ti_ti.aroon, window)
+    result = worker.run()
+
+    return {key:pd.DataFrame(result[key].T, index=high.index, columns=high.columns) for key in ["up", "down"]}
 
-def aroon_oscillator():
+def aroon_oscillator(high, low, window=25):
     """Aroon Oscillator.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        window (int): lookback period
+
+    Returns:
+        pd.DataFrame, aroon up - aroon down
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+
+    worker = RayMaster("Aroon_Oscillator", ray.batch, [_high, _low], 0, ti_ti.aroon, window)
+    result = worker.run()
 
-def cci():
+    return pd.DataFrame(result["oscillator"].T, index=high.index, columns=high.columns)
+
+def cci(high, low, close, window=20):
     """Commodity Channel Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): window of the typical price mean and mean deviation
+
+    Returns:
+        pd.DataFrame
+
+    Note:
+        nan where the mean deviation is 0.
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Commodity_Channel_Index", ray.batch, [_high, _low, _close], 0, ti_ti.cci, window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
 
-def erp():
+def erp(high, low, close, window=13):
     """Elder Ray Power.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): ema window of the close
+
+    Returns:
+        dict of pd.DataFrame, bull and bear
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Elder_Ray_Power", ray.batch, [_high, _low, _close], 0, ti_ti.erp, window)
+    result = worker.run()
 
-def force_index():
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
+
+    return result
+
+def force_index(close, volume, window=13):
     """Force Index.
+
+    Args:
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        window (int): ema window
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
+    _volume = __type_check(volume).T
+
+    worker = RayMaster("Force_Index", ray.batch, [_close, _volume], 0, ti_ti.force_index, window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
 
-def forecast_osillator():
+def forecast_osillator(close, window=14):
     """Forecast Osillator.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): linear regression window
+
+    Returns:
+        pd.DataFrame, percent gap of the close over the forecast of the day before
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Forecast_Oscillator", ray.batch, [_close], 0, ti_ti.forecast_oscillator, window)
+    result = worker.run()
 
-def macd():
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def macd(close, fast_window=12, slow_window=26, signal_window=9):
     """Moving Average COnvergence Divergence.
+
+    Args:
+        close (pd.DataFrame): close price
+        fast_window (int): fast ema window
+        slow_window (int): slow ema window
+        signal_window (int): ema window of the signal line
+
+    Returns:
+        dict of pd.DataFrame, macd, signal and histogram
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("MACD", ray.batch, [_close], 0, ti_ti.macd, fast_window, slow_window, signal_window)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
+
+    return result
 
-def macd_oscillator():
+def macd_oscillator(close, fast_window=12, slow_window=26, signal_window=9):
     """MACD Oscillator.
+
+    Args:
+        close (pd.DataFrame): close price
+        fast_window (int): fast ema window
+        slow_window (int): slow ema window
+        signal_window (int): ema window of the signal line
+
+    Returns:
+        pd.DataFrame, macd - signal
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("MACD_Oscillator", ray.batch, [_close], 0, ti_ti.macd, fast_window, slow_window, signal_window)
+    result = worker.run()
 
-def mao():
+    return pd.DataFrame(result["histogram"].T, index=close.index, columns=close.columns)
+
+def mao(close, fast_window=5, slow_window=20):
     """Moving Average Oscillator.
+
+    Args:
+        close (pd.DataFrame): close price
+        fast_window (int): fast moving average window
+        slow_window (int): slow moving average window
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
 
-def mfi():
+    worker = RayMaster("Moving_Average_Oscillator", ray.batch, [_close], 0, ti_ti.mao, fast_window, slow_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def mfi(high, low, volume):
     """Market Facilitaion Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        volume (pd.DataFrame): volume
+
+    Returns:
+        pd.DataFrame, (high - low) / volume, nan without volume
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _volume = __type_check(volume).T
+
+    worker = RayMaster("Market_Facilitation_Index", ray.batch, [_high, _low, _volume], 0, ti_ti.mfi)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=high.index, columns=high.columns)
 
-def pfe():
+def pfe(close, window=10, smoothing=5):
     """Polarized Fractal Efficiency.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): distance window
+        smoothing (int): ema window of the raw efficiency
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Polarized_Fractal_Efficiency", ray.batch, [_close], 0, ti_ti.pfe, window, smoothing)
+    result = worker.run()
 
-def qstick():
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def qstick(open, close, window=8):
     """Qstick.
+
+    Args:
+        open (pd.DataFrame): open price
+        close (pd.DataFrame): close price
+        window (int): moving average window of close - open
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _open = __type_check(open).T
+    _close = __type_check(close).T
 
-def sonar():
+    worker = RayMaster("Qstick", ray.batch, [_open, _close], 0, ti_ti.qstick, window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def sonar(close, window=20, shift=9, signal_window=9):
     """Sonar.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): ema window
+        shift (int): days of the ema change
+        signal_window (int): ema window of the signal line
+
+    Returns:
+        dict of pd.DataFrame, sonar and signal
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Sonar", ray.batch, [_close], 0, ti_ti.sonar, window, shift, signal_window)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
 
-def stochrsi():
+    return result
+
+def stochrsi(close, window=14, k_window=14, d_window=3):
     """StochRSI.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): rsi window
+        k_window (int): window of the highest and lowest rsi
+        d_window (int): moving average window of %K
+
+    Returns:
+        dict of pd.DataFrame, k and d
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("StochRSI", ray.batch, [_close], 0, ti_ti.stochrsi, window, k_window, d_window)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
+
+    return result
 
-def trix():
+def trix(close, window=15):
     """TRIX.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): window of each of the three emas
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("TRIX", ray.batch, [_close], 0, ti_ti.trix, window)
+    result = worker.run()
 
-def tsi():
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def tsi(close, long_window=25, short_window=13):
     """True Strength Index.
+
+    Args:
+        close (pd.DataFrame): close price
+        long_window (int): first ema window of the change
+        short_window (int): second ema window of the change
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
 
-def vhf():
+    worker = RayMaster("True_Strength_Index", ray.batch, [_close], 0, ti_ti.tsi, long_window, short_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def vhf(close, window=28):
     """Vertical Horizontal Filter.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): lookback period
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Vertical_Horizontal_Filter", ray.batch, [_close], 0, ti_ti.vhf, window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
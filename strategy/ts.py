@@ -1,4 +1,5 @@
 
+import numpy as np
 import pandas as pd
 
 from . raymaster import RayMaster, RayManager
@@ -10,6 +11,29 @@ off_numba = True
 ray = RayManager()
 ray._initialize(isWhere='ts')
 
+### Lazy Numba Backend ###
+def _core_ts_numba():
+    """Import the numba backend on first use, importing numba takes a while."""
+    from . import core_ts_numba
+    return core_ts_numba
+
+def _apply_engine(func, engine):
+    """Pick the apply backend.
+
+    Args:
+        func (function): user-defined function
+        engine (str/None): one in [None, 'python', 'numba', 'vector', 'block'], None picks 'numba' for numba functions
+
+    Returns:
+        str, engine name
+    """
+    if engine is None:
+        # numba functions carry their python source as py_func, checked without importing numba
+        return "numba" if hasattr(func, "py_func") else "python"
+    if engine not in ["python", "numba", "vector", "block"]:
+        raise ValueError("engine must be one in [None, 'python', 'numba', 'vector', 'block']")
+    return engine
+
 ### Global Functions ###
 """
 나중에 utils로 따로 빼야할 필요 있음
@@ -34,25 +58,31 @@ def __type_check(data):
         raise ValueError("arg 'data' must be '2d-np.array' or 'pd.DataFrame'")
 
 ### Product Functions ###
-def rank(data, lookback):
+def rank(data, lookback, method="ordinal", na_option="keep"):
     """Rank.
 
     Args:
         data (pd.DataFrame): input data
         lookback (int): lookback period
+        method (str, one in ['ordinal', 'average', 'min', 'max', 'dense']): rank of tied values,
+            'ordinal' gives ties distinct ranks in time order
+        na_option (str, one in ['keep', 'top', 'bottom']): 'keep' leaves nan out of the window,
+            'top'/'bottom' ranks nan as one tie group below/above every value
 
     Returns:
         pd.DataFrame with values 0 ~ 1, size is same as input
 
     Note:
-        Calculate the ranking of the data and divide with the largest rank
+        Calculate the ranking of the last value in the window and divide with the largest rank
     """
+    if method not in ["ordinal", "average", "min", "max", "dense"]:
+        raise ValueError("method must be one in ['ordinal', 'average', 'min', 'max', 'dense']")
+    if na_option not in ["keep", "top", "bottom"]:
+        raise ValueError("na_option must be one in ['keep', 'top', 'bottom']")
     _data = __type_check(data).T
 
-    if off_numba == False:
-        worker = RayMaster("ts_rank", ray.batch, [_data], 0, core_ts_numba.ts_rank, lookback)
-    elif off_numba == True:
-        worker = RayMaster("ts_rank", ray.batch, [_data], 0, core_ts.ts_rank, lookback)
+    # counting against the window beats sorting every window on either backend
+    worker = RayMaster("ts_rank", ray.batch, [_data], 0, core_ts.ts_rank, lookback, method, na_option)
     result = worker.run()
     
     return pd.DataFrame(result.T, index=data.index, columns=data.columns)
@@ -70,7 +100,7 @@ def zscore(data, lookback):
     _data = __type_check(data).T
 
     if off_numba == False:
-        worker = RayMaster("ts_zscore", ray.batch, [_data], 0, core_ts_numba.ts_zscore, lookback)
+        worker = RayMaster("ts_zscore", ray.batch, [_data], 0, _core_ts_numba().ts_zscore, lookback)
     elif off_numba == True:
         worker = RayMaster("ts_zscore", ray.batch, [_data], 0, core_ts.ts_zscore, lookback)
     result = worker.run()
@@ -91,9 +121,9 @@ def winsorize(data, lookback, sigma=4):
     _data = __type_check(data).T
 
     if off_numba == False:
-        worker = RayMaster("ts_winsorize", ray.batch, [_data], 0, core_ts_numba.ts_zscore, lookback, sigma)
+        worker = RayMaster("ts_winsorize", ray.batch, [_data], 0, _core_ts_numba().ts_winsorize, lookback, sigma)
     elif off_numba == True:
-        worker = RayMaster("ts_winsorize", ray.batch, [_data], 0, core_ts.ts_zscore, lookback, sigma)
+        worker = RayMaster("ts_winsorize", ray.batch, [_data], 0, core_ts.ts_winsorize, lookback, sigma)
     result = worker.run()
     
     return pd.DataFrame(result.T, index=data.index, columns=data.columns)
@@ -112,7 +142,7 @@ def truncate(data, lookback, maxPercent):
     _data = __type_check(data).T
 
     if off_numba == False:
-        worker = RayMaster("ts_truncate", ray.batch, [_data], 0, core_ts_numba.ts_truncate, lookback, maxPercent)
+        worker = RayMaster("ts_truncate", ray.batch, [_data], 0, _core_ts_numba().ts_truncate, lookback, maxPercent)
     elif off_numba == True:
         worker = RayMaster("ts_truncate", ray.batch, [_data], 0, core_ts.ts_truncate, lookback, maxPercent)
     result = worker.run()
@@ -134,7 +164,7 @@ def corr_pearson(y, x, lookback):
     _x = __type_check(x).T[0]
 
     if off_numba == False:
-        worker = RayMaster("ts_corr_pearson", ray.batch, [_y, _x], 0, core_ts_numba.ts_corr_pearson, lookback)
+        worker = RayMaster("ts_corr_pearson", ray.batch, [_y, _x], 0, _core_ts_numba().ts_corr_pearson, lookback)
     elif off_numba == True:
         worker = RayMaster("ts_corr_pearson", ray.batch, [_y, _x], 0, core_ts.ts_corr_pearson, lookback)
     result = worker.run()
@@ -156,7 +186,7 @@ def corr_spearman(y, x, lookback):
     _x = __type_check(x).T[0]
 
     if off_numba == False:
-        worker = RayMaster("ts_corr_spearman", ray.batch, [_y, _x], 0, core_ts_numba.ts_corr_spearman, lookback)
+        worker = RayMaster("ts_corr_spearman", ray.batch, [_y, _x], 0, _core_ts_numba().ts_corr_spearman, lookback)
     elif off_numba == True:
         worker = RayMaster("ts_corr_spearman", ray.batch, [_y, _x], 0, core_ts.ts_corr_spearman, lookback)
     result = worker.run()
@@ -174,19 +204,242 @@ def corr_kendall(y, x, lookback):
     Returns:
         pd.DataFrame
     """ 
-    raise Exception("Currently Developing...")
     _y = __type_check(y).T
     _x = __type_check(x).T[0]
 
     if off_numba == False:
-        worker = RayMasterDual("ts_corr_kendall", ray.batch, _y, _x, 0, core_ts_ray_numba.ts_corr_kendall, lookback)
+        worker = RayMaster("ts_corr_kendall", ray.batch, [_y, _x], 0, _core_ts_numba().ts_corr_kendall, lookback)
     elif off_numba == True:
-        worker = RayMasterDual("ts_corr_kendall", ray.batch, _y, _x, 0, core_ts_ray.ts_corr_kendall, lookback)
+        worker = RayMaster("ts_corr_kendall", ray.batch, [_y, _x], 0, core_ts.ts_corr_kendall, lookback)
     result = worker.run()
     
     return pd.DataFrame(result.T, index=y.index, columns=y.columns)
 
-def apply(data, lookback, func, *args):
+def __ew_alpha(halflife, span, alpha):
+    """Smoothing factor from exactly one of halflife, span and alpha."""
+    if sum([each is not None for each in [halflife, span, alpha]]) != 1:
+        raise ValueError("exactly one of halflife, span and alpha must be given")
+    if halflife is not None:
+        if halflife <= 0:
+            raise ValueError("halflife must be positive")
+        return 1 - np.exp(-np.log(2) / halflife)
+    if span is not None:
+        if span < 1:
+            raise ValueError("span must be at least 1")
+        return 2 / (span + 1)
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha must be in (0, 1]")
+    return alpha
+
+def __ew(desc, data, x, *args):
+    _data = [__type_check(data).T]
+    if x is not None:
+        _x = __type_check(x).T
+        if _x.shape[1] != _data[0].shape[1] or _x.shape[0] not in [1, _data[0].shape[0]]:
+            raise ValueError("x must have the same rows as y and either one column or the same columns as y")
+        _data.append(_x)
+
+    if off_numba == False:
+        worker = RayMaster(desc, ray.batch, _data, 0, getattr(_core_ts_numba(), desc), *args)
+    elif off_numba == True:
+        worker = RayMaster(desc, ray.batch, _data, 0, getattr(core_ts, desc), *args)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=data.index, columns=data.columns)
+
+def ew_mean(data, halflife=None, span=None, alpha=None, min_periods=0):
+    """Exponentially weighted mean.
+
+    Args:
+        data (pd.DataFrame): input dataframe with rows and columns
+        halflife (float): halflife of the weights
+        span (float): span of the weights, alpha = 2/(span+1)
+        alpha (float): smoothing factor in (0, 1]
+        min_periods (int): observations needed for a value
+
+    Returns:
+        pd.DataFrame
+
+    Note:
+        Give exactly one of halflife, span and alpha.
+        Same as data.ewm(..., adjust=True).mean(), in one recursive pass per asset.
+    """
+    return __ew("ts_ew_mean", data, None, __ew_alpha(halflife, span, alpha), min_periods)
+
+def ew_std(data, halflife=None, span=None, alpha=None, min_periods=0, bias=False):
+    """Exponentially weighted standard deviation.
+
+    Args:
+        data (pd.DataFrame): input dataframe with rows and columns
+        halflife (float): halflife of the weights
+        span (float): span of the weights, alpha = 2/(span+1)
+        alpha (float): smoothing factor in (0, 1]
+        min_periods (int): observations needed for a value
+        bias (bool): skip the bias correction
+
+    Returns:
+        pd.DataFrame
+
+    Note:
+        Same as data.ewm(..., adjust=True).std(bias=bias)
+    """
+    return __ew("ts_ew_std", data, None, __ew_alpha(halflife, span, alpha), min_periods, bias)
+
+def ew_zscore(data, halflife=None, span=None, alpha=None, min_periods=0, bias=False):
+    """Exponentially weighted z-score.
+
+    Args:
+        data (pd.DataFrame): input dataframe with rows and columns
+        halflife (float): halflife of the weights
+        span (float): span of the weights, alpha = 2/(span+1)
+        alpha (float): smoothing factor in (0, 1]
+        min_periods (int): observations needed for a value
+        bias (bool): skip the bias correction of the standard deviation
+
+    Returns:
+        pd.DataFrame
+
+    Note:
+        (data - ew_mean) / ew_std, both from the same pass
+    """
+    return __ew("ts_ew_zscore", data, None, __ew_alpha(halflife, span, alpha), min_periods, bias)
+
+def ew_cov(y, x, halflife=None, span=None, alpha=None, min_periods=0, bias=False):
+    """Exponentially weighted covariance.
+
+    Args:
+        y (pd.DataFrame): input dataframe with rows and columns
+        x (pd.DataFrame): input data with the same columns as y or with only one column
+        halflife (float): halflife of the weights
+        span (float): span of the weights, alpha = 2/(span+1)
+        alpha (float): smoothing factor in (0, 1]
+        min_periods (int): observations needed for a value
+        bias (bool): skip the bias correction
+
+    Returns:
+        pd.DataFrame
+
+    Note:
+        Same as y[col].ewm(..., adjust=True).cov(x, bias=bias) for every column
+    """
+    return __ew("ts_ew_cov", y, x, __ew_alpha(halflife, span, alpha), min_periods, bias)
+
+def ew_corr(y, x, halflife=None, span=None, alpha=None, min_periods=0):
+    """Exponentially weighted correlation.
+
+    Args:
+        y (pd.DataFrame): input dataframe with rows and columns
+        x (pd.DataFrame): input data with the same columns as y or with only one column
+        halflife (float): halflife of the weights
+        span (float): span of the weights, alpha = 2/(span+1)
+        alpha (float): smoothing factor in (0, 1]
+        min_periods (int): observations needed for a value
+
+    Returns:
+        pd.DataFrame
+
+    Note:
+        Same as y[col].ewm(..., adjust=True).corr(x) for every column
+    """
+    return __ew("ts_ew_corr", y, x, __ew_alpha(halflife, span, alpha), min_periods)
+
+def __matrix_iter(data, lookback, halflife, shrinkage, isCorr):
+    if lookback is None and halflife is None:
+        raise ValueError("at least one of lookback and halflife must be given")
+    if not 0 <= shrinkage <= 1:
+        raise ValueError("shrinkage must be in [0, 1]")
+
+    for i, matrix in core_ts.ts_cov_matrix_iter(__type_check(data), lookback, halflife, isCorr):
+        if shrinkage > 0:
+            # shrink toward mu*I, mu is the average variance
+            mu = np.nanmean(np.diag(matrix)) if np.isfinite(np.diag(matrix)).any() else np.nan
+            matrix = (1-shrinkage)*matrix + shrinkage*mu*np.eye(matrix.shape[0])
+        yield i, matrix
+
+def cov_matrix(data, lookback=None, halflife=None, shrinkage=0, output="full", dtype=np.float64):
+    """Rolling covariance matrix of every pair of columns.
+
+    Args:
+        data (pd.DataFrame): input dataframe with rows and columns
+        lookback (int): lookback period, None keeps every past row (needs halflife)
+        halflife (float): halflife of exponential weights, None weights rows equally
+        shrinkage (float): weight in [0, 1] of the target mu*I, mu is the average variance
+        output (str, one in ['full', 'upper']): 'full' returns a (rows, columns, columns) np.array,
+                                                'upper' a pd.DataFrame of the upper triangle with (column, column) pairs as columns
+        dtype (np.dtype): dtype of the output, eg) np.float32 halves the memory
+
+    Returns:
+        3d-np.array or pd.DataFrame
+
+    Note:
+        Pairs use the rows on which both columns are valid, as pd.DataFrame.rolling().cov().
+        Use cov_matrix_stream when the full output does not fit in memory.
+    """
+    return __matrix(data, lookback, halflife, shrinkage, output, dtype, False)
+
+def corr_matrix(data, lookback=None, halflife=None, shrinkage=0, output="full", dtype=np.float64):
+    """Rolling correlation matrix of every pair of columns.
+
+    Args:
+        data (pd.DataFrame): input dataframe with rows and columns
+        lookback (int): lookback period, None keeps every past row (needs halflife)
+        halflife (float): halflife of exponential weights, None weights rows equally
+        shrinkage (float): weight in [0, 1] of the identity
+        output (str, one in ['full', 'upper']): 'full' returns a (rows, columns, columns) np.array,
+                                                'upper' a pd.DataFrame of the upper triangle with (column, column) pairs as columns
+        dtype (np.dtype): dtype of the output, eg) np.float32 halves the memory
+
+    Returns:
+        3d-np.array or pd.DataFrame
+    """
+    return __matrix(data, lookback, halflife, shrinkage, output, dtype, True)
+
+def __matrix(data, lookback, halflife, shrinkage, output, dtype, isCorr):
+    if output not in ["full", "upper"]:
+        raise ValueError("output must be one in ['full', 'upper']")
+
+    number_of_days, n = __type_check(data).shape
+    if output == "full":
+        result = np.empty((number_of_days, n, n), dtype=dtype)
+        for i, matrix in __matrix_iter(data, lookback, halflife, shrinkage, isCorr):
+            result[i] = matrix
+        return result
+
+    rows, cols = np.triu_indices(n)
+    result = np.empty((number_of_days, rows.shape[0]), dtype=dtype)
+    for i, matrix in __matrix_iter(data, lookback, halflife, shrinkage, isCorr):
+        result[i] = matrix[rows, cols]
+    if "DataFrame" in str(type(data)):
+        columns = pd.MultiIndex.from_arrays([data.columns[rows], data.columns[cols]])
+        return pd.DataFrame(result, index=data.index, columns=columns)
+    return pd.DataFrame(result, columns=pd.MultiIndex.from_arrays([rows, cols]))
+
+def cov_matrix_stream(data, lookback=None, halflife=None, shrinkage=0, corr=False):
+    """Rolling covariance (or correlation) matrix, yielded one row at a time.
+
+    Args:
+        data (pd.DataFrame): input dataframe with rows and columns
+        lookback (int): lookback period, None keeps every past row (needs halflife)
+        halflife (float): halflife of exponential weights, None weights rows equally
+        shrinkage (float): weight in [0, 1] of the target mu*I
+        corr (bool): yield correlation instead of covariance
+
+    Yields:
+        (index, pd.DataFrame): row index and its (columns, columns) matrix
+
+    Note:
+        Memory stays at a few (columns, columns) matrices however long the data is.
+
+    Example:
+        >>> for date, cov in ts.cov_matrix_stream(returns, 250):
+        ...     weights[date] = min_variance(cov)
+    """
+    index = data.index if "DataFrame" in str(type(data)) else None
+    columns = data.columns if "DataFrame" in str(type(data)) else None
+    for i, matrix in __matrix_iter(data, lookback, halflife, shrinkage, corr):
+        yield (i if index is None else index[i]), pd.DataFrame(matrix, index=columns, columns=columns)
+
+def apply(data, lookback, func, *args, engine=None):
     """Apply user-defined function with one data argument.
 
     Args:
@@ -194,6 +447,16 @@ def apply(data, lookback, func, *args):
         lookback (int): lookback period
         func (function): function to apply
         *args : arguments used in the function
+        engine (str, one in [None, 'python', 'numba', 'vector', 'block']): how func is called
+            None: 'numba' if func is decorated with numba.njit, otherwise 'python'
+            'python': func is called window by window
+            'numba': the window loop is compiled, plain python functions are jitted on the fly,
+                     falls back to 'vector' if numba cannot compile func, windows holding only nan stay nan
+            'vector': func gets every window of an asset at once as a (number of windows, lookback) view
+                      and returns one value per window, falls back to 'python' if it does not
+            'block': func gets every window of a block of assets at once as a (assets, number of windows, lookback)
+                     view and returns a (assets, number of windows) array, falls back to 'vector' if it does not
+            In 'vector' and 'block' the windows lie on the last axis, functions taking an axis argument get axis=-1
 
     Returns:
         pd.DataFrame
@@ -203,16 +466,30 @@ def apply(data, lookback, func, *args):
         Numpy array methods are availalbe, eg) lambda x: x/x.sum()
 
     Example:
-
+        >>> @numba.njit
+        ... def slope(x):
+        ...     t = np.arange(x.shape[0])
+        ...     return np.sum((t-t.mean())*(x-x.mean())) / np.sum((t-t.mean())**2)
+        >>> ts.apply(close, 20, slope)
+        >>> ts.apply(close, 20, lambda w: np.nanmean(w, axis=-1), engine="vector")
+        >>> ts.apply(close, 60, np.nanpercentile, 90, engine="block")
     """
     _data = __type_check(data).T
 
-    worker = RayMaster("ts_apply", ray.batch, [_data], 0, core_ts.ts_apply, lookback, func, args)
+    engine = _apply_engine(func, engine)
+    if engine == "numba":
+        worker = RayMaster("ts_apply", ray.batch, [_data], 0, _core_ts_numba().ts_apply, lookback, func, args)
+    elif engine == "vector":
+        worker = RayMaster("ts_apply", ray.batch, [_data], 0, core_ts.ts_apply_vector, lookback, func, args)
+    elif engine == "block":
+        worker = RayMaster("ts_apply", ray.batch, [_data], 0, core_ts.ts_apply_block, lookback, func, args)
+    else:
+        worker = RayMaster("ts_apply", ray.batch, [_data], 0, core_ts.ts_apply, lookback, func, args)
     result = worker.run()
 
     return pd.DataFrame(result.T, index=data.index, columns=data.columns)
 
-def dual_apply(y, x, lookback, func, *args):
+def dual_apply(y, x, lookback, func, *args, engine=None):
     """Apply user-defined function with two data arguments.
     
     Args:
@@ -221,6 +498,7 @@ def dual_apply(y, x, lookback, func, *args):
         lookback (int): lookback period
         func (function): function to apply
         *args : arguments used in the function
+        engine (str, one in [None, 'python', 'numba']): how func is called, see apply
 
     Returns:
         pd.DataFrame
@@ -229,12 +507,18 @@ def dual_apply(y, x, lookback, func, *args):
     _y = __type_check(y).T
     _x = __type_check(x).T
 
-    worker = RayMaster("ts_dual_apply", ray.batch, [_y, _x], 0, core_ts.ts_dual_apply, lookback, func, args)
+    engine = _apply_engine(func, engine)
+    if engine == "numba":
+        worker = RayMaster("ts_dual_apply", ray.batch, [_y, _x], 0, _core_ts_numba().ts_dual_apply, lookback, func, args)
+    elif engine == "python":
+        worker = RayMaster("ts_dual_apply", ray.batch, [_y, _x], 0, core_ts.ts_dual_apply, lookback, func, args)
+    else:
+        raise ValueError("dual_apply supports engine None, 'python' or 'numba'")
     result = worker.run()
 
     return pd.DataFrame(result.T, index=y.index, columns=y.columns)
 
-def multi_apply(data, lookback, func, *args):
+def multi_apply(data, lookback, func, *args, engine=None):
     """Apply user-defined  function with multiple data arguments.
     
     Args:
@@ -242,6 +526,7 @@ def multi_apply(data, lookback, func, *args):
         lookback (int): lookback period
         func (function): function to apply
         *args : arguments used in the function
+        engine (str, one in [None, 'python', 'numba']): how func is called, see apply
 
     Returns:
         pd.DataFrame
@@ -250,28 +535,56 @@ def multi_apply(data, lookback, func, *args):
     if type(data) != list:
         raise ValueError("data must be list of pd.DataFrame or np.array")
     data = [__type_check(each_data).T for each_data in data]
-         
-    worker = RayMaster("ts_multi_apply", ray.batch, data, 0, core_ts.ts_multi_apply, lookback, func, args)
+
+    engine = _apply_engine(func, engine)
+    if engine == "numba":
+        worker = RayMaster("ts_multi_apply", ray.batch, data, 0, _core_ts_numba().ts_multi_apply, lookback, func, args)
+    elif engine == "python":
+        worker = RayMaster("ts_multi_apply", ray.batch, data, 0, core_ts.ts_multi_apply, lookback, func, args)
+    else:
+        raise ValueError("multi_apply supports engine None, 'python' or 'numba'")
     result = worker.run()
 
     return pd.DataFrame(result.T, index=result_idx, columns=result_col)
 
 
-# def regression(y, x, lookback, returns="slope"):
-#     """Correlation between two data.
+def regression(y, x, lookback, returns="slope"):
+    """Rolling OLS regression.
 
-#     Args:
-#         y (pd.DataFrame): data for dependent variable.
-#         x (pd.DataFrame): data for independent varialbe.
-#         lookback (int): lookback period.
-#         returns (str, one in ['slope','constant']): decide which to return.
+    Args:
+        y (pd.DataFrame): data for dependent variable.
+        x (pd.DataFrame/list[pd.DataFrame]): data for independent variables, each with the same columns as y
+                                             or with only one column used for every asset, eg) market returns
+        lookback (int): lookback period.
+        returns (str, one in ['slope','intercept','residual','r2','all']): decide which to return.
     
-#     Returns:
-#         pd.DataFrame
-
-#     Note:
-#         Function implements the OLS regression with y = a + bx.
-#         You can choose which to return 'a' (costant) or 'b' (slope) 
-#     """
-#     _y = y.values.copy()
-#     _x = x.values.copy()
\ No newline at end of file
+    Returns:
+        pd.DataFrame, list of pd.DataFrame for 'slope' with several regressors, dict of them for 'all'
+
+    Note:
+        Function implements the OLS regression with y = a + b1*x1 + ... + bk*xk.
+        'residual' is the error of the last observation of each window.
+        Observations with NaN are dropped, windows need at least k+2 observations.
+    """
+    if returns == "constant":
+        returns = "intercept"
+    if returns not in ["slope", "intercept", "residual", "r2", "all"]:
+        raise ValueError("returns must be one in ['slope','intercept','residual','r2','all']")
+
+    xs = x if type(x) == list else [x]
+    _y = __type_check(y).T
+    _xs = [__type_check(each_x).T for each_x in xs]
+    for _x in _xs:
+        if _x.shape[1] != _y.shape[1] or _x.shape[0] not in [1, _y.shape[0]]:
+            raise ValueError("x must have the same rows as y and either one column or the same columns as y")
+
+    worker = RayMaster("ts_regression", ray.batch, [_y] + _xs, 0, core_ts.ts_regression, lookback)
+    result = worker.run()
+
+    result = {key: pd.DataFrame(value.T, index=y.index, columns=y.columns) for key, value in result.items()}
+    slopes = [result.pop("slope{k}".format(k=k)) for k in range(len(xs))]
+    result["slope"] = slopes if type(x) == list else slopes[0]
+
+    if returns == "all":
+        return result
+    return result[returns]
@@ -1,60 +1,295 @@
+import numpy as np
+import pandas as pd
+
+from . utils import __type_check
+from . raymaster import RayMaster, RayManager
+
+from . core import ti_tvi
+
+### Ray Initialization ###
+ray = RayManager()
+ray._initialize(isWhere='cs')
+
+### Append Mode ###
+# Every indicator taking prev only computes the days after the last day of prev, reading the
+# lookback days before them, and returns prev with the new days appended. The inputs must still
+# hold the last day of prev, eg) the full history or its last few rows plus the new days.
+
+def __tail(data, prev, lookback):
+    """Row of the first new day and of the first day read, prev None computes every day."""
+    if prev is None:
+        return 0, 0
+    last = prev if type(prev) != dict else next(iter(prev.values()))
+    first = data.index.get_loc(last.index[-1]) + 1
+    return first, max(first - lookback, 0)
+
+def __last(prev, data):
+    """(assets, 1) value of prev on its last day with one, nan for assets without any."""
+    if prev is None:
+        return np.full((data.shape[1], 1), np.nan)
+    return prev.ffill().iloc[-1].values.astype(np.float64).reshape(-1, 1)
+
+def __append(prev, result, data, first):
+    """New days of result as a DataFrame appended to prev."""
+    frame = pd.DataFrame(result.T, index=data.index[first:], columns=data.columns)
+    return frame if prev is None else pd.concat([prev, frame])
 
 
 ### Trading Volume Indicators ###
 
-def chaikin_adl():
+def chaikin_adl(high, low, close, volume, prev=None):
     """Chaikin Accumulation/Distribution Line.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        prev (pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        pd.DataFrame, running sum of the close location value times volume
     """
-    pass
+    first, head = __tail(close, prev, 0)
+    _high = __type_check(high.iloc[head:]).T
+    _low = __type_check(low.iloc[head:]).T
+    _close = __type_check(close.iloc[head:]).T
+    _volume = __type_check(volume.iloc[head:]).T
+    _base = np.nan_to_num(__last(prev, close))
+
+    worker = RayMaster("Chaikin_ADL", ray.batch, [_high, _low, _close, _volume, _base], 0, ti_tvi.chaikin_adl, first-head)
+    result = worker.run()
 
-def binary_wave():
+    return __append(prev, result[:,first-head:], close, first)
+
+def binary_wave(high, low, close, fast_window=12, slow_window=26, signal_window=9, ema_window=20, roc_window=12, k_window=5, d_window=3):
     """Binary Wave.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        fast_window (int): fast ema window of the macd
+        slow_window (int): slow ema window of the macd
+        signal_window (int): ema window of the macd signal
+        ema_window (int): ema window of the close
+        roc_window (int): days of the rate of change
+        k_window (int): window of the stochastic %K
+        d_window (int): moving average window of the stochastic %D
+
+    Returns:
+        pd.DataFrame, from -4 to 4
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
 
-def chaikin_mf():
+    worker = RayMaster("Binary_Wave", ray.batch, [_high, _low, _close], 0, ti_tvi.binary_wave, fast_window, slow_window, signal_window, ema_window, roc_window, k_window, d_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def chaikin_mf(high, low, close, volume, window=20, prev=None):
     """Chaikin Money Flow.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        window (int): window period
+        prev (pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    first, head = __tail(close, prev, window-1)
+    _high = __type_check(high.iloc[head:]).T
+    _low = __type_check(low.iloc[head:]).T
+    _close = __type_check(close.iloc[head:]).T
+    _volume = __type_check(volume.iloc[head:]).T
 
-def mfi():
+    worker = RayMaster("Chaikin_Money_Flow", ray.batch, [_high, _low, _close, _volume], 0, ti_tvi.chaikin_mf, window)
+    result = worker.run()
+
+    return __append(prev, result[:,first-head:], close, first)
+
+def mfi(high, low, close, volume, window=14, prev=None):
     """Money Flow Index.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        window (int): window period
+        prev (pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    first, head = __tail(close, prev, window)
+    _high = __type_check(high.iloc[head:]).T
+    _low = __type_check(low.iloc[head:]).T
+    _close = __type_check(close.iloc[head:]).T
+    _volume = __type_check(volume.iloc[head:]).T
+
+    worker = RayMaster("Money_Flow_Index", ray.batch, [_high, _low, _close, _volume], 0, ti_tvi.mfi, window)
+    result = worker.run()
+
+    return __append(prev, result[:,first-head:], close, first)
 
-def obv():
+def obv(close, volume, prev=None):
     """On Balance Volume.
+
+    Args:
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        prev (pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        pd.DataFrame, running sum of the volume signed by the close change
     """
-    pass
+    first, head = __tail(close, prev, 1)
+    _close = __type_check(close.iloc[head:]).T
+    _volume = __type_check(volume.iloc[head:]).T
+    _base = np.nan_to_num(__last(prev, close))
+
+    worker = RayMaster("On_Balance_Volume", ray.batch, [_close, _volume, _base], 0, ti_tvi.obv, first-head)
+    result = worker.run()
 
-def pvo():
+    return __append(prev, result[:,first-head:], close, first)
+
+def pvo(volume, fast_window=12, slow_window=26, signal_window=9, prev=None):
     """Percentage Volume Oscillator.
+
+    Args:
+        volume (pd.DataFrame): volume
+        fast_window (int): fast ema window
+        slow_window (int): slow ema window
+        signal_window (int): ema window of the signal line
+        prev (dict of pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        dict of pd.DataFrame, pvo, signal, histogram and the fast and slow volume emas
+
+    Note:
+        fast and slow are the states prev needs to carry the emas on.
     """
-    pass
+    first, head = __tail(volume, prev, max(slow_window, signal_window)-1)
+    _volume = __type_check(volume.iloc[head:]).T
+    _states = [__last(None if prev is None else prev[key], volume) for key in ["fast", "slow", "signal"]]
+    _history = np.full(_volume.shape, np.nan)
+    if prev is not None:
+        _history[:,:first-head] = __type_check(prev["pvo"].iloc[len(prev["pvo"])-(first-head):]).T
 
-def pvt():
+    worker = RayMaster("Percentage_Volume_Oscillator", ray.batch, [_volume, *_states, _history], 0, ti_tvi.pvo, fast_window, slow_window, signal_window, first-head)
+    result = worker.run()
+
+    return {key:__append(None if prev is None else prev[key], result[key][:,first-head:], volume, first) for key in result.keys()}
+
+def pvt(close, volume, prev=None):
     """Price Volume Trend.
+
+    Args:
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        prev (pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        pd.DataFrame, running sum of the volume times the close return
     """
-    pass
+    first, head = __tail(close, prev, 1)
+    _close = __type_check(close.iloc[head:]).T
+    _volume = __type_check(volume.iloc[head:]).T
+    _base = np.nan_to_num(__last(prev, close))
+
+    worker = RayMaster("Price_Volume_Trend", ray.batch, [_close, _volume, _base], 0, ti_tvi.pvt, first-head)
+    result = worker.run()
+
+    return __append(prev, result[:,first-head:], close, first)
 
-def pvr():
+def pvr(close, volume, prev=None):
     """Price Volume Rank.
+
+    Args:
+        close (pd.DataFrame): close price
+        volume (pd.DataFrame): volume
+        prev (pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        pd.DataFrame, 1 to 4, nan for an unchanged price or volume
     """
-    pass
+    first, head = __tail(close, prev, 1)
+    _close = __type_check(close.iloc[head:]).T
+    _volume = __type_check(volume.iloc[head:]).T
+
+    worker = RayMaster("Price_Volume_Rank", ray.batch, [_close, _volume], 0, ti_tvi.pvr)
+    result = worker.run()
 
-def trend_score():
+    return __append(prev, result[:,first-head:], close, first)
+
+def trend_score(close, first_lag=11, last_lag=20, prev=None):
     """Trend Score.
+
+    Args:
+        close (pd.DataFrame): close price
+        first_lag (int): most recent close compared
+        last_lag (int): oldest close compared
+        prev (pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        pd.DataFrame, +1 for every close from first_lag to last_lag days ago below today's, -1 above
     """
-    pass
+    first, head = __tail(close, prev, last_lag)
+    _close = __type_check(close.iloc[head:]).T
+
+    worker = RayMaster("Trend_Score", ray.batch, [_close], 0, ti_tvi.trend_score, first_lag, last_lag)
+    result = worker.run()
 
-def williams_ad():
+    return __append(prev, result[:,first-head:], close, first)
+
+def williams_ad(high, low, close, prev=None):
     """Williams Accumulation Distribution.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        prev (pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    first, head = __tail(close, prev, 1)
+    _high = __type_check(high.iloc[head:]).T
+    _low = __type_check(low.iloc[head:]).T
+    _close = __type_check(close.iloc[head:]).T
+    _base = np.nan_to_num(__last(prev, close))
 
-def volume_oscillator():
+    worker = RayMaster("Williams_AD", ray.batch, [_high, _low, _close, _base], 0, ti_tvi.williams_ad, first-head)
+    result = worker.run()
+
+    return __append(prev, result[:,first-head:], close, first)
+
+def volume_oscillator(volume, fast_window=5, slow_window=10, prev=None):
     """Volume Oscillator.
+
+    Args:
+        volume (pd.DataFrame): volume
+        fast_window (int): fast moving average window
+        slow_window (int): slow moving average window
+        prev (pd.DataFrame): earlier result to append the new days to
+
+    Returns:
+        pd.DataFrame, 100 * (fast - slow) / slow
     """
-    pass
+    first, head = __tail(volume, prev, max(fast_window, slow_window)-1)
+    _volume = __type_check(volume.iloc[head:]).T
+
+    worker = RayMaster("Volume_Oscillator", ray.batch, [_volume], 0, ti_tvi.volume_oscillator, fast_window, slow_window)
+    result = worker.run()
+
+    return __append(prev, result[:,first-head:], volume, first)
 
 ### Additionals ###
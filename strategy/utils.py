@@ -1,3 +1,4 @@
+import numpy as np
 
 def __type_check(data):
     """Data type checker.
@@ -17,3 +18,65 @@ def __type_check(data):
         return data.values
     else:
         raise ValueError("arg 'data' must be '2d-np.array' or 'pd.DataFrame'")
+
+# Regressors whose variance within a problem is below this fraction of their sum of squares, or
+# whose correlation matrix has a condition number above its inverse, make the problem singular
+OLS_TOLERANCE = 1e-9
+
+def _solve_each(a, b):
+    """Solve the stacked systems a x = b one at a time, nan where a system is singular."""
+    x = np.full(b.shape, np.nan)
+    for index in np.ndindex(b.shape[:-1]):
+        try:
+            x[index] = np.linalg.solve(a[index], b[index])
+        except np.linalg.LinAlgError:
+            pass
+    return x
+
+def ols_solve(sxx, sxy, syy, count, scale):
+    """Solve stacked OLS problems from their centered cross-products.
+
+    Args:
+        sxx (np.array): (..., k, k) X'X of the regressors centered with the mean of each problem
+        sxy (np.array): (..., k) X'y, centered alike
+        syy (np.array): (...) y'y, centered alike
+        count (np.array): (...) number of observations of each problem
+        scale (np.array): (..., k) sum of squares of the regressors, the variance is compared against
+
+    Returns:
+        slopes (..., k), r2 (...)
+
+    Note:
+        Problems with fewer than k+2 observations are NaN. So are problems with a regressor that is
+        constant within the problem or regressors that are collinear, found from the condition number
+        of their correlation matrix, instead of one of their many solutions. Every problem only reads
+        its own cross-products.
+    """
+    k = sxx.shape[-1]
+    variance = np.diagonal(sxx, axis1=-2, axis2=-1)
+    isValid = (count >= k+2) & np.all(variance > OLS_TOLERANCE*scale, axis=-1)
+
+    # Solve on the correlation matrix, regressors on different scales do not affect the condition
+    inverse_std = 1 / np.sqrt(np.where(isValid[...,None], variance, 1))
+    corr = sxx * inverse_std[...,:,None] * inverse_std[...,None,:]
+    corr = np.where(isValid[...,None,None], corr, np.eye(k))
+    if k > 1:
+        eigenvalues = np.linalg.eigvalsh(corr)
+        isValid = isValid & (eigenvalues[...,0] > OLS_TOLERANCE*eigenvalues[...,-1])
+        corr = np.where(isValid[...,None,None], corr, np.eye(k))
+    scaled_sxy = np.where(isValid[...,None], sxy*inverse_std, 0)
+
+    try:
+        slopes = np.linalg.solve(corr, scaled_sxy[...,None])[...,0]
+    except np.linalg.LinAlgError:
+        slopes = _solve_each(corr, scaled_sxy)
+    slopes = slopes * inverse_std
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(syy > 0, 1 - (syy - np.einsum("...i,...i->...", slopes, sxy)) / syy, np.nan)
+
+    isValid = isValid & np.all(np.isfinite(slopes), axis=-1)
+    slopes[~isValid] = np.nan
+    r2 = np.where(isValid, r2, np.nan)
+
+    return slopes, r2
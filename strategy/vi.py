@@ -1,34 +1,231 @@
+import pandas as pd
+
+from . utils import __type_check
+from . raymaster import RayMaster, RayManager
+
+from . core import ti_vi
+
+### Ray Initialization ###
+ray = RayManager()
+ray._initialize(isWhere='cs')
+
 
 ### Volatility Indicators ###
 
-def atr():
+def atr(high, low, close, window=14):
     """Average True Range.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): Wilder smoothing window
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Average_True_Range", ray.batch, [_high, _low, _close], 0, ti_vi.atr, window)
+    result = worker.run()
 
-def bollinger_width():
+    return pd.DataFrame(result["atr"].T, index=close.index, columns=close.columns)
+
+def bollinger_width(data, window=20, sigma=2):
     """Bollinger Band Width.
+
+    Args:
+        data (pd.DataFrame): price
+        window (int): window period
+        sigma (float): band width in standard deviations
+
+    Returns:
+        pd.DataFrame, 100 * (upper - lower) / middle
     """
-    pass
+    _data = __type_check(data).T
+
+    worker = RayMaster("Bollinger_Band_Width", ray.batch, [_data], 0, ti_vi.bollinger_width, window, sigma)
+    result = worker.run()
 
-def chaikin_volatility():
+    return pd.DataFrame(result.T, index=data.index, columns=data.columns)
+
+def chaikin_volatility(high, low, window=10, change_window=10):
     """Chaikin Volatility.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        window (int): ema window of high - low
+        change_window (int): days of the percent change
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _high = __type_check(high).T
+    _low = __type_check(low).T
 
-def rvi():
+    worker = RayMaster("Chaikin_Volatility", ray.batch, [_high, _low], 0, ti_vi.chaikin_volatility, window, change_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=high.index, columns=high.columns)
+
+def rvi(close, window=14, std_window=10):
     """Relative Volatility Index.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): Wilder smoothing window
+        std_window (int): standard deviation window
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
 
-def inertia():
+    worker = RayMaster("Relative_Volatility_Index", ray.batch, [_close], 0, ti_vi.rvi, window, std_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
+
+def inertia(close, window=20, rvi_window=14, std_window=10):
     """Inertia.
+
+    Args:
+        close (pd.DataFrame): close price
+        window (int): linear regression window of the rvi
+        rvi_window (int): Wilder smoothing window of the rvi
+        std_window (int): standard deviation window of the rvi
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    _close = __type_check(close).T
+
+    worker = RayMaster("Inertia", ray.batch, [_close], 0, ti_vi.inertia, window, rvi_window, std_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=close.index, columns=close.columns)
 
 ### Additionals ###
 
-def rvi_revised():
+def rvi_revised(high, low, window=14, std_window=10):
     """Relative Volatility Index - Revised Version.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        window (int): Wilder smoothing window
+        std_window (int): standard deviation window
+
+    Returns:
+        pd.DataFrame, mean of the rvi of high and of low
+    """
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+
+    worker = RayMaster("Relative_Volatility_Index_Revised", ray.batch, [_high, _low], 0, ti_vi.rvi_revised, window, std_window)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=high.index, columns=high.columns)
+
+def natr(high, low, close, window=14):
+    """Normalized Average True Range.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): Wilder smoothing window
+
+    Returns:
+        pd.DataFrame, 100 * atr / close
+    """
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Normalized_Average_True_Range", ray.batch, [_high, _low, _close], 0, ti_vi.atr, window)
+    result = worker.run()
+
+    return pd.DataFrame(result["natr"].T, index=close.index, columns=close.columns)
+
+def range_volatility(open, high, low, close, window=20, trading_days=252):
+    """Range Based Volatility Estimators.
+
+    Args:
+        open (pd.DataFrame): open price
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): window period
+        trading_days (int): days per year of the annualization, 1 for daily volatility
+
+    Returns:
+        dict of pd.DataFrame, parkinson, garman_klass, rogers_satchell and yang_zhang
+    """
+    _open = __type_check(open).T
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+    _close = __type_check(close).T
+
+    worker = RayMaster("Range_Volatility", ray.batch, [_open, _high, _low, _close], 0, ti_vi.range_volatility, window, trading_days)
+    result = worker.run()
+
+    for key in list(result.keys()):
+        result[key] = pd.DataFrame(result[key].T, index=close.index, columns=close.columns)
+
+    return result
+
+def parkinson(high, low, window=20, trading_days=252):
+    """Parkinson Volatility.
+
+    Args:
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        window (int): window period
+        trading_days (int): days per year of the annualization, 1 for daily volatility
+
+    Returns:
+        pd.DataFrame
+    """
+    _high = __type_check(high).T
+    _low = __type_check(low).T
+
+    worker = RayMaster("Parkinson_Volatility", ray.batch, [_high, _low], 0, ti_vi.parkinson, window, trading_days)
+    result = worker.run()
+
+    return pd.DataFrame(result.T, index=high.index, columns=high.columns)
+
+def garman_klass(open, high, low, close, window=20, trading_days=252):
+    """Garman-Klass Volatility.
+
+    Args:
+        open (pd.DataFrame): open price
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): window period
+        trading_days (int): days per year of the annualization, 1 for daily volatility
+
+    Returns:
+        pd.DataFrame
+    """
+    return range_volatility(open, high, low, close, window, trading_days)["garman_klass"]
+
+def yang_zhang(open, high, low, close, window=20, trading_days=252):
+    """Yang-Zhang Volatility.
+
+    Args:
+        open (pd.DataFrame): open price
+        high (pd.DataFrame): high price
+        low (pd.DataFrame): low price
+        close (pd.DataFrame): close price
+        window (int): window period
+        trading_days (int): days per year of the annualization, 1 for daily volatility
+
+    Returns:
+        pd.DataFrame
     """
-    pass
+    return range_volatility(open, high, low, close, window, trading_days)["yang_zhang"]
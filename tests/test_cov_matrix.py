@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import ts
+
+@pytest.fixture
+def jump():
+    """Three series jumping from about 100 to about 1e7 at row 200, with a gap and a late start."""
+    rng = np.random.default_rng(0)
+    arr = 100 + rng.normal(size=(300, 3))
+    arr[200:] += 1e7
+    arr[120:125, 1] = np.nan
+    arr[:30, 2] = np.nan
+    return pd.DataFrame(arr)
+
+def _window_cov(data, lookback):
+    """Two-pass pairwise covariance of every trailing window, as a (rows, columns, columns) array.
+
+    Note:
+        pd.DataFrame.rolling().cov() keeps running sums around zero and loses digits on 1e7 levels,
+        pd.DataFrame.cov() centers each window first.
+    """
+    n = data.shape[1]
+    result = np.full((data.shape[0], n, n), np.nan)
+    for i in range(lookback-1, data.shape[0]):
+        result[i] = data.iloc[i-lookback+1:i+1].cov(min_periods=2).values
+    return result
+
+@pytest.mark.parametrize("lookback", [20, 45])
+def test_cov_matrix_does_not_read_the_future(jump, lookback):
+    full = ts.cov_matrix(jump, lookback)
+    for end in [150, 201, 260]:
+        np.testing.assert_array_equal(ts.cov_matrix(jump.iloc[:end], lookback), full[:end])
+
+@pytest.mark.parametrize("lookback", [20, 45])
+def test_cov_matrix_matches_pandas_across_a_level_shift(jump, lookback):
+    result = ts.cov_matrix(jump, lookback)
+    expected = _window_cov(jump, lookback)
+    # windows straddling the jump hold a 1e14 variance, digits below that are lost
+    rows = np.r_[:200, 200+lookback:300]
+    np.testing.assert_allclose(result[rows], expected[rows], rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(result[200:200+lookback], expected[200:200+lookback], rtol=1e-6)
+
+def test_corr_matrix_after_a_level_shift(jump):
+    lookback = 20
+    result = ts.corr_matrix(jump, lookback)
+    expected = jump.iloc[-lookback:].corr().values
+    np.testing.assert_allclose(result[-1], expected, rtol=1e-8, atol=1e-8)
+
+def test_ew_cov_matrix_does_not_read_the_future(jump):
+    full = ts.cov_matrix(jump, halflife=10)
+    np.testing.assert_array_equal(ts.cov_matrix(jump.iloc[:150], halflife=10), full[:150])
+    expected = jump.iloc[:150].ewm(halflife=10).cov().values.reshape(-1, 3, 3)
+    np.testing.assert_allclose(full[1:150], expected[1:150], rtol=1e-8, atol=1e-10)
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import cs
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(40, 12)).round(1), columns=["a{k}".format(k=k) for k in range(12)])
+    data.iloc[3, [0, 4]] = np.nan
+    data.iloc[7] = np.nan
+    # group 0 holds a0-a4, group 1 a5-a8, group 7 only a9, a10 and a11 have no group
+    labels = pd.Series([0, 0, 0, 0, 0, 1, 1, 1, 1, 7, np.nan, np.nan], index=data.columns)
+    return data, labels
+
+def _by_row(data, groups, transform):
+    """Apply transform to every (row, group) with pandas, nan for assets without a group or a value."""
+    rows = []
+    for i in range(data.shape[0]):
+        row = data.iloc[i]
+        label = groups.iloc[i] if isinstance(groups, pd.DataFrame) else groups
+        isValid = row.notna() & label.notna()
+        out = pd.Series(np.nan, index=data.columns)
+        if isValid.any():
+            out[isValid] = row[isValid].groupby(label[isValid]).transform(transform)
+        rows.append(out)
+    return pd.DataFrame(rows, index=data.index)
+
+def _std(x):
+    return x.std(ddof=0)
+
+def test_group_demean(panel):
+    data, labels = panel
+    pd.testing.assert_frame_equal(cs.group_demean(data, labels), _by_row(data, labels, lambda x: x - x.mean()))
+
+def test_group_zscore(panel):
+    data, labels = panel
+    expected = _by_row(data, labels, lambda x: (x - x.mean()) / _std(x))
+    result = cs.group_zscore(data, labels)
+    # a single member group has no spread
+    assert result["a9"].isna().all()
+    pd.testing.assert_frame_equal(result.replace([np.inf, -np.inf], np.nan), expected.replace([np.inf, -np.inf], np.nan))
+
+def test_group_winsorize(panel):
+    data, labels = panel
+    expected = _by_row(data, labels, lambda x: x.clip(x.mean() - 1*_std(x), x.mean() + 1*_std(x)))
+    pd.testing.assert_frame_equal(cs.group_winsorize(data, labels, sigma=1), expected)
+
+def test_group_rank(panel):
+    data, labels = panel
+    expected = _by_row(data, labels, lambda x: (x.rank(method="first") - 1) / (x.count() - 1))
+    result = cs.group_rank(data, labels)
+    assert result["a9"].isna().all()
+    pd.testing.assert_frame_equal(result, expected)
+
+@pytest.mark.parametrize("n", [1, 2, 5])
+def test_group_top(panel, n):
+    data, labels = panel
+    expected = _by_row(data, labels, lambda x: (x >= x.nlargest(n).min()).astype(np.float64)).fillna(0.0)
+    expected[data.isna().all(axis=1)] = np.nan
+    result = cs.group_top(data, labels, n)
+    # the only member of a group is always picked
+    assert (result["a9"].dropna() == 1).all()
+    pd.testing.assert_frame_equal(result, expected)
+
+def test_group_neutralize_without_exposures_is_demean(panel):
+    data, labels = panel
+    pd.testing.assert_frame_equal(cs.group_neutralize(data, labels), cs.group_demean(data, labels))
+
+def test_group_neutralize_with_exposures(panel):
+    data, labels = panel
+    size = pd.DataFrame(np.random.default_rng(1).normal(size=data.shape), index=data.index, columns=data.columns)
+    result = cs.group_neutralize(data, labels, size)
+
+    for i in range(data.shape[0]):
+        isValid = data.iloc[i].notna() & labels.notna() & size.iloc[i].notna()
+        if not isValid.any():
+            assert result.iloc[i].isna().all()
+            continue
+        dummies = pd.get_dummies(labels[isValid]).values.astype(np.float64)
+        design = np.column_stack([dummies, size.iloc[i][isValid].values])
+        y = data.iloc[i][isValid].values
+        beta = np.linalg.lstsq(design, y, rcond=None)[0]
+        np.testing.assert_allclose(result.iloc[i][isValid].values, y - design @ beta, atol=1e-10)
+        assert result.iloc[i][~isValid].isna().all()
+
+def test_group_labels_per_row(panel):
+    data, labels = panel
+    groups = pd.DataFrame(np.tile(labels.values, (data.shape[0], 1)), index=data.index, columns=data.columns)
+    # assets change group and lose their label on some dates
+    groups.iloc[10:20, 0] = 1
+    groups.iloc[20:30, 5] = np.nan
+    pd.testing.assert_frame_equal(cs.group_demean(data, groups), _by_row(data, groups, lambda x: x - x.mean()))
+    pd.testing.assert_frame_equal(cs.group_rank(data, groups), _by_row(data, groups, lambda x: (x.rank(method="first") - 1) / (x.count() - 1)))
+
+def test_group_shape_check(panel):
+    data, labels = panel
+    with pytest.raises(ValueError):
+        cs.group_demean(data, pd.DataFrame(np.zeros((3, 12))))
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import cs
+
+N = 3
+
+@pytest.fixture
+def panel():
+    """Small integers so rows hold ties, with nan, an empty row, rows with fewer than N values and a constant row."""
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.integers(0, 5, size=(40, 8)).astype(np.float64), columns=list("abcdefgh"))
+    data = data.mask(rng.uniform(size=data.shape) < 0.2)
+    data.iloc[3] = np.nan
+    data.iloc[4] = np.nan
+    data.iloc[4, [1, 6]] = [2.0, 1.0]
+    data.iloc[5] = np.nan
+    data.iloc[5, 2] = 7.0
+    data.iloc[6] = 1.0
+    return data
+
+def _picked(row, n, ties, isLargest):
+    """Labels of the n largest (smallest) values of a row, every tie of the n-th value or the leftmost ones."""
+    values = row.dropna()
+    if ties == "all":
+        nth = values.nlargest(n).min() if isLargest else values.nsmallest(n).max()
+        return values.index[values >= nth] if isLargest else values.index[values <= nth]
+    order = values.rank(method="first", ascending=not isLargest)
+    return values.index[order <= n]
+
+def _screen(data, n, ties, isLargest, satify, otherwise):
+    result = pd.DataFrame(float(otherwise), index=data.index, columns=data.columns)
+    for i, row in data.iterrows():
+        result.loc[i, _picked(row, n, ties, isLargest)] = float(satify)
+    result[data.isna().all(axis=1)] = np.nan
+    return result
+
+def _sparse(data, n, ties, isLargest):
+    """Picked labels of every row, by value and then column order."""
+    return pd.Series([list(row[_picked(row, n, ties, isLargest)].sort_values(ascending=not isLargest, kind="stable").index) for _, row in data.iterrows()], index=data.index)
+
+@pytest.mark.parametrize("ties", ["all", "first"])
+def test_top_and_bottom_match_pandas(panel, ties):
+    pd.testing.assert_frame_equal(cs.top(panel, N, ties=ties), _screen(panel, N, ties, True, 1, 0))
+    pd.testing.assert_frame_equal(cs.bottom(panel, N, ties=ties), _screen(panel, N, ties, False, 1, 0))
+    pd.testing.assert_frame_equal(cs.top(panel, N, 2, -1, ties=ties), _screen(panel, N, ties, True, 2, -1))
+
+@pytest.mark.parametrize("ties", ["all", "first"])
+def test_top_bottom_matches_pandas(panel, ties):
+    top = _screen(panel, N, ties, True, 1, 0)
+    bottom = _screen(panel, N, ties, False, 1, 0)
+    # top wins an asset picked on both sides
+    expected = top.where(top == 1, -bottom)
+    pd.testing.assert_frame_equal(cs.top_bottom(panel, N, ties=ties), expected)
+
+    # rows with fewer than 2n values overlap
+    overlap = panel.notna().sum(axis=1).between(1, 2*N-1)
+    assert overlap.any() and (expected[overlap] == 1).any(axis=1).all()
+
+@pytest.mark.parametrize("ties", ["all", "first"])
+def test_sparse_lists_match_pandas(panel, ties):
+    pd.testing.assert_series_equal(cs.top(panel, N, ties=ties, sparse=True), _sparse(panel, N, ties, True))
+    pd.testing.assert_series_equal(cs.bottom(panel, N, ties=ties, sparse=True), _sparse(panel, N, ties, False))
+
+    result = cs.top_bottom(panel, N, ties=ties, sparse=True)
+    top = _sparse(panel, N, ties, True)
+    bottom = pd.Series([[label for label in labels if label not in picked] for labels, picked in zip(_sparse(panel, N, ties, False), top)], index=panel.index)
+    pd.testing.assert_series_equal(result["top"], top, check_names=False)
+    pd.testing.assert_series_equal(result["bottom"], bottom, check_names=False)
+
+def test_ties_all_can_pick_more_than_n(panel):
+    assert (cs.top(panel, N, ties="all").sum(axis=1) > N).any()
+    assert (cs.top(panel, N, ties="first").sum(axis=1) <= N).all()
+    assert cs.top(panel, N, ties="all").iloc[6].sum() == panel.shape[1]
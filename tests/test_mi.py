@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import mi
+
+@pytest.fixture(scope="module")
+def bars():
+    """Daily bars with a late listing, a gap of a few days and scattered missing bars, asset 0 is complete."""
+    rng = np.random.default_rng(0)
+    number_of_days, number_of_assets = 500, 5
+    index = pd.date_range("2020-01-01", periods=number_of_days)
+    close = pd.DataFrame(100*np.exp(np.cumsum(rng.normal(0, 0.02, (number_of_days, number_of_assets)), axis=0)), index=index)
+    high = close*(1 + rng.uniform(0, 0.02, close.shape))
+    low = close*(1 - rng.uniform(0, 0.02, close.shape))
+
+    isMissing = np.zeros(close.shape, dtype=bool)
+    isMissing[:50, 1] = True
+    isMissing[200:205, 2] = True
+    isMissing[rng.uniform(size=close.shape) < 0.02] = True
+    isMissing[:, 0] = False
+    return {key: frame.mask(isMissing) for key, frame in {"high":high, "low":low, "close":close}.items()}
+
+def _wilder(arr, window):
+    """Wilder smoothing seeded with the mean of the first window, a missing day is nan and holds the average."""
+    result = np.full(arr.shape[0], np.nan)
+    state = np.nan
+    for i in range(arr.shape[0]):
+        if np.isnan(state):
+            if i == window - 1 and not np.isnan(arr[:window]).all():
+                state = np.nanmean(arr[:window])
+                result[i] = state
+            elif i > window - 1 and not np.isnan(arr[i]):
+                state = arr[i]
+                result[i] = state
+            continue
+        if not np.isnan(arr[i]):
+            state = state + (arr[i] - state) / window
+            result[i] = state
+    return result
+
+def _changes(close, momentum=1):
+    """Gains and losses over momentum days, from the first row holding a change."""
+    change = (close - close.shift(momentum)).iloc[momentum:]
+    return change.clip(lower=0), (-change).clip(lower=0)
+
+def _smooth(frame, window, rows):
+    """Wilder smoothing of every column, reindexed to rows."""
+    return frame.apply(lambda column: pd.Series(_wilder(column.values, window), index=frame.index)).reindex(rows)
+
+def _rolling_sum(frame, window, rows):
+    """Sum of the values in the trailing window, the first window-1 rows and empty windows are nan."""
+    result = frame.rolling(window, min_periods=1).sum().where(frame.notna().rolling(window, min_periods=1).sum() > 0)
+    result.iloc[:window-1] = np.nan
+    return result.reindex(rows)
+
+def _strength(gain, loss):
+    return (100*gain / (gain + loss)).where(gain + loss > 0)
+
+def _range_position(bars, window):
+    highest = bars["high"].rolling(window, min_periods=1).max()
+    lowest = bars["low"].rolling(window, min_periods=1).min()
+    highest.iloc[:window-1], lowest.iloc[:window-1] = np.nan, np.nan
+    return ((bars["close"] - lowest) / (highest - lowest)).where(highest > lowest)
+
+def _rolling_mean(frame, window):
+    result = frame.rolling(window, min_periods=1).mean()
+    result.iloc[:window-1] = np.nan
+    return result
+
+@pytest.mark.parametrize("window", [5, 14])
+def test_rsi_matches_wilder_reference(bars, window):
+    close = bars["close"]
+    gain, loss = _changes(close)
+    expected = _strength(_smooth(gain, window, close.index), _smooth(loss, window, close.index))
+    result = mi.rsi(close, window)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-10, atol=1e-10)
+
+    # TA-Lib: the first value is on row window, the average of the first window changes
+    assert result.iloc[:window, 0].isna().all()
+    first_gain, first_loss = gain[0].iloc[:window].mean(), loss[0].iloc[:window].mean()
+    assert result.iloc[window, 0] == pytest.approx(100*first_gain / (first_gain + first_loss), rel=1e-12)
+
+def test_rsi_converges_to_pandas_ewm_after_warmup(bars):
+    window = 14
+    close = bars["close"][[0]]
+    gain, loss = _changes(close)
+    wilder = lambda frame: frame.ewm(alpha=1/window, adjust=False).mean()
+    expected = 100*wilder(gain) / (wilder(gain) + wilder(loss))
+    np.testing.assert_allclose(mi.rsi(close, window).values[300:], expected.values[299:], rtol=1e-8)
+
+@pytest.mark.parametrize("window", [9, 14])
+def test_cmo_matches_pandas(bars, window):
+    close = bars["close"]
+    gain, loss = _changes(close)
+    gain_sum, loss_sum = _rolling_sum(gain, window, close.index), _rolling_sum(loss, window, close.index)
+    expected = (100*(gain_sum - loss_sum) / (gain_sum + loss_sum)).where(gain_sum + loss_sum > 0)
+    result = mi.cmo(close, window)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-10, atol=1e-10)
+    assert result.iloc[:window, 0].isna().all() and result.iloc[window:, 0].notna().all()
+
+@pytest.mark.parametrize("window, momentum", [(20, 5), (14, 1)])
+def test_rmi_matches_wilder_reference(bars, window, momentum):
+    close = bars["close"]
+    gain, loss = _changes(close, momentum)
+    expected = _strength(_smooth(gain, window, close.index), _smooth(loss, window, close.index))
+    result = mi.rmi(close, window, momentum)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-10, atol=1e-10)
+    assert result.iloc[:momentum+window-1, 0].isna().all()
+
+def test_gain_loss_matches_each_indicator(bars):
+    close = bars["close"]
+    result = mi.gain_loss(close, 14, 20, 5)
+    pd.testing.assert_frame_equal(result["rsi"], mi.rsi(close, 14))
+    pd.testing.assert_frame_equal(result["cmo"], mi.cmo(close, 14))
+    pd.testing.assert_frame_equal(result["rmi"], mi.rmi(close, 20, 5))
+
+@pytest.mark.parametrize("k_window, d_window", [(14, 3), (5, 5)])
+def test_stochastic_matches_pandas(bars, k_window, d_window):
+    k_value = 100*_range_position(bars, k_window)
+    result = mi.stochastic(bars["high"], bars["low"], bars["close"], k_window, d_window)
+    pd.testing.assert_frame_equal(result["k"], k_value, rtol=1e-10, atol=1e-10)
+    pd.testing.assert_frame_equal(result["d"], _rolling_mean(k_value, d_window), rtol=1e-10, atol=1e-10)
+
+    slow = mi.slow_stochastic(bars["high"], bars["low"], bars["close"], k_window, d_window, 3)
+    pd.testing.assert_frame_equal(slow["k"], _rolling_mean(k_value, d_window), rtol=1e-10, atol=1e-10)
+    pd.testing.assert_frame_equal(slow["d"], _rolling_mean(_rolling_mean(k_value, d_window), 3), rtol=1e-10, atol=1e-10)
+
+@pytest.mark.parametrize("window", [14, 30])
+def test_williams_percent_r_matches_pandas(bars, window):
+    highest = bars["high"].rolling(window, min_periods=1).max()
+    lowest = bars["low"].rolling(window, min_periods=1).min()
+    expected = (-100*(highest - bars["close"]) / (highest - lowest)).where(highest > lowest)
+    expected.iloc[:window-1] = np.nan
+    result = mi.williams_percent_r(bars["high"], bars["low"], bars["close"], window)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-10, atol=1e-10)
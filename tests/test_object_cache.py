@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from strategy import ts
+from strategy.raymaster import ObjectCache, RayManager
+
+def test_key_sees_an_interior_edit():
+    arr = np.random.default_rng(0).normal(size=(1000, 500))
+    key = ObjectCache._key(arr)
+    arr[500, 250] = 1e6
+    assert ObjectCache._key(arr) != key
+
+def test_key_follows_content_not_address():
+    arr = np.random.default_rng(0).normal(size=(300, 200))
+    assert ObjectCache._key(arr.copy()) == ObjectCache._key(arr)
+    assert ObjectCache._key(arr.T) == ObjectCache._key(arr.T)
+    assert ObjectCache._key(arr[::2]) == ObjectCache._key(arr[::2].copy())
+
+def test_cached_panel_edited_in_place():
+    manager = RayManager()
+    manager.set_progress(False)
+    threshold = RayManager.inline_threshold
+    manager.set_inline_threshold(0)
+    try:
+        df = pd.DataFrame(np.random.default_rng(0).normal(size=(1000, 500)))
+        ts.zscore(df, 20)
+        df.iloc[500, 250] = 1e6
+        pd.testing.assert_frame_equal(ts.zscore(df, 20), ts.zscore(df.copy(), 20))
+    finally:
+        manager.set_inline_threshold(threshold)
+        manager.clear_cache()
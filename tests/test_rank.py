@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import rankdata
+
+from strategy import cs, ts
+from strategy.core_cs import rank_block, RANK_METHODS, NA_OPTIONS
+
+@pytest.fixture
+def panel():
+    """Small integers so rows and windows hold ties, with nan, an empty row, a single value row and a constant row."""
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.integers(0, 6, size=(60, 9)).astype(np.float64))
+    data = data.mask(rng.uniform(size=data.shape) < 0.15)
+    data.iloc[5] = np.nan
+    data.iloc[6] = np.nan
+    data.iloc[6, 4] = 3.0
+    data.iloc[7] = 2.0
+    data.iloc[20:32, 3] = np.nan
+    return data
+
+def _pandas_method(method):
+    return "first" if method == "ordinal" else method
+
+def _scaled(ranks):
+    """Ranks over the largest rank of the row, 0 ~ 1."""
+    return (ranks - 1).div(ranks.max(axis=1) - 1, axis=0)
+
+@pytest.mark.parametrize("method", RANK_METHODS)
+@pytest.mark.parametrize("na_option", NA_OPTIONS)
+def test_rank_block_matches_dataframe_rank(panel, method, na_option):
+    expected = panel.rank(axis=1, method=_pandas_method(method), na_option=na_option)
+    np.testing.assert_array_equal(rank_block(panel.values, method, na_option), expected.values)
+
+@pytest.mark.parametrize("method", RANK_METHODS)
+def test_rank_block_matches_rankdata(panel, method):
+    expected = rankdata(panel.values, method=method, axis=1, nan_policy="omit")
+    np.testing.assert_array_equal(rank_block(panel.values, method, "keep"), expected)
+
+@pytest.mark.parametrize("method", RANK_METHODS)
+@pytest.mark.parametrize("na_option", NA_OPTIONS)
+def test_cs_rank_matches_dataframe_rank(panel, method, na_option):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = _scaled(panel.rank(axis=1, method=_pandas_method(method), na_option=na_option))
+    pd.testing.assert_frame_equal(cs.rank(panel, method=method, na_option=na_option), expected)
+
+@pytest.mark.parametrize("method", RANK_METHODS)
+@pytest.mark.parametrize("na_option", NA_OPTIONS)
+def test_ts_rank_matches_dataframe_rank_of_each_window(panel, method, na_option):
+    lookback = 10
+    expected = pd.DataFrame(np.nan, index=panel.index, columns=panel.columns)
+    for i in range(lookback-1, panel.shape[0]):
+        window = panel.iloc[i-lookback+1:i+1].rank(method=_pandas_method(method), na_option=na_option)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected.iloc[i] = ((window.iloc[-1] - 1) / (window.max() - 1)).values
+    pd.testing.assert_frame_equal(ts.rank(panel, lookback, method=method, na_option=na_option), expected, rtol=1e-12, atol=1e-12)
+
+def test_rank_rejects_unknown_options(panel):
+    with pytest.raises(ValueError):
+        cs.rank(panel, method="first")
+    with pytest.raises(ValueError):
+        ts.rank(panel, 10, na_option="drop")
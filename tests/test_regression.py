@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import ts, cs
+
+sm = pytest.importorskip("statsmodels.api")
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2020-01-01", periods=120)
+    xs = [pd.DataFrame(rng.normal(size=(120, 4)), index=index) for _ in range(3)]
+    y = 0.5 + 2*xs[0] - xs[1] + 0.3*xs[2] + pd.DataFrame(rng.normal(scale=0.5, size=(120, 4)), index=index)
+    y.iloc[5:9, 1] = np.nan
+    xs[1].iloc[50, 2] = np.nan
+    y.iloc[:20, 3] = np.nan
+    return y, xs
+
+def _ols(y, xs):
+    """statsmodels fit of y on xs after dropping rows with any nan, None if too few rows."""
+    frame = pd.concat([pd.Series(y)] + [pd.Series(x) for x in xs], axis=1).dropna()
+    if len(frame) < len(xs) + 2:
+        return None
+    return sm.OLS(frame.iloc[:,0].values, sm.add_constant(frame.iloc[:,1:].values, has_constant="add")).fit()
+
+def test_ts_regression_matches_statsmodels(panel):
+    y, xs = panel
+    lookback = 30
+    result = ts.regression(y, xs, lookback, returns="all")
+
+    for asset in y.columns:
+        for i in range(lookback-1, len(y)):
+            window = slice(i-lookback+1, i+1)
+            fit = _ols(y[asset].values[window], [x[asset].values[window] for x in xs])
+            if fit is None:
+                assert np.isnan(result["intercept"][asset].iloc[i])
+                continue
+            assert result["intercept"][asset].iloc[i] == pytest.approx(fit.params[0], rel=1e-8, abs=1e-10)
+            for k in range(len(xs)):
+                assert result["slope"][k][asset].iloc[i] == pytest.approx(fit.params[k+1], rel=1e-8, abs=1e-10)
+            assert result["r2"][asset].iloc[i] == pytest.approx(fit.rsquared, rel=1e-8, abs=1e-10)
+
+def test_cs_regression_matches_statsmodels(panel):
+    y, xs = panel
+    y, xs = y.T.reset_index(drop=True), [x.T.reset_index(drop=True) for x in xs]
+    result = cs.regression(y, xs, returns="all")
+
+    for i in range(len(y)):
+        fit = _ols(y.iloc[i].values, [x.iloc[i].values for x in xs])
+        if fit is None:
+            assert np.isnan(result["intercept"].iloc[i, 0])
+            continue
+        assert result["intercept"].iloc[i, 0] == pytest.approx(fit.params[0], rel=1e-8, abs=1e-10)
+        np.testing.assert_allclose(result["slope"].iloc[i].values, fit.params[1:], rtol=1e-8, atol=1e-10)
+        assert result["r2"].iloc[i, 0] == pytest.approx(fit.rsquared, rel=1e-8, abs=1e-10)
+
+def test_ts_regression_rank_deficient_windows_are_nan(panel):
+    y, xs = panel
+    xs = [xs[0], xs[1], xs[2].copy()]
+    xs[2].iloc[:40] = 1.5
+    result = ts.regression(y, xs, 30, returns="all")
+
+    # windows ending before row 40 see a constant regressor
+    for key in ["intercept", "r2"]:
+        assert result[key].iloc[:40].isna().all().all()
+    for slope in result["slope"]:
+        assert slope.iloc[:40].isna().all().all()
+    # from row 40 on every window has some variation again
+    assert result["slope"][2].iloc[40:, [0, 2]].notna().all().all()
+
+def test_ts_regression_collinear_windows_are_nan(panel):
+    y, xs = panel
+    result = ts.regression(y, [xs[0], 2*xs[0] + 1], 30, returns="all")
+
+    assert result["intercept"].isna().all().all()
+
+def test_ts_regression_does_not_read_the_future(panel):
+    y, xs = panel
+    xs = [xs[0], xs[1], xs[2].copy()]
+    xs[2].iloc[:40] = 1.5
+    xs[0].iloc[70:] *= 1e3
+
+    full = ts.regression(y, xs, 30, returns="all")
+    for rows in [35, 60, 90]:
+        cut = ts.regression(y.iloc[:rows], [x.iloc[:rows] for x in xs], 30, returns="all")
+        for key in ["intercept", "residual", "r2"]:
+            pd.testing.assert_frame_equal(cut[key], full[key].iloc[:rows])
+        for k in range(len(xs)):
+            pd.testing.assert_frame_equal(cut["slope"][k], full["slope"][k].iloc[:rows])
+
+def test_cs_regression_singular_rows_are_nan():
+    rng = np.random.default_rng(1)
+    y = pd.DataFrame(rng.normal(size=(3, 10)))
+    x = pd.DataFrame(rng.normal(size=(3, 10)))
+    x.iloc[1] = 4.0
+    result = cs.regression(y, x, returns="all")
+
+    assert np.isnan(result["slope"].iloc[1, 0])
+    assert np.isnan(result["intercept"].iloc[1, 0])
+    assert result["residual"].iloc[1].isna().all()
+    assert result["slope"].iloc[[0, 2], 0].notna().all()
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import ti
+
+@pytest.fixture(scope="module")
+def bars():
+    """Daily bars with a late listing, a gap of a few days and scattered missing bars, asset 0 is complete."""
+    rng = np.random.default_rng(0)
+    number_of_days, number_of_assets = 500, 5
+    index = pd.date_range("2020-01-01", periods=number_of_days)
+    close = pd.DataFrame(100*np.exp(np.cumsum(rng.normal(0, 0.02, (number_of_days, number_of_assets)), axis=0)), index=index)
+    open = close.shift(1).fillna(close)*np.exp(rng.normal(0, 0.005, close.shape))
+    high = np.maximum(open, close)*(1 + rng.uniform(0, 0.02, close.shape))
+    low = np.minimum(open, close)*(1 - rng.uniform(0, 0.02, close.shape))
+
+    isMissing = np.zeros(close.shape, dtype=bool)
+    isMissing[:50, 1] = True
+    isMissing[200:205, 2] = True
+    isMissing[rng.uniform(size=close.shape) < 0.02] = True
+    isMissing[:, 0] = False
+    return {key: frame.mask(isMissing) for key, frame in {"high":high, "low":low, "close":close}.items()}
+
+def _ew(arr, alpha, window):
+    """Exponential filter seeded with the mean of the first window, a missing day is nan and holds the state."""
+    result = np.full(arr.shape[0], np.nan)
+    state = np.nan
+    for i in range(arr.shape[0]):
+        if np.isnan(state):
+            if i == window - 1 and not np.isnan(arr[:window]).all():
+                state = np.nanmean(arr[:window])
+                result[i] = state
+            elif i > window - 1 and not np.isnan(arr[i]):
+                state = arr[i]
+                result[i] = state
+            continue
+        if not np.isnan(arr[i]):
+            state = state + alpha*(arr[i] - state)
+            result[i] = state
+    return result
+
+def _by_column(frame, func, *args):
+    return frame.apply(lambda column: pd.Series(func(column.values, *args), index=frame.index))
+
+def _rolling(frame, window, func):
+    """func of the values of every trailing window, the first window-1 days and empty windows are nan."""
+    def reduce(values):
+        values = values[~np.isnan(values)]
+        return func(values) if values.shape[0] > 0 else np.nan
+    result = frame.rolling(window, min_periods=1).apply(reduce, raw=True)
+    result.iloc[:window-1] = np.nan
+    return result
+
+def _assert_frame(result, expected, rtol=1e-10):
+    pd.testing.assert_frame_equal(result, expected, rtol=rtol, atol=1e-10)
+
+def test_dmi_adx_adxr_match_wilder_reference(bars):
+    window = 14
+    high, low, close = bars["high"], bars["low"], bars["close"]
+    up = high - high.shift(1)
+    down = low.shift(1) - low
+    isMove = up.notna() & down.notna()
+    plus_dm = up.where((up > down) & (up > 0), 0).where(isMove)
+    minus_dm = down.where((down > up) & (down > 0), 0).where(isMove)
+    previous_close = close.shift(1).fillna(low)
+    true_range = (np.maximum(high, previous_close) - np.minimum(low, previous_close)).where(isMove)
+
+    atr = _by_column(true_range, _ew, 1/window, window)
+    pdi = 100*_by_column(plus_dm, _ew, 1/window, window) / atr
+    mdi = 100*_by_column(minus_dm, _ew, 1/window, window) / atr
+    dx = 100*(pdi - mdi).abs() / (pdi + mdi)
+    adx = _by_column(dx, _ew, 1/window, window)
+
+    lines = ti.dmi(high, low, close, window)
+    _assert_frame(lines["pdi"], pdi)
+    _assert_frame(lines["mdi"], mdi)
+    _assert_frame(ti.dx(high, low, close, window), dx)
+    _assert_frame(ti.adx(high, low, close, window), adx)
+    _assert_frame(ti.adxr(high, low, close, window), (adx + adx.shift(window-1)) / 2)
+
+def test_adx_converges_to_pandas_ewm_after_warmup(bars):
+    window = 14
+    high, low, close = (bars[key][[0]] for key in ["high", "low", "close"])
+    up, down = high.diff(), -low.diff()
+    plus_dm = up.where((up > down) & (up > 0), 0).iloc[1:]
+    minus_dm = down.where((down > up) & (down > 0), 0).iloc[1:]
+    true_range = (np.maximum(high, close.shift(1)) - np.minimum(low, close.shift(1))).iloc[1:]
+    wilder = lambda frame: frame.ewm(alpha=1/window, adjust=False).mean()
+    pdi = 100*wilder(plus_dm) / wilder(true_range)
+    mdi = 100*wilder(minus_dm) / wilder(true_range)
+    adx = wilder(100*(pdi - mdi).abs() / (pdi + mdi))
+
+    warmup = 20*window
+    np.testing.assert_allclose(ti.adx(high, low, close, window).values[warmup:], adx.values[warmup-1:], rtol=1e-6)
+
+def _since_max(values):
+    """Rows since the largest value of the window, the most recent one on ties."""
+    reverse = np.where(np.isnan(values), -np.inf, values)[::-1]
+    return np.argmax(reverse) if np.isfinite(reverse).any() else np.nan
+
+def _since_min(values):
+    """Rows since the smallest value of the window, the most recent one on ties."""
+    reverse = np.where(np.isnan(values), np.inf, values)[::-1]
+    return np.argmin(reverse) if np.isfinite(reverse).any() else np.nan
+
+@pytest.mark.parametrize("window", [10, 25])
+def test_aroon_matches_pandas(bars, window):
+    # days since the extreme counts calendar rows, missing ones included
+    up = 100*(window - bars["high"].rolling(window+1, min_periods=1).apply(_since_max, raw=True)) / window
+    down = 100*(window - bars["low"].rolling(window+1, min_periods=1).apply(_since_min, raw=True)) / window
+    up.iloc[:window], down.iloc[:window] = np.nan, np.nan
+
+    result = ti.aroon(bars["high"], bars["low"], window)
+    _assert_frame(result["up"], up)
+    _assert_frame(result["down"], down)
+    _assert_frame(ti.aroon_oscillator(bars["high"], bars["low"], window), up - down)
+
+@pytest.mark.parametrize("window", [14, 20])
+def test_cci_matches_pandas(bars, window):
+    typical_price = (bars["high"] + bars["low"] + bars["close"]) / 3
+    mean = _rolling(typical_price, window, np.mean)
+    deviation = _rolling(typical_price, window, lambda values: np.abs(values - values.mean()).mean())
+    expected = ((typical_price - mean) / (0.015*deviation)).where(deviation > 0)
+    _assert_frame(ti.cci(bars["high"], bars["low"], bars["close"], window), expected, rtol=1e-9)
+
+def test_macd_matches_ema_reference(bars):
+    close = bars["close"]
+    fast, slow, signal = 12, 26, 9
+    macd = _by_column(close, _ew, 2/(1+fast), fast) - _by_column(close, _ew, 2/(1+slow), slow)
+    signal_line = _by_column(macd, _ew, 2/(1+signal), signal)
+
+    result = ti.macd(close, fast, slow, signal)
+    _assert_frame(result["macd"], macd)
+    _assert_frame(result["signal"], signal_line)
+    _assert_frame(result["histogram"], macd - signal_line)
+
+def test_macd_converges_to_pandas_ewm_after_warmup(bars):
+    close = bars["close"][[0]]
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal_line = macd.ewm(span=9, adjust=False).mean()
+    result = ti.macd(close)
+    np.testing.assert_allclose(result["macd"].values[300:], macd.values[300:], rtol=1e-8, atol=1e-8)
+    np.testing.assert_allclose(result["signal"].values[300:], signal_line.values[300:], rtol=1e-8, atol=1e-8)
+
+@pytest.mark.parametrize("window", [9, 15])
+def test_trix_matches_triple_ema_reference(bars, window):
+    close = bars["close"]
+    alpha = 2/(1+window)
+    triple = _by_column(_by_column(_by_column(close, _ew, alpha, window), _ew, alpha, window), _ew, alpha, window)
+    _assert_frame(ti.trix(close, window), 100*(triple / triple.shift(1) - 1), rtol=1e-9)
+
+    ewm = close[[0]].ewm(span=window, adjust=False).mean().ewm(span=window, adjust=False).mean().ewm(span=window, adjust=False).mean()
+    np.testing.assert_allclose(ti.trix(close[[0]], window).values[300:], 100*(ewm / ewm.shift(1) - 1).values[300:], rtol=1e-6, atol=1e-9)
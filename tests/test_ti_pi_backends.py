@@ -0,0 +1,77 @@
+import os
+import sys
+import subprocess
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import pi
+
+@pytest.fixture(scope="module")
+def bars():
+    """Price panel with late listings, gaps, a flat stretch and an asset without any price."""
+    rng = np.random.default_rng(0)
+    number_of_days, number_of_assets = 300, 8
+    index = pd.date_range("2020-01-01", periods=number_of_days)
+    close = pd.DataFrame(100*np.exp(np.cumsum(rng.normal(0, 0.02, (number_of_days, number_of_assets)), axis=0)), index=index)
+    high = close*(1 + rng.uniform(0, 0.02, close.shape))
+    low = close*(1 - rng.uniform(0, 0.02, close.shape))
+    volume = pd.DataFrame(rng.uniform(1e5, 1e6, close.shape), index=index)
+
+    isMissing = np.zeros(close.shape, dtype=bool)
+    isMissing[:60, 1] = True
+    isMissing[100:104, 2] = True
+    isMissing[rng.uniform(size=close.shape) < 0.03] = True
+    isMissing[:, 7] = True
+    close, high, low, volume = [frame.mask(isMissing) for frame in [close, high, low, volume]]
+    for frame in [close, high, low]:
+        frame.iloc[150:170, 3] = 50.0
+    return {"high":high, "low":low, "close":close, "volume":volume}
+
+CASES = {
+    "ma": lambda b, use_numba: pi.ma(b["close"], 20, use_numba=use_numba),
+    "vama": lambda b, use_numba: pi.vama(b["close"], b["volume"], 20, use_numba=use_numba),
+    "imkkh": lambda b, use_numba: pi.imkkh(b["high"], b["low"], b["close"], use_numba=use_numba),
+    "bollinger": lambda b, use_numba: pi.bollinger(b["close"], 20, 2, use_numba=use_numba),
+    "cftpp": lambda b, use_numba: pi.cftpp(b["high"], b["low"], b["close"], use_numba=use_numba),
+    "dema": lambda b, use_numba: pi.dema(b["close"], 10, use_numba=use_numba),
+    "envelope": lambda b, use_numba: pi.envelope(b["close"], 20, 0.05, use_numba=use_numba),
+    "psar": lambda b, use_numba: pi.psar(b["high"], b["low"], use_numba=use_numba),
+    "psar_fast": lambda b, use_numba: pi.psar(b["high"], b["low"], 0.05, 0.5, use_numba=use_numba),
+    "ema": lambda b, use_numba: pi.ema(b["close"], 10, use_numba=use_numba),
+}
+
+def _frames(result):
+    return result if type(result) == dict else {"result":result}
+
+@pytest.mark.parametrize("name", sorted(CASES.keys()))
+def test_numba_matches_numpy(bars, name):
+    expected = _frames(CASES[name](bars, False))
+    result = _frames(CASES[name](bars, True))
+
+    assert result.keys() == expected.keys()
+    for key in expected.keys():
+        assert result[key].shape == expected[key].shape
+        # same nan mask, values within rounding
+        np.testing.assert_array_equal(result[key].isna().values, expected[key].isna().values, err_msg=key)
+        np.testing.assert_allclose(result[key].values, expected[key].values, rtol=1e-10, atol=1e-10, equal_nan=True, err_msg=key)
+        pd.testing.assert_index_equal(result[key].index, expected[key].index)
+
+@pytest.mark.parametrize("name", sorted(CASES.keys()))
+def test_backend_switch(bars, name, monkeypatch):
+    # use_numba None follows the module switch
+    monkeypatch.setattr(pi, "off_numba", False)
+    on = _frames(CASES[name](bars, None))
+    monkeypatch.setattr(pi, "off_numba", True)
+    off = _frames(CASES[name](bars, None))
+    for key in on.keys():
+        np.testing.assert_allclose(on[key].values, off[key].values, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+def test_numba_backend_is_imported_on_first_use():
+    script = ("import sys; import strategy.pi as pi; isLoaded = 'strategy.core.ti_pi_numba' in sys.modules; "
+              "pi.ma(__import__('pandas').DataFrame([[1.0]]*30), 5, use_numba=True); "
+              "print(isLoaded, 'strategy.core.ti_pi_numba' in sys.modules)")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True).stdout.split()
+    assert output == ["False", "True"]
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+import numba
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import ts
+
+LOOKBACK = 10
+WEIGHTS = OrderedDict(first=1.0, last=2.0)
+
+@pytest.fixture
+def panel():
+    """Random panel with an all-nan stretch longer than the lookback and scattered nan."""
+    rng = np.random.default_rng(0)
+    arr = rng.normal(size=(80, 4))
+    arr[20:40, 1] = np.nan
+    arr[:15, 3] = np.nan
+    arr[rng.uniform(size=arr.shape) < 0.05] = np.nan
+    return pd.DataFrame(arr)
+
+def _spread(x):
+    return np.nanmax(x) - np.nanmin(x)
+
+def _try_except(x):
+    try:
+        return np.nanmax(x) - np.nanmin(x)
+    except ValueError:
+        return np.nan
+
+def _generator(x):
+    return sum(v for v in x if v == v) / max(sum(1 for v in x if v == v), 1)
+
+def _ordered_dict(x):
+    return WEIGHTS["first"]*x[0] + WEIGHTS["last"]*x[-1]
+
+def _reference(data, func):
+    """pandas rolling apply, windows holding only nan are nan."""
+    result = data.rolling(LOOKBACK, min_periods=1).apply(func, raw=True)
+    result = result.where(~_empty(data))
+    result.iloc[:LOOKBACK-1] = np.nan
+    return result
+
+def _empty(data):
+    """Whether the window ending on each row holds only nan."""
+    return data.notna().rolling(LOOKBACK, min_periods=1).sum() == 0
+
+@pytest.mark.filterwarnings("ignore:All-NaN slice")
+def test_njit_matches_jitted_on_the_fly(panel):
+    njitted = ts.apply(panel, LOOKBACK, numba.njit(_spread))
+    on_the_fly = ts.apply(panel, LOOKBACK, _spread, engine="numba")
+    pd.testing.assert_frame_equal(njitted, on_the_fly)
+    pd.testing.assert_frame_equal(njitted, _reference(panel, _spread))
+
+@pytest.mark.filterwarnings("ignore:All-NaN slice")
+@pytest.mark.parametrize("func", [_try_except, _generator, _ordered_dict])
+def test_uncompilable_functions_fall_back(panel, func):
+    result = ts.apply(panel, LOOKBACK, func, engine="numba")
+    pd.testing.assert_frame_equal(result, _reference(panel, func))
+
+@pytest.mark.filterwarnings("ignore:All-NaN slice")
+@pytest.mark.parametrize("func", [_spread, _try_except])
+def test_all_nan_windows_are_nan(panel, func):
+    result = ts.apply(panel, LOOKBACK, func, engine="numba")
+    assert result.iloc[20+LOOKBACK-1:40, 1].isna().all()
+    assert result.iloc[:15, 3].isna().all()
+    assert result.iloc[40:, 1].notna().any()
+
+@pytest.mark.parametrize("func", [lambda y, x: np.nansum(y*x), lambda y, x: sum(a*b for a, b in zip(y, x) if a == a and b == b)])
+def test_dual_apply_skips_windows_empty_in_either_input(panel, func):
+    x = panel.shift(5, axis=1).fillna(1.0)
+    x.iloc[50:65, 2] = np.nan
+    result = ts.dual_apply(panel, x, LOOKBACK, func, engine="numba")
+    assert result.iloc[20+LOOKBACK-1:40, 1].isna().all()
+    assert result.iloc[50+LOOKBACK-1:65, 2].isna().all()
+    expected = ts.dual_apply(panel, x, LOOKBACK, func, engine="python")
+    pd.testing.assert_frame_equal(result, expected.mask(_empty(panel) | _empty(x)))
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import ts
+
+@pytest.fixture
+def panel():
+    """Random walks with a late listing, a gap and scattered nan, and a regressor column."""
+    rng = np.random.default_rng(0)
+    y = pd.DataFrame(np.cumsum(rng.normal(size=(150, 4)), axis=0))
+    y.iloc[:30, 1] = np.nan
+    y.iloc[60:70, 2] = np.nan
+    y = y.mask(rng.uniform(size=y.shape) < 0.05)
+    x = pd.DataFrame(np.cumsum(rng.normal(size=(150, 1)), axis=0)).mask(rng.uniform(size=(150, 1)) < 0.05)
+    return y, x
+
+@pytest.fixture(params=[True, False], ids=["numpy", "numba"])
+def backend(request):
+    off_numba = ts.off_numba
+    ts.off_numba = request.param
+    yield
+    ts.off_numba = off_numba
+
+WEIGHTS = [{"halflife": 10}, {"span": 5}, {"alpha": 0.3}]
+
+def _assert_frame(result, expected):
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-9, atol=1e-12)
+
+def _by_column(y, x, function):
+    """function(y[col], x[col or 0]) of every column."""
+    return pd.concat([function(y[col], x[col] if x.shape[1] > 1 else x[0]) for col in y.columns], axis=1).set_axis(y.columns, axis=1)
+
+@pytest.mark.parametrize("weights", WEIGHTS)
+@pytest.mark.parametrize("min_periods", [0, 5])
+def test_ew_mean_std_match_pandas(panel, backend, weights, min_periods):
+    y, _ = panel
+    ewm = y.ewm(**weights, min_periods=min_periods)
+    _assert_frame(ts.ew_mean(y, **weights, min_periods=min_periods), ewm.mean())
+    _assert_frame(ts.ew_std(y, **weights, min_periods=min_periods), ewm.std())
+    _assert_frame(ts.ew_std(y, **weights, min_periods=min_periods, bias=True), ewm.std(bias=True))
+
+@pytest.mark.parametrize("weights", WEIGHTS)
+def test_ew_zscore_matches_pandas(panel, backend, weights):
+    y, _ = panel
+    ewm = y.ewm(**weights, min_periods=3)
+    _assert_frame(ts.ew_zscore(y, **weights, min_periods=3), (y - ewm.mean()) / ewm.std())
+
+@pytest.mark.parametrize("weights", WEIGHTS)
+@pytest.mark.parametrize("isSameColumns", [True, False])
+def test_ew_cov_corr_match_pandas(panel, backend, weights, isSameColumns):
+    y, x = panel
+    if isSameColumns:
+        x = pd.concat([x[0].shift(k) for k in range(y.shape[1])], axis=1).set_axis(y.columns, axis=1)
+    cov = _by_column(y, x, lambda a, b: a.ewm(**weights, min_periods=3).cov(b))
+    biased = _by_column(y, x, lambda a, b: a.ewm(**weights, min_periods=3).cov(b, bias=True))
+    corr = _by_column(y, x, lambda a, b: a.ewm(**weights, min_periods=3).corr(b))
+    _assert_frame(ts.ew_cov(y, x, **weights, min_periods=3), cov)
+    _assert_frame(ts.ew_cov(y, x, **weights, min_periods=3, bias=True), biased)
+    _assert_frame(ts.ew_corr(y, x, **weights, min_periods=3), corr)
+
+def test_ew_weights_must_be_given_once(panel):
+    y, _ = panel
+    with pytest.raises(ValueError):
+        ts.ew_mean(y)
+    with pytest.raises(ValueError):
+        ts.ew_mean(y, halflife=10, span=5)
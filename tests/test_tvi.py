@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import tvi
+
+@pytest.fixture(scope="module")
+def bars():
+    """Daily bars with a late listing, a gap of a few days and scattered missing bars."""
+    rng = np.random.default_rng(0)
+    number_of_days, number_of_assets = 200, 4
+    index = pd.date_range("2020-01-01", periods=number_of_days)
+    close = pd.DataFrame(100*np.exp(np.cumsum(rng.normal(0, 0.02, (number_of_days, number_of_assets)), axis=0)), index=index)
+    high = close*(1 + rng.uniform(0, 0.02, close.shape))
+    low = close*(1 - rng.uniform(0, 0.02, close.shape))
+    volume = pd.DataFrame(rng.integers(1000, 5000, close.shape).astype(np.float64), index=index)
+
+    isMissing = np.zeros(close.shape, dtype=bool)
+    isMissing[:60, 1] = True
+    isMissing[100:106, 2] = True
+    isMissing[rng.uniform(size=close.shape) < 0.03] = True
+    isMissing[:, 0] = False
+    return {key: frame.mask(isMissing) for key, frame in {"high":high, "low":low, "close":close, "volume":volume}.items()}
+
+INDICATORS = [
+    (tvi.chaikin_adl, ["high", "low", "close", "volume"], {}),
+    (tvi.chaikin_mf, ["high", "low", "close", "volume"], {"window": 20}),
+    (tvi.mfi, ["high", "low", "close", "volume"], {"window": 14}),
+    (tvi.obv, ["close", "volume"], {}),
+    (tvi.pvo, ["volume"], {"fast_window": 12, "slow_window": 26, "signal_window": 9}),
+    (tvi.pvt, ["close", "volume"], {}),
+    (tvi.pvr, ["close", "volume"], {}),
+    (tvi.trend_score, ["close"], {"first_lag": 11, "last_lag": 20}),
+    (tvi.williams_ad, ["high", "low", "close"], {}),
+    (tvi.volume_oscillator, ["volume"], {"fast_window": 5, "slow_window": 10}),
+]
+
+def _assert_equal(result, expected):
+    if isinstance(expected, dict):
+        assert result.keys() == expected.keys()
+        for key in expected:
+            pd.testing.assert_frame_equal(result[key], expected[key], rtol=1e-10, atol=1e-10)
+    else:
+        pd.testing.assert_frame_equal(result, expected, rtol=1e-10, atol=1e-10)
+
+@pytest.mark.parametrize("func, keys, kwargs", INDICATORS, ids=[func.__name__ for func, _, _ in INDICATORS])
+@pytest.mark.parametrize("split", [30, 61, 103, 199])
+def test_append_matches_full_recompute(bars, func, keys, kwargs, split):
+    inputs = [bars[key] for key in keys]
+    full = func(*inputs, **kwargs)
+    head = func(*[each.iloc[:split] for each in inputs], **kwargs)
+
+    # the full history with the new days
+    _assert_equal(func(*inputs, **kwargs, prev=head), full)
+    # only the tail, holding the lookback before the new days
+    tail = [each.iloc[max(split-40, 0):] for each in inputs]
+    _assert_equal(func(*tail, **kwargs, prev=head), full)
+
+@pytest.mark.parametrize("func, keys, kwargs", INDICATORS, ids=[func.__name__ for func, _, _ in INDICATORS])
+def test_append_day_by_day(bars, func, keys, kwargs):
+    inputs = [bars[key] for key in keys]
+    full = func(*inputs, **kwargs)
+    result = func(*[each.iloc[:150] for each in inputs], **kwargs)
+    for end in range(151, 161):
+        result = func(*[each.iloc[end-40:end] for each in inputs], **kwargs, prev=result)
+    expected = {key: frame.iloc[:160] for key, frame in full.items()} if isinstance(full, dict) else full.iloc[:160]
+    _assert_equal(result, expected)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import vi
+
+WINDOW = 14
+
+@pytest.fixture(scope="module")
+def bars():
+    """Daily bars with a late listing, a gap of a few days and scattered missing bars."""
+    rng = np.random.default_rng(0)
+    number_of_days, number_of_assets = 400, 5
+    index = pd.date_range("2020-01-01", periods=number_of_days)
+    close = pd.DataFrame(100*np.exp(np.cumsum(rng.normal(0, 0.02, (number_of_days, number_of_assets)), axis=0)), index=index)
+    open = close.shift(1).fillna(close)*np.exp(rng.normal(0, 0.005, close.shape))
+    high = np.maximum(open, close)*(1 + rng.uniform(0, 0.02, close.shape))
+    low = np.minimum(open, close)*(1 - rng.uniform(0, 0.02, close.shape))
+
+    isMissing = np.zeros(close.shape, dtype=bool)
+    isMissing[:50, 1] = True
+    isMissing[200:205, 2] = True
+    isMissing[rng.uniform(size=close.shape) < 0.02] = True
+    isMissing[:, 0] = False
+    return {key: frame.mask(isMissing) for key, frame in {"open":open, "high":high, "low":low, "close":close}.items()}
+
+def _true_range(b):
+    previous_close = b["close"].shift(1).fillna(b["low"])
+    return np.maximum(b["high"], previous_close) - np.fmin(b["low"], previous_close)
+
+def _wilder(arr, window):
+    """Wilder smoothing seeded with the mean of the first window, a missing day is nan and holds the average."""
+    result = np.full(arr.shape[0], np.nan)
+    state = np.nan
+    for i in range(arr.shape[0]):
+        if np.isnan(state):
+            if i == window - 1 and not np.isnan(arr[:window]).all():
+                state = np.nanmean(arr[:window])
+                result[i] = state
+            elif i > window - 1 and not np.isnan(arr[i]):
+                state = arr[i]
+                result[i] = state
+            continue
+        if not np.isnan(arr[i]):
+            state = state + (arr[i] - state) / window
+            result[i] = state
+    return result
+
+def _rolling_mean(frame, window):
+    """Mean of the values in the trailing window, the first window-1 days are nan."""
+    result = frame.rolling(window, min_periods=1).mean()
+    result.iloc[:window-1] = np.nan
+    return result
+
+def _rolling_var(frame, window):
+    """Sample variance of the values in the trailing window, nan with fewer than two values."""
+    result = frame.rolling(window, min_periods=2).var(ddof=1)
+    result.iloc[:window-1] = np.nan
+    return result
+
+def test_atr_matches_wilder_reference(bars):
+    result = vi.atr(bars["high"], bars["low"], bars["close"], WINDOW)
+    tr = _true_range(bars)
+    expected = pd.DataFrame(np.stack([_wilder(tr[j].values, WINDOW) for j in tr.columns], axis=1), index=tr.index, columns=tr.columns)
+
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-12, atol=1e-12)
+    # a missing bar is nan and the average carries over it
+    assert result.iloc[200:205, 2].isna().all()
+    # a late listing starts from its first true range
+    assert result.iloc[:50, 1].isna().all()
+    assert result.iloc[50, 1] == pytest.approx(bars["high"].iloc[50, 1] - bars["low"].iloc[50, 1])
+
+def test_atr_converges_to_pandas_ewm_after_warmup(bars):
+    result = vi.atr(bars["high"], bars["low"], bars["close"], WINDOW)
+    expected = _true_range(bars).ewm(alpha=1/WINDOW, adjust=False).mean()
+
+    warmup = 20*WINDOW
+    np.testing.assert_allclose(result[0].values[warmup:], expected[0].values[warmup:], rtol=1e-6)
+
+def test_natr_is_atr_over_close(bars):
+    atr = vi.atr(bars["high"], bars["low"], bars["close"], WINDOW)
+    natr = vi.natr(bars["high"], bars["low"], bars["close"], WINDOW)
+    pd.testing.assert_frame_equal(natr, 100*atr / bars["close"], rtol=1e-12)
+
+@pytest.mark.parametrize("window", [10, 20])
+def test_range_estimators_match_closed_forms(bars, window):
+    trading_days = 252
+    log_high_low = np.log(bars["high"] / bars["low"])
+    log_close_open = np.log(bars["close"] / bars["open"])
+    log_high_close, log_high_open = np.log(bars["high"] / bars["close"]), np.log(bars["high"] / bars["open"])
+    log_low_close, log_low_open = np.log(bars["low"] / bars["close"]), np.log(bars["low"] / bars["open"])
+    overnight = np.log(bars["open"] / bars["close"].shift(1))
+
+    parkinson = np.sqrt(_rolling_mean(log_high_low**2, window) / (4*np.log(2))*trading_days)
+    garman_klass = np.sqrt(_rolling_mean(0.5*log_high_low**2 - (2*np.log(2) - 1)*log_close_open**2, window)*trading_days)
+    rogers_satchell_variance = _rolling_mean(log_high_close*log_high_open + log_low_close*log_low_open, window)
+    rogers_satchell = np.sqrt(rogers_satchell_variance*trading_days)
+    k = 0.34 / (1.34 + (window + 1) / (window - 1))
+    yang_zhang = np.sqrt((_rolling_var(overnight, window) + k*_rolling_var(log_close_open, window) + (1 - k)*rogers_satchell_variance)*trading_days)
+
+    result = vi.range_volatility(bars["open"], bars["high"], bars["low"], bars["close"], window, trading_days)
+    pd.testing.assert_frame_equal(result["parkinson"], parkinson, rtol=1e-10)
+    pd.testing.assert_frame_equal(result["garman_klass"], garman_klass, rtol=1e-10)
+    pd.testing.assert_frame_equal(result["rogers_satchell"], rogers_satchell, rtol=1e-10)
+    pd.testing.assert_frame_equal(result["yang_zhang"], yang_zhang, rtol=1e-10)
+
+    pd.testing.assert_frame_equal(vi.parkinson(bars["high"], bars["low"], window, trading_days), parkinson, rtol=1e-10)
+    pd.testing.assert_frame_equal(vi.garman_klass(bars["open"], bars["high"], bars["low"], bars["close"], window, trading_days), garman_klass, rtol=1e-10)
+    pd.testing.assert_frame_equal(vi.yang_zhang(bars["open"], bars["high"], bars["low"], bars["close"], window, trading_days), yang_zhang, rtol=1e-10)
+
+def test_range_estimators_over_a_gap(bars):
+    window = 10
+    result = vi.range_volatility(bars["open"], bars["high"], bars["low"], bars["close"], window, 1)
+    # windows inside the five missing days still read the bars before them, only an empty window is nan
+    assert result["parkinson"].iloc[200:205, 2].notna().all()
+    assert result["parkinson"].iloc[:50, 1].isna().all()
+    assert result["parkinson"].iloc[50+window-1:, 1].notna().all()
+    # an asset without bars stays nan
+    empty = {key: frame.mask(np.broadcast_to(frame.columns == 3, frame.shape)) for key, frame in bars.items()}
+    result = vi.range_volatility(empty["open"], empty["high"], empty["low"], empty["close"], window, 1)
+    assert all(estimator[3].isna().all() and estimator[4].notna().any() for estimator in result.values())
+    assert vi.atr(empty["high"], empty["low"], empty["close"], WINDOW)[3].isna().all()
+
+def test_bollinger_width_matches_pandas(bars):
+    window, sigma = 20, 2
+    close = bars["close"]
+    mean = _rolling_mean(close, window)
+    std = close.rolling(window, min_periods=1).std(ddof=0)
+    std.iloc[:window-1] = np.nan
+    pd.testing.assert_frame_equal(vi.bollinger_width(close, window, sigma), 100*2*sigma*std / mean, rtol=1e-9)